@@ -16,7 +16,9 @@
 # pylint: disable=missing-docstring
 
 
-from rddlgym.trajectory import Trajectory
+from rddlgym.trajectory import Trajectory, TrajectoryWriter
+from rddlgym.batch import TrajectoryBatch
+from rddlgym.buffer import ReplayBuffer
 from rddlgym.runner import Runner
 from rddlgym.utils import make, load, Mode
 
@@ -26,4 +28,16 @@ SCG = Mode.SCG
 GYM = Mode.GYM
 
 
-__all__ = ["Trajectory", "Runner", "make", "load", "RAW", "AST", "SCG", "GYM"]
+__all__ = [
+    "Trajectory",
+    "TrajectoryWriter",
+    "TrajectoryBatch",
+    "ReplayBuffer",
+    "Runner",
+    "make",
+    "load",
+    "RAW",
+    "AST",
+    "SCG",
+    "GYM",
+]
@@ -0,0 +1,214 @@
+# This file is part of rddlgym.
+
+# rddlgym is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# rddlgym is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with rddlgym. If not, see <http://www.gnu.org/licenses/>.
+
+# pylint: disable=missing-docstring,protected-access
+
+
+from collections import OrderedDict
+import json
+
+import numpy as np
+
+from rddlgym.storage import SCHEMA_KEY, pack_bits, unpack_bits
+
+
+FIELDS = ("states", "actions", "interms")
+
+
+class TrajectoryBatch:
+    """TrajectoryBatch holds many episodes as (episodes, horizon, ...) arrays.
+
+    Episodes shorter than the batch horizon are padded with zeros
+    and excluded from statistics through `mask`.
+
+    Args:
+        states (Dict[str, np.array]): Mapping from state fluent to array.
+        actions (Dict[str, np.array]): Mapping from action fluent to array.
+        interms (Dict[str, np.array]): Mapping from interm fluent to array.
+        rewards (np.array): The (episodes, horizon) array of rewards.
+        lengths (Optional[np.array]): The episodes' lengths.
+        discount (float): The discount factor.
+    """
+
+    # pylint: disable=too-many-arguments
+
+    def __init__(self, states, actions, interms, rewards, lengths=None, discount=1.0):
+        self.states = OrderedDict(states)
+        self.actions = OrderedDict(actions)
+        self.interms = OrderedDict(interms)
+        self.rewards = np.asarray(rewards)
+
+        episodes, horizon = self.rewards.shape
+
+        if lengths is None:
+            lengths = np.full((episodes,), horizon)
+        self.lengths = np.asarray(lengths, dtype=np.int64)
+
+        self.discount = discount
+
+        self.mask = np.arange(horizon) < self.lengths[:, np.newaxis]
+
+    @classmethod
+    def from_trajectories(cls, trajectories, discount=None):
+        """Returns a TrajectoryBatch stacking the given `trajectories`.
+
+        If `discount` is not given, uses the RDDL instance discount.
+        """
+        trajectories = list(trajectories)
+        if not trajectories:
+            raise ValueError("Cannot build a TrajectoryBatch without trajectories.")
+
+        if discount is None:
+            discount = trajectories[0].env._compiler.rddl.instance.discount
+
+        episodes = len(trajectories)
+        lengths = np.array([len(trajectory) for trajectory in trajectories])
+        horizon = int(lengths.max())
+
+        def _stack(views):
+            fluents = OrderedDict()
+            for i, view in enumerate(views):
+                for name, values in view.items():
+                    values = np.asarray(values)
+                    if name not in fluents:
+                        shape = (episodes, horizon, *values.shape[1:])
+                        fluents[name] = np.zeros(shape, dtype=values.dtype)
+                    fluents[name][i, : len(values)] = values
+            return fluents
+
+        states = _stack(trajectory.states for trajectory in trajectories)
+        actions = _stack(trajectory.actions for trajectory in trajectories)
+        interms = _stack(trajectory.infos for trajectory in trajectories)
+
+        rewards = np.zeros((episodes, horizon), dtype=np.float32)
+        for i, trajectory in enumerate(trajectories):
+            rewards[i, : len(trajectory)] = trajectory.rewards
+
+        return cls(states, actions, interms, rewards, lengths, discount)
+
+    @property
+    def episodes(self):
+        """Returns the number of episodes."""
+        return self.rewards.shape[0]
+
+    @property
+    def horizon(self):
+        """Returns the (maximum) number of timesteps per episode."""
+        return self.rewards.shape[1]
+
+    @property
+    def returns(self):
+        """Returns the (episodes,) array of undiscounted returns."""
+        return np.sum(self.rewards, axis=1)
+
+    def discounted_returns(self, discount=None):
+        """Returns the (episodes,) array of discounted returns."""
+        discount = self.discount if discount is None else discount
+        weights = discount ** np.arange(self.horizon)
+        return np.dot(self.rewards, weights)
+
+    def rewards_to_go(self, discount=None):
+        """Returns the (episodes, horizon) array of discounted rewards-to-go."""
+        discount = self.discount if discount is None else discount
+
+        if discount == 1.0:
+            return np.flip(np.cumsum(np.flip(self.rewards, axis=1), axis=1), axis=1)
+
+        rewards_to_go = np.array(self.rewards)
+        for t in reversed(range(self.horizon - 1)):
+            rewards_to_go[:, t] += discount * rewards_to_go[:, t + 1]
+        return rewards_to_go
+
+    def mean(self, values=None):
+        """Returns the mean of `values` (defaults to rewards) across episodes.
+
+        Arrays with a timestep axis only average over unpadded entries.
+        """
+        return np.ma.filled(self._masked(values).mean(axis=0), np.nan)
+
+    def std(self, values=None):
+        """Returns the standard deviation of `values` across episodes."""
+        return np.ma.filled(self._masked(values).std(axis=0), np.nan)
+
+    def confidence_interval(self, values=None, z=1.96):
+        """Returns the (lower, upper) normal confidence interval of the mean
+        of `values` across episodes (z=1.96 for 95% confidence)."""
+        values = self._masked(values)
+        mean = values.mean(axis=0)
+        count = values.count(axis=0)
+        stderr = values.std(axis=0, ddof=1) / np.sqrt(count)
+        lower = np.ma.filled(mean - z * stderr, np.nan)
+        upper = np.ma.filled(mean + z * stderr, np.nan)
+        return lower, upper
+
+    def save(self, filepath):
+        """Saves the batch in `filepath` as a single NPZ archive.
+
+        Boolean fluents are stored bit-packed.
+        """
+        arrays = OrderedDict()
+        packed = OrderedDict()
+        for field in FIELDS:
+            for name, values in getattr(self, field).items():
+                key = "{}/{}".format(field, name)
+                if values.dtype == np.bool_:
+                    packed[key] = values.shape
+                    values = pack_bits(values)
+                arrays[key] = values
+        arrays["rewards"] = self.rewards
+        arrays["lengths"] = self.lengths
+        arrays["discount"] = np.array(self.discount)
+        arrays[SCHEMA_KEY] = np.array(json.dumps({"packed": packed}))
+
+        with open(filepath, "wb") as file:
+            np.savez(file, **arrays)
+
+    @classmethod
+    def load(cls, filepath):
+        """Loads a batch saved in the NPZ archive `filepath`."""
+        with np.load(filepath) as data:
+            packed = {}
+            if SCHEMA_KEY in data.files:
+                packed = json.loads(str(data[SCHEMA_KEY]))["packed"]
+
+            fields = {field: OrderedDict() for field in FIELDS}
+            for key in data.files:
+                field, _, name = key.partition("/")
+                if field in fields:
+                    values = data[key]
+                    if key in packed:
+                        values = unpack_bits(values, packed[key])
+                    fields[field][name] = values
+
+            return cls(
+                fields["states"],
+                fields["actions"],
+                fields["interms"],
+                data["rewards"],
+                data["lengths"],
+                float(data["discount"]),
+            )
+
+    def _masked(self, values):
+        values = self.rewards if values is None else np.asarray(values)
+
+        if values.ndim < 2 or values.shape[:2] != self.mask.shape:
+            return np.ma.masked_array(values)
+
+        mask = np.reshape(~self.mask, self.mask.shape + (1,) * (values.ndim - 2))
+        return np.ma.masked_array(values, np.broadcast_to(mask, values.shape))
+
+    def __len__(self):
+        return self.episodes
@@ -0,0 +1,238 @@
+# This file is part of rddlgym.
+
+# rddlgym is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# rddlgym is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with rddlgym. If not, see <http://www.gnu.org/licenses/>.
+
+"""Benchmarks of parse, compile and simulation performance.
+
+Each instance is benchmarked in a fresh (spawned) process, so that
+timings are cold and the peak RSS is the instance's own.
+"""
+
+# pylint: disable=missing-docstring,protected-access
+
+
+from collections import OrderedDict
+import multiprocessing
+import platform
+import resource
+import sys
+import time
+
+import numpy as np
+import pkg_resources
+import tensorflow as tf
+from rddl2tf.compilers import DefaultCompiler
+
+from rddlgym import utils
+from rddlgym.env import RDDLEnv
+from rddlgym.policies import RandomPolicy
+from rddlgym.registry import get_registry
+
+
+REPORT_VERSION = 2
+PACKAGES = ("rddlgym", "rddl2tf", "pyrddl", "tensorflow", "numpy")
+
+# metrics where higher is better; all other metrics are times or memory
+THROUGHPUTS = ("steps_per_sec", "batch_steps_per_sec")
+
+
+def versions():
+    """Returns the versions of Python and the relevant packages."""
+    info = OrderedDict([("python", platform.python_version())])
+    for package in PACKAGES:
+        try:
+            info[package] = pkg_resources.get_distribution(package).version
+        except pkg_resources.DistributionNotFound:
+            info[package] = None
+    return info
+
+
+def bench_instance(rddl, steps=200, batch_size=256, resets=10):
+    """Benchmarks the `rddl` domain/instance in the current process.
+
+    Args:
+        rddl (str): The RDDL domain/instance id or filepath.
+        steps (int): The number of timed env steps.
+        batch_size (int): The batch size of the timed batched transitions
+            (0 disables them).
+        resets (int): The number of timed env resets.
+
+    The model is parsed ("parse_time"), its compiler initialized with the
+    non-fluents and initial state ("init_time") and its CPFs and reward
+    compiled to a TensorFlow graph ("compile_time"). "env_time" is the
+    end-to-end construction of a RDDLEnv (which repeats those steps) and
+    "session_time" the creation of a session on its graph.
+
+    Returns:
+        OrderedDict: The metrics (times in seconds, peak RSS in MB).
+    """
+    filename = rddl if rddl.endswith(".rddl") else get_registry().filepath(rddl)
+    metrics = OrderedDict()
+
+    utils.get_parser()
+
+    start = time.perf_counter()
+    model = utils._parse(utils.read_model(filename))
+    metrics["parse_time"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    compiler = DefaultCompiler(model)
+    compiler.init()
+    metrics["init_time"] = time.perf_counter() - start
+
+    with compiler.graph.as_default():
+        state = _placeholders(compiler.initial_state_fluents)
+        action = _placeholders(compiler.default_action_fluents)
+
+        start = time.perf_counter()
+        _, next_state = compiler.cpfs(state, action)
+        compiler.reward(state, action, next_state)
+        metrics["compile_time"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    env = RDDLEnv(filename)
+    metrics["env_time"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    sess = tf.Session(graph=env._graph, config=env._config_proto)
+    metrics["session_time"] = time.perf_counter() - start
+    sess.close()
+
+    latencies = []
+    for _ in range(resets):
+        start = time.perf_counter()
+        env.reset()
+        latencies.append(time.perf_counter() - start)
+    metrics["reset_latency"] = float(np.mean(latencies))
+
+    policy = RandomPolicy(env)
+    state, timestep = env.reset()
+    latencies = []
+    for _ in range(steps):
+        action = policy(state, timestep)
+        start = time.perf_counter()
+        state, _, done, _ = env.step(action)
+        latencies.append(time.perf_counter() - start)
+        timestep = env.timestep
+        if done:
+            state, timestep = env.reset()
+
+    metrics["step_latency_mean"] = float(np.mean(latencies))
+    for percentile in (50, 90, 99):
+        metrics["step_latency_p{}".format(percentile)] = float(
+            np.percentile(latencies, percentile)
+        )
+    metrics["steps_per_sec"] = len(latencies) / float(np.sum(latencies))
+
+    if batch_size > 0:
+        states = OrderedDict(
+            (name, np.repeat(value[np.newaxis], batch_size, axis=0))
+            for name, value in state.items()
+        )
+        actions = OrderedDict(
+            (name, np.repeat(np.asarray(value)[np.newaxis], batch_size, axis=0))
+            for name, value in policy(state, timestep).items()
+        )
+        env.transition(states, actions)  # builds the batch_size ops
+
+        calls = max(steps // batch_size, 5)
+        start = time.perf_counter()
+        for _ in range(calls):
+            env.transition(states, actions)
+        elapsed = time.perf_counter() - start
+        metrics["batch_steps_per_sec"] = calls * batch_size / elapsed
+
+    env.close()
+
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    unit = 2 ** 20 if sys.platform == "darwin" else 2 ** 10
+    metrics["peak_rss_mb"] = maxrss / unit
+
+    return metrics
+
+
+def _placeholders(fluents):
+    return [
+        tf.compat.v1.placeholder(fluent.dtype, shape=(1, *fluent.shape.fluent_shape))
+        for _, fluent in fluents
+    ]
+
+
+def bench(instances=None, steps=200, batch_size=256, isolate=True):
+    """Benchmarks the given RDDL domains/instances (all bundled by default).
+
+    Args:
+        instances (Optional[Sequence[str]]): The RDDL domain/instance ids or
+            filepaths.
+        steps (int): The number of timed env steps per instance.
+        batch_size (int): The batch size of timed batched transitions.
+        isolate (bool): If True, runs each instance in a fresh process.
+
+    Returns:
+        OrderedDict: The report with "version", "versions", "config" and the
+        per-instance metrics ("instances").
+    """
+    if not instances:
+        instances = get_registry().bundled()
+
+    report = OrderedDict()
+    report["version"] = REPORT_VERSION
+    report["versions"] = versions()
+    report["config"] = OrderedDict([("steps", steps), ("batch_size", batch_size)])
+    report["instances"] = OrderedDict()
+
+    if not isolate:
+        for rddl in instances:
+            report["instances"][rddl] = bench_instance(rddl, steps, batch_size)
+        return report
+
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(processes=1, maxtasksperchild=1) as pool:
+        for rddl in instances:
+            report["instances"][rddl] = pool.apply(
+                bench_instance, (rddl, steps, batch_size)
+            )
+
+    return report
+
+
+def compare(report, baseline, threshold=0.2):
+    """Returns the metrics of `report` that regressed with respect to
+    `baseline` by more than a `threshold` fraction.
+
+    Returns:
+        List[Tuple[str, str, float, float]]: The (instance, metric, baseline
+        value, current value) of the regressions.
+    """
+    regressions = []
+    for rddl, metrics in report["instances"].items():
+        base = baseline.get("instances", {}).get(rddl)
+        if base is None:
+            continue
+
+        for metric, value in metrics.items():
+            old = base.get(metric)
+            if old is None or old <= 0:
+                continue
+
+            if metric in THROUGHPUTS:
+                regressed = value < old / (1.0 + threshold)
+            else:
+                regressed = value > old * (1.0 + threshold)
+
+            if regressed:
+                regressions.append((rddl, metric, old, value))
+
+    return regressions
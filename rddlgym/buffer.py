@@ -0,0 +1,249 @@
+# This file is part of rddlgym.
+
+# rddlgym is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# rddlgym is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with rddlgym. If not, see <http://www.gnu.org/licenses/>.
+
+# pylint: disable=missing-docstring,protected-access
+
+
+from collections import OrderedDict
+import os
+
+import numpy as np
+
+from rddlgym.storage import pack_bits
+from rddlgym.trajectory import fluent_layout
+
+
+class ReplayBuffer:
+    """ReplayBuffer stores transitions in preallocated circular arrays.
+
+    Each state and action fluent has its own (capacity, *fluent_shape)
+    array, so insertions and minibatch sampling never allocate per-sample
+    dicts. Boolean fluents are stored bit-packed (8 values per byte) and
+    unpacked when sampled. It implements the `add_transition` interface
+    of Trajectory and can be used as a sink in `rddlgym.Runner.run`.
+
+    Args:
+        env (rddlgym.RDDLEnv): The RDDLEnv gym environment.
+        capacity (int): The maximum number of transitions.
+        dirpath (Optional[str]): If given, arrays are memory-mapped .npy
+            files in `dirpath` instead of being held in memory.
+        alpha (float): The prioritization exponent.
+        seed (Optional[int]): The random seed for sampling.
+    """
+
+    def __init__(self, env, capacity, dirpath=None, alpha=0.6, seed=None):
+        # pylint: disable=too-many-arguments
+        self.env = env
+        self.capacity = capacity
+        self.dirpath = dirpath
+        self.alpha = alpha
+
+        self._rng = np.random.RandomState(seed)
+
+        if dirpath is not None and not os.path.exists(dirpath):
+            os.makedirs(dirpath)
+
+        layout = fluent_layout(env._compiler.rddl)
+
+        self._shapes = OrderedDict()
+        self._packed = set()
+        self._arrays = OrderedDict()
+        for field, layout_field in [
+            ("state", "state"),
+            ("action", "action"),
+            ("next_state", "state"),
+        ]:
+            self._arrays[field] = OrderedDict()
+            for fluent in layout[layout_field]:
+                filename = "{}.{}".format(field, fluent.name.replace("/", "-"))
+                shape, dtype = fluent.shape, fluent.dtype
+                if dtype == np.bool_:
+                    self._packed.add(fluent.name)
+                    shape, dtype = ((int(np.prod(shape)) + 7) // 8,), np.uint8
+                self._shapes[fluent.name] = fluent.shape
+                self._arrays[field][fluent.name] = self._allocate(
+                    filename, shape, dtype
+                )
+
+        self._rewards = self._allocate("reward", (), np.float32)
+        self._dones = self._allocate("done", (), np.bool_)
+        self._priorities = np.zeros((capacity,), dtype=np.float64)
+
+        self._max_priority = 1.0
+        self._next = 0
+        self._size = 0
+
+    def add(self, state, action, reward, next_state, done):
+        """Adds a single transition, overwriting the oldest one if full."""
+        # pylint: disable=too-many-arguments
+        i = self._next
+
+        for field, values in (
+            ("state", state),
+            ("action", action),
+            ("next_state", next_state),
+        ):
+            for name, array in self._arrays[field].items():
+                if name in self._packed:
+                    array[i] = pack_bits(values[name])
+                else:
+                    array[i] = values[name]
+
+        self._rewards[i] = reward
+        self._dones[i] = done
+        self._priorities[i] = self._max_priority
+
+        self._next = (i + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def add_transition(self, step, state, action, reward, next_state, info, done):
+        """Adds a transition with the `rddlgym.Trajectory` signature."""
+        # pylint: disable=too-many-arguments,unused-argument
+        self.add(state, action, reward, next_state, done)
+
+    def extend(self, trajectory):
+        """Adds all transitions of `trajectory` with one write per fluent.
+
+        As saved trajectories do not include the final next state (see
+        `rddlgym.Trajectory.load`), the last transition of a loaded
+        trajectory is not added.
+        """
+        length = len(trajectory)
+        final_state = None if trajectory._reader is not None else trajectory.final_state
+        if final_state is None:
+            length -= 1
+        if length <= 0:
+            return
+
+        start = max(length - self.capacity, 0)
+        indices = (self._next + np.arange(start, length)) % self.capacity
+
+        states = OrderedDict(
+            (name, np.asarray(values)) for name, values in trajectory.states.items()
+        )
+        if final_state is None:
+            next_states = OrderedDict(
+                (name, values[1 : length + 1]) for name, values in states.items()
+            )
+        else:
+            next_states = OrderedDict(
+                (name, np.concatenate([values[1:], [final_state[name]]]))
+                for name, values in states.items()
+            )
+        actions = OrderedDict(
+            (name, np.asarray(values)) for name, values in trajectory.actions.items()
+        )
+
+        for field, fluents in (
+            ("state", states),
+            ("action", actions),
+            ("next_state", next_states),
+        ):
+            for name, array in self._arrays[field].items():
+                values = fluents[name][start:length]
+                if name in self._packed:
+                    values = np.packbits(
+                        np.reshape(values, (len(values), -1)).astype(np.bool_), axis=1
+                    )
+                array[indices] = values
+
+        if trajectory._reader is not None:
+            dones = trajectory._reader["done"].astype(np.bool_)
+        else:
+            dones = np.array([transition.done for transition in trajectory])
+        self._rewards[indices] = trajectory.rewards[start:length]
+        self._dones[indices] = dones[start:length]
+        self._priorities[indices] = self._max_priority
+
+        self._next = (self._next + length) % self.capacity
+        self._size = min(self._size + len(indices), self.capacity)
+
+    def sample(self, batch_size, prioritized=False, beta=0.4):
+        """Samples a minibatch of transitions.
+
+        Args:
+            batch_size (int): The number of sampled transitions.
+            prioritized (bool): If True, samples proportionally to
+                priority ** alpha, otherwise uniformly.
+            beta (float): The importance-sampling correction exponent.
+
+        Returns:
+            Dict[str, Any]: A batch with keys "state", "action", "next_state"
+            (each a mapping from fluent name to a (batch_size, ...) array),
+            "reward", "done", "indices" and "weights".
+        """
+        if self._size == 0:
+            raise ValueError("Cannot sample from an empty ReplayBuffer.")
+
+        if prioritized:
+            probs = self._priorities[: self._size] ** self.alpha
+            probs /= probs.sum()
+            indices = self._rng.choice(self._size, size=batch_size, p=probs)
+            weights = (self._size * probs[indices]) ** (-beta)
+            weights /= weights.max()
+        else:
+            indices = self._rng.randint(0, self._size, size=batch_size)
+            weights = np.ones((batch_size,), dtype=np.float64)
+
+        batch = OrderedDict()
+        for field, arrays in self._arrays.items():
+            batch[field] = OrderedDict(
+                (name, self._unpack(name, array[indices]))
+                for name, array in arrays.items()
+            )
+        batch["reward"] = self._rewards[indices]
+        batch["done"] = self._dones[indices]
+        batch["indices"] = indices
+        batch["weights"] = weights
+
+        return batch
+
+    def update_priorities(self, indices, priorities, epsilon=1e-6):
+        """Updates the priorities (e.g., absolute TD errors) of `indices`."""
+        priorities = np.abs(priorities) + epsilon
+        self._priorities[indices] = priorities
+        self._max_priority = max(self._max_priority, float(np.max(priorities)))
+
+    def flush(self):
+        """Flushes memory-mapped arrays to disk."""
+        if self.dirpath is None:
+            return
+
+        for arrays in self._arrays.values():
+            for array in arrays.values():
+                array.flush()
+        self._rewards.flush()
+        self._dones.flush()
+
+    def _unpack(self, name, values):
+        if name not in self._packed:
+            return values
+
+        shape = self._shapes[name]
+        size = int(np.prod(shape))
+        values = np.unpackbits(values, axis=1)[:, :size].view(np.bool_)
+        return np.reshape(values, (len(values), *shape))
+
+    def _allocate(self, name, shape, dtype):
+        shape = (self.capacity, *shape)
+
+        if self.dirpath is None:
+            return np.zeros(shape, dtype=dtype)
+
+        filepath = os.path.join(self.dirpath, "{}.npy".format(name))
+        return np.lib.format.open_memmap(filepath, mode="w+", dtype=dtype, shape=shape)
+
+    def __len__(self):
+        return self._size
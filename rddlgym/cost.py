@@ -0,0 +1,219 @@
+# This file is part of rddlgym.
+
+# rddlgym is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# rddlgym is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with rddlgym. If not, see <http://www.gnu.org/licenses/>.
+
+"""Static cost report of compiled RDDL models.
+
+The ops the env's CPF and reward tensors depend on are attributed to the
+CPF (or reward) whose name scope they belong to (see
+`rddlgym.profiling.op_owner`). The FLOPs are estimated from static shapes:
+one per output element for element-wise (and random sampling) ops, one per
+input element for reductions and 2 * m * n * k for matrix products. Shape
+ops, constants and inputs are free.
+"""
+
+# pylint: disable=missing-docstring,protected-access
+
+
+from collections import OrderedDict
+
+import numpy as np
+
+from rddlgym.profiling import op_owner
+
+
+FREE_OPS = {
+    "Const",
+    "Placeholder",
+    "PlaceholderWithDefault",
+    "Identity",
+    "Reshape",
+    "ExpandDims",
+    "Squeeze",
+    "Shape",
+    "NoOp",
+    "StopGradient",
+}
+REDUCTION_OPS = {
+    "Sum",
+    "Prod",
+    "Max",
+    "Min",
+    "Mean",
+    "All",
+    "Any",
+    "ArgMax",
+    "ArgMin",
+}
+MATMUL_OPS = {"MatMul", "BatchMatMul", "BatchMatMulV2"}
+
+
+def num_elements(tensor):
+    """Returns the number of elements of `tensor`'s static shape (unknown
+    dimensions count as 1)."""
+    dims = tensor.shape.as_list() if tensor.shape.dims is not None else []
+    return int(np.prod([dim or 1 for dim in dims]))
+
+
+def op_flops(op):
+    """Returns the estimated FLOPs of the tf.Operation `op`."""
+    if op.type in FREE_OPS or not op.outputs:
+        return 0
+
+    if op.type in REDUCTION_OPS:
+        return num_elements(op.inputs[0])
+
+    if op.type in MATMUL_OPS:
+        inner = op.inputs[0].shape.as_list()[-1] or 1
+        if op.get_attr("transpose_a" if op.type == "MatMul" else "adj_x"):
+            inner = op.inputs[0].shape.as_list()[-2] or 1
+        return 2 * num_elements(op.outputs[0]) * inner
+
+    return sum(num_elements(output) for output in op.outputs)
+
+
+def op_bytes(op):
+    """Returns the size in bytes of the outputs of the tf.Operation `op`."""
+    return sum(
+        num_elements(output) * output.dtype.size
+        for output in op.outputs
+        if output.dtype.size is not None
+    )
+
+
+def dependency_depths(domain):
+    """Returns the dependency depth of the interm fluents, next state
+    fluents and reward of `domain`: CPFs only depending on state, action
+    and non-fluents have depth 1, and every other CPF is one level deeper
+    than its deepest interm fluent (or next state, for the reward)."""
+    depths = OrderedDict()
+
+    def _depth(scope):
+        deps = [depths[name] for name in scope if name in depths]
+        return 1 + max(deps, default=0)
+
+    pending = list(domain.intermediate_cpfs)
+    while pending:
+        resolved = [
+            cpf
+            for cpf in pending
+            if not (cpf.expr.scope & {c.name for c in pending} - {cpf.name})
+        ]
+        if not resolved:
+            raise ValueError("Cyclic dependencies between interm fluents.")
+        for cpf in resolved:
+            depths[cpf.name] = _depth(cpf.expr.scope)
+            pending.remove(cpf)
+
+    for cpf in domain.state_cpfs:
+        depths[cpf.name] = _depth(cpf.expr.scope)
+
+    depths["reward"] = _depth(domain.reward.scope)
+
+    return depths
+
+
+def model_ops(tensors):
+    """Returns the ops the `tensors` depend on, in topological order."""
+    ops, visited = [], set()
+    stack = [(tensor.op, False) for tensor in reversed(tensors)]
+    while stack:
+        op, expanded = stack.pop()
+        if expanded:
+            ops.append(op)
+            continue
+        if op in visited:
+            continue
+        visited.add(op)
+        stack.append((op, True))
+        inputs = [tensor.op for tensor in op.inputs] + list(op.control_inputs)
+        stack.extend((input_op, False) for input_op in reversed(inputs))
+    return ops
+
+
+def cost_report(env):
+    """Returns the static cost report of the compiled RDDL model of `env`.
+
+    Args:
+        env (rddlgym.RDDLEnv): The RDDLEnv gym environment.
+
+    Returns:
+        OrderedDict: The records of interm fluents, next state fluents,
+        reward and "other" ops (non-fluents, initial state and inputs), by
+        owner (see `rddlgym.profiling.op_owner`). Each record has the
+        fluent's "size" (number of elements), CPF dependency "depth" and
+        "deps" (interm fluents or next state fluents it depends on), and
+        the number of "ops", estimated "flops" and output "bytes" of the
+        fluent's ops.
+    """
+    domain = env._compiler.rddl.domain
+    depths = dependency_depths(domain)
+    cpfs = domain.intermediate_cpfs + domain.state_cpfs
+    scopes = {cpf.name: cpf.expr.scope for cpf in cpfs}
+    scopes["reward"] = domain.reward.scope
+
+    fluents = [
+        ("interm {}".format(name), name, tensor)
+        for name, tensor in zip(domain.interm_fluent_ordering, env._interms)
+    ]
+    fluents += [
+        ("state {}".format(name), _next_state_name(name), tensor)
+        for name, tensor in zip(domain.state_fluent_ordering, env._next_state)
+    ]
+    fluents.append(("reward", "reward", env._reward))
+
+    report = OrderedDict()
+    for owner, name, tensor in fluents:
+        # the fluent tensors have a leading batch dimension
+        dims = tensor.shape.as_list()[1:]
+        report[owner] = _record(
+            size=int(np.prod([dim or 1 for dim in dims])),
+            depth=depths[name],
+            deps=sorted(dep for dep in scopes[name] if dep in depths),
+        )
+    report["other"] = _record(size=0, depth=0, deps=[])
+
+    for op in model_ops([tensor for _, _, tensor in fluents]):
+        record = report.get(op_owner(op.name), report["other"])
+        record["ops"] += 1
+        record["flops"] += op_flops(op)
+        record["bytes"] += op_bytes(op)
+
+    return report
+
+
+def _next_state_name(name):
+    fluent, arity = name.split("/")
+    return "{}'/{}".format(fluent, arity)
+
+
+def _record(size, depth, deps):
+    return OrderedDict(
+        [
+            ("size", size),
+            ("depth", depth),
+            ("deps", deps),
+            ("ops", 0),
+            ("flops", 0),
+            ("bytes", 0),
+        ]
+    )
+
+
+def totals(report):
+    """Returns the total number of ops, FLOPs and bytes of `report`."""
+    return OrderedDict(
+        (key, sum(record[key] for record in report.values()))
+        for key in ["ops", "flops", "bytes"]
+    )
@@ -17,11 +17,13 @@
 
 
 from collections import OrderedDict
+import zlib
 
 import gym
 from gym import spaces
 import numpy as np
 import tensorflow as tf
+from tensorflow.core.framework import attr_value_pb2
 
 import rddlgym
 
@@ -39,6 +41,7 @@ class RDDLEnv(gym.Env):
         self._compiler = rddlgym.make(rddl, mode=rddlgym.SCG)
         self._compiler.init()
 
+        self.rddl = rddl
         self.config = config
 
         self._graph = self._compiler.graph
@@ -50,6 +53,7 @@ class RDDLEnv(gym.Env):
         )
 
         self._sess = tf.Session(graph=self._graph, config=self._config_proto)
+        self.closed = False
 
         self.observation_space = self._create_observation_space()
         self.action_space = self._create_action_space()
@@ -61,11 +65,21 @@ class RDDLEnv(gym.Env):
             self._action_inputs = self._build_action_inputs()
             self._interms, self._next_state, self._reward = self._build_model_ops()
 
+        self._batch_ops = {
+            1: (
+                self._state_inputs,
+                self._action_inputs,
+                (self._interms, self._next_state, self._reward),
+            )
+        }
+
         self._state = None
         self._timestep = None
 
         self._horizon = None
 
+        self._seed = None
+
     def set_horizon(self, horizon):
         self._horizon = horizon
 
@@ -108,13 +122,13 @@ class RDDLEnv(gym.Env):
             }
         )
 
-    def _build_state_inputs(self):
+    def _build_state_inputs(self, batch_size=1):
         with tf.compat.v1.name_scope("state_input"):
             state_inputs = OrderedDict(
                 {
                     name: tf.compat.v1.placeholder(
                         fluent.dtype,
-                        shape=(1, *fluent.shape.fluent_shape),
+                        shape=(batch_size, *fluent.shape.fluent_shape),
                         name=name.replace("/", "-"),
                     )
                     for name, fluent in self._compiler.initial_state_fluents
@@ -123,13 +137,13 @@ class RDDLEnv(gym.Env):
 
             return state_inputs
 
-    def _build_action_inputs(self):
+    def _build_action_inputs(self, batch_size=1):
         with tf.compat.v1.name_scope("action_inputs"):
             action_inputs = OrderedDict(
                 {
                     name: tf.compat.v1.placeholder(
                         fluent.dtype,
-                        shape=(1, *fluent.shape.fluent_shape),
+                        shape=(batch_size, *fluent.shape.fluent_shape),
                         name=name.replace("/", "-"),
                     )
                     for name, fluent in self._compiler.default_action_fluents
@@ -138,9 +152,12 @@ class RDDLEnv(gym.Env):
 
             return action_inputs
 
-    def _build_model_ops(self):
-        state = self._state_inputs.values()
-        action = self._action_inputs.values()
+    def _build_model_ops(self, state_inputs=None, action_inputs=None):
+        state_inputs = state_inputs or self._state_inputs
+        action_inputs = action_inputs or self._action_inputs
+
+        state = state_inputs.values()
+        action = action_inputs.values()
 
         interms, next_state = self._compiler.cpfs(state, action)
         reward = self._compiler.reward(state, action, next_state)
@@ -150,6 +167,66 @@ class RDDLEnv(gym.Env):
 
         return interms, next_state, reward
 
+    def _get_batch_ops(self, batch_size):
+        """Returns the (lazily built) input placeholders and model ops
+        for states and actions with the given `batch_size`."""
+        if batch_size not in self._batch_ops:
+            default_batch_size = self._compiler.batch_size
+            self._compiler.batch_size = batch_size
+            num_ops = len(self._graph.get_operations())
+            try:
+                with self._compiler.graph.as_default():
+                    with tf.compat.v1.name_scope("batch_{}".format(batch_size)):
+                        state_inputs = self._build_state_inputs(batch_size)
+                        action_inputs = self._build_action_inputs(batch_size)
+                        ops = self._build_model_ops(state_inputs, action_inputs)
+            finally:
+                self._compiler.batch_size = default_batch_size
+
+            if self._seed is not None:
+                self._seed_random_ops(self._graph.get_operations()[num_ops:])
+
+            self._batch_ops[batch_size] = (state_inputs, action_inputs, ops)
+
+        return self._batch_ops[batch_size]
+
+    def transition(self, state, action):
+        """Computes a batch of transitions without changing the env's
+        current state and timestep.
+
+        Args:
+            state (Dict[str, np.array]): The (batch_size, ...) state fluents.
+            action (Dict[str, np.array]): The (batch_size, ...) action fluents.
+
+        Returns:
+            next_state (Dict[str, np.array]): The (batch_size, ...) next states.
+            reward (np.array): The (batch_size,) rewards.
+            info (Dict[str, np.array]): The (batch_size, ...) interm fluents.
+        """
+        batch_size = len(next(iter(state.values())))
+        state_inputs, action_inputs, ops = self._get_batch_ops(batch_size)
+
+        interms_, next_state_, reward_ = self._sess.run(
+            ops,
+            feed_dict={
+                **{state_inputs[name]: state[name] for name in state_inputs},
+                **{action_inputs[name]: action[name] for name in action_inputs},
+            },
+        )
+
+        domain = self._compiler.rddl.domain
+        next_state_ = OrderedDict(
+            (name, _batch(value, batch_size))
+            for name, value in zip(domain.state_fluent_ordering, next_state_)
+        )
+        interms_ = OrderedDict(
+            (name, _batch(value, batch_size))
+            for name, value in zip(domain.interm_fluent_ordering, interms_)
+        )
+        reward_ = _batch(np.reshape(reward_, (-1,)), batch_size)
+
+        return next_state_, reward_, interms_
+
     def reset(self):
         """Resets the environment state and timestep."""
         self._timestep = 0
@@ -222,10 +299,57 @@ class RDDLEnv(gym.Env):
 
         return next_state_, reward_, done, info
 
+    def seed(self, seed=None):
+        """Seeds the action and observation spaces' random number generators
+        and the TensorFlow ops sampling the RDDL model's random variables.
+
+        The random ops of the graph (including batch ops built later) are
+        given op-level seeds derived from `seed` and their names, and a new
+        tf.Session is created so that the sequence of samples restarts:
+        episodes run after the same `seed` sample the same random variables.
+        A None `seed` makes the random ops nondeterministic again.
+
+        Returns:
+            List[int]: The list of seeds.
+        """
+        self.action_space.seed(seed)
+        self.observation_space.seed(seed)
+
+        if seed is not None or self._seed is not None:
+            self._seed = seed
+            self._seed_random_ops(self._graph.get_operations())
+
+            # random ops only read their seeds when their kernels are created
+            self._sess.close()
+            self._sess = tf.Session(graph=self._graph, config=self._config_proto)
+
+        return [seed]
+
+    def _seed_random_ops(self, ops):
+        """Sets the op-level seeds of the random ops in `ops`: (seed, hash of
+        the op name), or (0, 0) for TensorFlow to pick random seeds."""
+        # pylint: disable=protected-access
+        for op in ops:
+            if "seed2" not in op.node_def.attr:
+                continue
+            seed, seed2 = 0, 0
+            if self._seed is not None:
+                seed, seed2 = self._seed, zlib.crc32(op.name.encode("utf-8")) + 1
+            op._set_attr("seed", attr_value_pb2.AttrValue(i=seed))
+            op._set_attr("seed2", attr_value_pb2.AttrValue(i=seed2))
+
     def close(self):
         """Release resources by closing current tf.Session."""
         self._sess.close()
+        self.closed = True
 
     def render(self, mode="human"):
         """Renders the current state of the environment."""
         return
+
+
+def _batch(value, batch_size):
+    """Repeats `value` along its first axis if it has no batch dimension."""
+    if value.shape[0] != batch_size:
+        value = np.repeat(value[:1], batch_size, axis=0)
+    return value
@@ -0,0 +1,237 @@
+# This file is part of rddlgym.
+
+# rddlgym is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# rddlgym is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with rddlgym. If not, see <http://www.gnu.org/licenses/>.
+
+"""Parametric instance generators for scaling studies.
+
+Each generator returns a complete RDDL file: the domain block of a bundled
+file (the template) followed by generated non-fluents and instance blocks
+with the requested number of objects. Use `generate` to write it to a file
+that can be given to `rddlgym.make` (or registered with
+`rddlgym.registry.register`).
+"""
+
+# pylint: disable=missing-docstring
+
+
+from collections import OrderedDict
+import os
+import re
+
+import numpy as np
+
+from rddlgym.registry import get_registry
+
+
+_NON_FLUENTS = re.compile(r"^non-fluents\s", re.MULTILINE)
+
+
+def domain_block(template):
+    """Returns the domain block (with its header comments) of the `template`
+    RDDL domain/instance id."""
+    with open(get_registry().filepath(template), "r") as file:
+        rddl = file.read()
+
+    match = _NON_FLUENTS.search(rddl)
+    if match is None:
+        raise ValueError("Couldn't find non-fluents block in {}".format(template))
+
+    return rddl[: match.start()].rstrip() + "\n"
+
+
+def reservoir(size, seed=None, horizon=40, template="Reservoir-8"):
+    """Returns a Reservoir instance with `size` reservoirs.
+
+    The reservoirs form a random tree draining into the last reservoir (the
+    sink): each one flows into a reservoir chosen uniformly among the ones
+    with a greater index.
+    """
+    if size < 2:
+        raise ValueError("Reservoir requires at least 2 reservoirs.")
+
+    rng = np.random.RandomState(seed)
+    name = "res_g{}".format(size)
+    res = ["t{}".format(i) for i in range(1, size + 1)]
+
+    capacities = rng.uniform(100.0, 1000.0, size=size)
+    scales = rng.uniform(1.0, 30.0, size=size)
+
+    non_fluents = []
+    for i, (cap, scale) in enumerate(zip(capacities, scales)):
+        non_fluents.append("RAIN_SHAPE({}) = 1.0;".format(res[i]))
+        non_fluents.append("RAIN_SCALE({}) = {:.1f};".format(res[i], scale))
+        non_fluents.append("MAX_RES_CAP({}) = {:.1f};".format(res[i], cap))
+        non_fluents.append("UPPER_BOUND({}) = {:.1f};".format(res[i], cap - 20.0))
+    for i in range(size - 1):
+        j = rng.randint(i + 1, size)
+        non_fluents.append("DOWNSTREAM({},{});".format(res[i], res[j]))
+    non_fluents.append("SINK_RES({});".format(res[-1]))
+
+    init_state = [
+        "rlevel({}) = {:.1f};".format(r, level)
+        for r, level in zip(res, rng.uniform(0.3, 0.7, size=size) * capacities)
+    ]
+
+    return _rddl(
+        template,
+        name,
+        domain="reservoir",
+        objects=OrderedDict([("res", res)]),
+        non_fluents=non_fluents,
+        init_state=init_state,
+        max_nondef_actions="pos-inf",
+        horizon=horizon,
+    )
+
+
+def navigation(size, seed=None, horizon=20, template="Navigation-v2"):
+    """Returns a 2D Navigation instance with `size` deceleration zones.
+
+    Zone centers are sampled uniformly in the [0, 10] x [0, 10] grid, with
+    the agent starting at (1, 1) and the goal at (8, 9).
+    """
+    if size < 1:
+        raise ValueError("Navigation requires at least 1 deceleration zone.")
+
+    rng = np.random.RandomState(seed)
+    name = "nav_g{}".format(size)
+    zones = ["z{}".format(i) for i in range(1, size + 1)]
+
+    non_fluents = ["GOAL(x) = 8.0;", "GOAL(y) = 9.0;"]
+    centers = rng.uniform(0.0, 10.0, size=(size, 2))
+    decays = rng.uniform(1.0, 2.0, size=size)
+    for zone, (x, y), decay in zip(zones, centers, decays):
+        non_fluents.append("DECELERATION_ZONE_CENTER({}, x) = {:.2f};".format(zone, x))
+        non_fluents.append("DECELERATION_ZONE_CENTER({}, y) = {:.2f};".format(zone, y))
+        non_fluents.append("DECELERATION_ZONE_DECAY({}) = {:.2f};".format(zone, decay))
+
+    return _rddl(
+        template,
+        name,
+        domain="Navigation",
+        objects=OrderedDict([("dim", ["x", "y"]), ("zone", zones)]),
+        non_fluents=non_fluents,
+        init_state=["location(x) = 1.0;", "location(y) = 1.0;"],
+        max_nondef_actions=2,
+        horizon=horizon,
+    )
+
+
+def sysadmin(size, seed=None, horizon=40, connections=2, template="Sysadmin-1"):
+    """Returns a Sysadmin instance with `size` computers, each one connected
+    to `connections` other computers chosen uniformly at random."""
+    # pylint: disable=too-many-arguments
+    if size < 2:
+        raise ValueError("Sysadmin requires at least 2 computers.")
+
+    rng = np.random.RandomState(seed)
+    name = "sysadmin_g{}".format(size)
+    computers = ["c{}".format(i) for i in range(1, size + 1)]
+
+    non_fluents = ["REBOOT-PROB = 0.05;"]
+    for i, computer in enumerate(computers):
+        others = [j for j in range(size) if j != i]
+        for j in sorted(rng.choice(others, min(connections, size - 1), replace=False)):
+            non_fluents.append("CONNECTED({},{});".format(computer, computers[j]))
+
+    return _rddl(
+        template,
+        name,
+        domain="sysadmin_mdp",
+        objects=OrderedDict([("computer", computers)]),
+        non_fluents=non_fluents,
+        init_state=["running({});".format(computer) for computer in computers],
+        max_nondef_actions=1,
+        horizon=horizon,
+    )
+
+
+GENERATORS = OrderedDict(
+    [("Reservoir", reservoir), ("Navigation", navigation), ("Sysadmin", sysadmin)]
+)
+
+
+def instance_id(name, size, seed=None):
+    """Returns the id (i.e., file name) of a generated instance."""
+    rddl = "{}-g{}".format(name, size)
+    if seed is not None:
+        rddl += "-s{}".format(seed)
+    return rddl
+
+
+def generate(name, size, dirpath, seed=None, **kwargs):
+    """Writes a generated instance to `dirpath` and returns its filepath.
+
+    Args:
+        name (str): The generator name (see `GENERATORS`).
+        size (int): The number of objects.
+        dirpath (str): The output directory.
+        seed (Optional[int]): The random seed.
+        kwargs: Additional generator arguments (e.g., horizon).
+
+    Returns:
+        str: The RDDL filepath (see `instance_id`).
+    """
+    if name not in GENERATORS:
+        raise ValueError("Invalid generator: {}".format(name))
+
+    rddl = GENERATORS[name](size, seed=seed, **kwargs)
+
+    os.makedirs(dirpath, exist_ok=True)
+    filepath = os.path.join(dirpath, "{}.rddl".format(instance_id(name, size, seed)))
+    with open(filepath, "w") as file:
+        file.write(rddl)
+
+    return filepath
+
+
+def _rddl(
+    template,
+    name,
+    domain,
+    objects,
+    non_fluents,
+    init_state,
+    max_nondef_actions,
+    horizon,
+):
+    # pylint: disable=too-many-arguments
+    objects = [
+        "{}: {{{}}};".format(obj_type, ", ".join(names))
+        for obj_type, names in objects.items()
+    ]
+
+    lines = [domain_block(template)]
+    lines.append("non-fluents nf_{} {{".format(name))
+    lines.append("    domain = {};".format(domain))
+    lines.append("    objects {")
+    lines.extend("        {}".format(line) for line in objects)
+    lines.append("    };")
+    lines.append("    non-fluents {")
+    lines.extend("        {}".format(line) for line in non_fluents)
+    lines.append("    };")
+    lines.append("}")
+    lines.append("")
+    lines.append("instance inst_{} {{".format(name))
+    lines.append("    domain = {};".format(domain))
+    lines.append("    non-fluents = nf_{};".format(name))
+    lines.append("    init-state {")
+    lines.extend("        {}".format(line) for line in init_state)
+    lines.append("    };")
+    lines.append("    max-nondef-actions = {};".format(max_nondef_actions))
+    lines.append("    horizon = {};".format(horizon))
+    lines.append("    discount = 1.0;")
+    lines.append("}")
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,116 @@
+# This file is part of rddlgym.
+
+# rddlgym is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# rddlgym is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with rddlgym. If not, see <http://www.gnu.org/licenses/>.
+
+# pylint: disable=missing-docstring,unused-argument
+
+
+from collections import namedtuple
+
+
+FIELDS = ("state", "action", "reward", "next_state", "info", "done", "latency")
+
+Step = namedtuple("Step", ("timestep",) + FIELDS)
+
+
+class Hook:
+    """Hook is the base class of `rddlgym.Runner` callbacks.
+
+    Subclasses declare in `fields` which `Step` fields they read in
+    `on_step`; fields not requested by any of the runner's hooks are None
+    (and step latencies are only measured if requested, recorded or needed
+    to enforce a deadline, see `rddlgym.Runner`).
+    Fluent fields are the runner's own dicts and must not be modified.
+    If `flush_every` is set, `on_flush` is called every `flush_every`
+    steps and at the end of each episode, so that hooks can accumulate
+    steps and process them in batches.
+    """
+
+    fields = ()
+    flush_every = None
+
+    def on_episode_start(self, runner, state, timestep):
+        """Called after the env is reset."""
+
+    def on_step(self, step):
+        """Called after each env step with a `Step`.
+
+        Returns:
+            bool: If True, the runner stops the episode after this step.
+        """
+
+    def on_flush(self):
+        """Called every `flush_every` steps and at the end of the episode."""
+
+    def on_episode_end(self, runner, trajectory):
+        """Called after the episode's last step."""
+
+
+class HookList:
+    """HookList dispatches runner events to a list of hooks.
+
+    Args:
+        hooks (Optional[Sequence[Hook]]): The hooks.
+    """
+
+    def __init__(self, hooks=None):
+        self.hooks = list(hooks or [])
+
+        fields = set()
+        for hook in self.hooks:
+            invalid = set(hook.fields) - set(FIELDS)
+            if invalid:
+                raise ValueError("Invalid hook fields: {}".format(sorted(invalid)))
+            fields.update(hook.fields)
+        self.fields = fields
+        self._mask = tuple(field in fields for field in FIELDS)
+
+        self._counts = [0] * len(self.hooks)
+
+    def on_episode_start(self, runner, state, timestep):
+        for hook in self.hooks:
+            hook.on_episode_start(runner, state, timestep)
+
+    def on_step(self, timestep, state, action, reward, next_state, info, done, latency):
+        """Returns True if any hook requested to stop the episode."""
+        # pylint: disable=too-many-arguments
+        values = (state, action, reward, next_state, info, done, latency)
+        step = Step(
+            timestep,
+            *(value if wanted else None for value, wanted in zip(values, self._mask))
+        )
+
+        stop = False
+        for i, hook in enumerate(self.hooks):
+            stop = bool(hook.on_step(step)) or stop
+
+            if hook.flush_every:
+                self._counts[i] += 1
+                if self._counts[i] % hook.flush_every == 0:
+                    hook.on_flush()
+
+        return stop
+
+    def on_episode_end(self, runner, trajectory):
+        for i, hook in enumerate(self.hooks):
+            if hook.flush_every and self._counts[i] % hook.flush_every != 0:
+                hook.on_flush()
+            self._counts[i] = 0
+            hook.on_episode_end(runner, trajectory)
+
+    def __bool__(self):
+        return bool(self.hooks)
+
+    def __len__(self):
+        return len(self.hooks)
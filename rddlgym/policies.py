@@ -0,0 +1,200 @@
+# This file is part of rddlgym.
+
+# rddlgym is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# rddlgym is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with rddlgym. If not, see <http://www.gnu.org/licenses/>.
+
+# pylint: disable=missing-docstring,protected-access
+
+
+from collections import namedtuple, OrderedDict
+import weakref
+
+import numpy as np
+import tensorflow as tf
+
+
+Sampler = namedtuple("Sampler", "state_inputs seed actions stateful")
+
+# sampling ops of each env by batch size
+_SAMPLERS = weakref.WeakKeyDictionary()
+
+
+def max_nondef_actions(env):
+    """Returns the instance's max-nondef-actions (None if unbounded)."""
+    value = getattr(env._compiler.rddl.instance, "max_nondef_actions", "pos-inf")
+    return None if value == "pos-inf" else int(value)
+
+
+def build_sampler(env, batch_size):
+    """Returns the (lazily built) `Sampler` of `env` for (batch_size, ...)
+    states, i.e., its state and seed inputs, action sampling ops and whether
+    the action bounds depend on the state.
+
+    Real and int actions are sampled uniformly within the bounds given by
+    the domain's action-preconditions, evaluated on the sampler's own state
+    placeholders (no copy of the model's CPFs and reward is built for the
+    batch size). As in gym's Box spaces, half-bounded actions are sampled
+    from shifted exponentials and unbounded ones from standard normals. Bool
+    actions are true with probability 0.5, among at most max-nondef-actions
+    randomly chosen ones.
+
+    The ops are stateless: their samples are a function of the (2,) int64
+    seed input.
+    """
+    samplers = _SAMPLERS.setdefault(env, {})
+    if batch_size in samplers:
+        return samplers[batch_size]
+
+    compiler = env._compiler
+    default_batch_size = compiler.batch_size
+    compiler.batch_size = batch_size
+    try:
+        with compiler.graph.as_default():
+            with tf.compat.v1.name_scope("random_policy_{}".format(batch_size)):
+                state_inputs = env._build_state_inputs(batch_size)
+                seed = tf.compat.v1.placeholder(tf.int64, shape=(2,), name="seed")
+                state = list(state_inputs.values())
+                bounds = compiler.action_bound_constraints(state)
+                actions = _sample_actions(env, batch_size, seed, bounds)
+    finally:
+        compiler.batch_size = default_batch_size
+
+    stateful = any(
+        bound.shape.batch for pair in bounds.values() for bound in pair if bound
+    )
+    samplers[batch_size] = Sampler(state_inputs, seed, actions, stateful)
+    return samplers[batch_size]
+
+
+def _sample_actions(env, batch_size, seed, bounds):
+    fluents = OrderedDict(env._compiler.default_action_fluents)
+    seeds = (tf.stack([seed[0], seed[1] + i]) for i in range(2 * len(fluents) + 2))
+
+    actions = OrderedDict()
+    for name, fluent in fluents.items():
+        if fluent.dtype == tf.bool:
+            continue
+
+        shape = (batch_size, *fluent.shape.fluent_shape)
+        lower, upper = (_broadcast(bound, shape) for bound in bounds[name])
+        uniform = tf.random.stateless_uniform(shape, next(seeds))
+
+        if lower is not None and upper is not None:
+            if fluent.dtype.is_integer:
+                value = tf.floor(lower + uniform * (upper - lower + 1))
+                value = tf.minimum(value, upper)
+            else:
+                value = lower + uniform * (upper - lower)
+        elif lower is not None:
+            value = lower - tf.math.log1p(-uniform)
+        elif upper is not None:
+            value = upper + tf.math.log1p(-uniform)
+        else:
+            value = tf.random.stateless_normal(shape, next(seeds))
+
+        if fluent.dtype.is_integer:
+            value = tf.round(value)
+        actions[name] = tf.cast(value, fluent.dtype, name=name.replace("/", "-"))
+
+    bools = [(name, f) for name, f in fluents.items() if f.dtype == tf.bool]
+    if bools:
+        sizes = [int(np.prod(fluent.shape.fluent_shape)) for _, fluent in bools]
+        total = sum(sizes)
+
+        values = tf.random.stateless_uniform((batch_size, total), next(seeds)) < 0.5
+        max_nondef = max_nondef_actions(env)
+        if max_nondef is not None and max_nondef < total:
+            scores = tf.random.stateless_uniform((batch_size, total), next(seeds))
+            _, indices = tf.nn.top_k(scores, k=max_nondef)
+            chosen = tf.reduce_max(tf.one_hot(indices, total), axis=1) > 0
+            values = tf.logical_and(values, chosen)
+
+        for (name, fluent), value in zip(bools, tf.split(values, sizes, axis=1)):
+            shape = (batch_size, *fluent.shape.fluent_shape)
+            actions[name] = tf.reshape(value, shape, name=name.replace("/", "-"))
+
+    return OrderedDict((name, actions[name]) for name in fluents)
+
+
+def _broadcast(bound, shape):
+    if bound is None:
+        return None
+    return tf.broadcast_to(tf.cast(bound.tensor, tf.float32), shape)
+
+
+class RandomPolicy:
+    """RandomPolicy samples random actions within the domain's action bounds.
+
+    Actions are sampled by TensorFlow ops in the env's graph (see
+    `build_sampler`). If the bounds don't depend on the state, the actions
+    of a whole horizon are sampled at once by a single session run, at the
+    start of each episode (timestep 0) and whenever the timestep runs past
+    the ones sampled in advance (e.g., after `set_horizon`).
+
+    The class itself is a picklable planner factory (`RandomPolicy(env)`)
+    that can be given to `rddlgym.Runner.run_many`.
+
+    Args:
+        env (rddlgym.RDDLEnv): The RDDLEnv gym environment.
+        seed (Optional[int]): The random seed.
+    """
+
+    def __init__(self, env, seed=None):
+        self.env = env
+        self.seed(seed)
+
+    def seed(self, seed=None):
+        """Reseeds the policy (and drops the actions sampled in advance)."""
+        self._rng = np.random.RandomState(seed)
+        self._actions = None
+        self._start = 0
+
+    def __call__(self, state, timestep):
+        # pylint: disable=unused-argument
+        if build_sampler(self.env, 1).stateful:
+            action = self.sample(
+                OrderedDict((name, value[np.newaxis]) for name, value in state.items())
+            )
+            return OrderedDict((name, value[0]) for name, value in action.items())
+
+        index = timestep - self._start
+        if timestep == 0 or not 0 <= index < len(self._actions or []):
+            horizon = self.env.horizon
+            actions = self._run(build_sampler(self.env, horizon))
+            self._actions = [
+                OrderedDict((name, value[t]) for name, value in actions.items())
+                for t in range(horizon)
+            ]
+            self._start, index = timestep, 0
+        return self._actions[index]
+
+    def sample(self, state):
+        """Returns a batch of random actions.
+
+        Args:
+            state (Dict[str, np.array]): The (batch_size, ...) state fluents.
+
+        Returns:
+            Dict[str, np.array]: The (batch_size, ...) action fluents.
+        """
+        batch_size = len(next(iter(state.values())))
+        sampler = build_sampler(self.env, batch_size)
+        feed_dict = {
+            sampler.state_inputs[name]: state[name] for name in sampler.state_inputs
+        }
+        return self._run(sampler, feed_dict)
+
+    def _run(self, sampler, feed_dict=None):
+        feed_dict = dict(feed_dict or {})
+        feed_dict[sampler.seed] = self._rng.randint(np.iinfo(np.int32).max, size=2)
+        return self.env._sess.run(sampler.actions, feed_dict=feed_dict)
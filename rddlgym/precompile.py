@@ -0,0 +1,198 @@
+# This file is part of rddlgym.
+
+# rddlgym is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# rddlgym is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with rddlgym. If not, see <http://www.gnu.org/licenses/>.
+
+"""Prebuilt on-disk AST caches.
+
+`precompile` parses RDDL files (in parallel) into a cache directory that
+`rddlgym.utils.parse_model` reads when the `RDDLGYM_CACHE_DIR` environment
+variable points to it::
+
+    <dirpath>/<sha1>-pyrddl-<version>.pkl
+    <dirpath>/index.json
+
+The index records the source of each entry by registry id (for registered
+files) or by path relative to the cache directory, so that a cache can be
+moved along with its sources or used by another install of rddlgym.
+
+TensorFlow graphs can't be serialized in a form the rddl2tf compilers can
+reuse, so only parsing (not graph compilation) is moved out of job start.
+"""
+
+# pylint: disable=missing-docstring,protected-access
+
+
+from collections import OrderedDict
+import fnmatch
+import glob
+import json
+import multiprocessing
+import os
+import pickle
+
+from rddlgym import utils
+from rddlgym.registry import get_registry
+
+
+INDEX_FILENAME = "index.json"
+
+
+def resolve(patterns=None):
+    """Returns the RDDL filepaths by id of the given ids, filepaths or glob
+    patterns of either (all bundled files by default)."""
+    registry = get_registry()
+    if not patterns:
+        return OrderedDict(
+            (rddl, registry.filepath(rddl)) for rddl in registry.bundled()
+        )
+
+    filepaths = OrderedDict()
+    for pattern in patterns:
+        matches = [
+            (rddl, registry.filepath(rddl))
+            for rddl in fnmatch.filter(list(registry.index), pattern)
+        ]
+        matches += [
+            (os.path.splitext(os.path.basename(path))[0], os.path.abspath(path))
+            for path in sorted(glob.glob(pattern))
+            if os.path.isfile(path)
+        ]
+        if not matches:
+            raise ValueError("Couldn't find RDDL domain: {}".format(pattern))
+        filepaths.update(matches)
+
+    return filepaths
+
+
+def precompile(patterns=None, dirpath=None, workers=None):
+    """Parses the RDDL files given by `patterns` into the cache `dirpath`.
+
+    Args:
+        patterns (Optional[Sequence[str]]): The RDDL ids, filepaths or glob
+            patterns (see `resolve`).
+        dirpath (Optional[str]): The cache directory. Defaults to the
+            `RDDLGYM_CACHE_DIR` environment variable.
+        workers (Optional[int]): The number of worker processes (defaults
+            to the number of CPUs).
+
+    Returns:
+        OrderedDict: The index with the "filepath", cache "key" and "status"
+        ("compiled" or "cached") by id.
+    """
+    dirpath = _cache_dir(dirpath)
+    os.makedirs(dirpath, exist_ok=True)
+
+    filepaths = resolve(patterns)
+    workers = min(workers or os.cpu_count() or 1, len(filepaths)) or 1
+
+    args = [(filepath, dirpath) for filepath in filepaths.values()]
+    if workers == 1:
+        results = [_precompile_file(*arg) for arg in args]
+    else:
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(processes=workers) as pool:
+            results = pool.starmap(_precompile_file, args)
+
+    registry = get_registry()
+    index = read_index(dirpath)
+    report = OrderedDict()
+    for (rddl, filepath), (key, status) in zip(filepaths.items(), results):
+        if rddl in registry and registry.filepath(rddl) == filepath:
+            source = ("rddl", rddl)
+        else:
+            source = ("filepath", os.path.relpath(filepath, dirpath))
+        index[rddl] = OrderedDict([source, ("key", key)])
+        report[rddl] = OrderedDict(
+            [("filepath", filepath), ("key", key), ("status", status)]
+        )
+
+    data = json.dumps(index, indent=4).encode("utf-8")
+    utils.write_atomic(os.path.join(dirpath, INDEX_FILENAME), data)
+
+    return report
+
+
+def verify(dirpath=None):
+    """Checks that the entries in the cache `dirpath` still match their
+    source files.
+
+    Returns:
+        OrderedDict: The status by id: "ok", "stale" (the source changed),
+        "missing" (no cache entry), "corrupt" (the entry can't be loaded)
+        or "no-source" (the source file was removed).
+    """
+    dirpath = _cache_dir(dirpath)
+
+    status = OrderedDict()
+    for rddl, record in read_index(dirpath).items():
+        filepath = source_path(dirpath, record)
+        if filepath is None or not os.path.isfile(filepath):
+            status[rddl] = "no-source"
+            continue
+
+        key = utils.model_key(utils.read_model(filepath))
+        path = utils.model_path(dirpath, key)
+        if key != record["key"]:
+            status[rddl] = "stale"
+        elif not os.path.isfile(path):
+            status[rddl] = "missing"
+        else:
+            try:
+                with open(path, "rb") as file:
+                    pickle.loads(file.read())
+                status[rddl] = "ok"
+            except Exception:  # pylint: disable=broad-except
+                status[rddl] = "corrupt"
+
+    return status
+
+
+def source_path(dirpath, record):
+    """Returns the RDDL file of the index `record` of the cache `dirpath`
+    (None if its registry id is no longer registered)."""
+    if "rddl" in record:
+        registry = get_registry()
+        return registry.filepath(record["rddl"]) if record["rddl"] in registry else None
+    return os.path.normpath(os.path.join(dirpath, record["filepath"]))
+
+
+def read_index(dirpath):
+    """Returns the index of the cache `dirpath` (empty if none)."""
+    filepath = os.path.join(dirpath, INDEX_FILENAME)
+    if not os.path.exists(filepath):
+        return OrderedDict()
+
+    with open(filepath, "r") as file:
+        return json.loads(file.read(), object_pairs_hook=OrderedDict)
+
+
+def _cache_dir(dirpath):
+    dirpath = dirpath or utils.cache_dir()
+    if dirpath is None:
+        raise ValueError(
+            "No cache directory given (set {}).".format(utils.CACHE_DIR_ENV)
+        )
+    return dirpath
+
+
+def _precompile_file(filepath, dirpath):
+    rddl = utils.read_model(filepath)
+    key = utils.model_key(rddl)
+
+    if os.path.isfile(utils.model_path(dirpath, key)):
+        return key, "cached"
+
+    data = pickle.dumps(utils._parse(rddl), protocol=pickle.HIGHEST_PROTOCOL)
+    utils.write_model(dirpath, key, data)
+    return key, "compiled"
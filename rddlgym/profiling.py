@@ -0,0 +1,220 @@
+# This file is part of rddlgym.
+
+# rddlgym is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# rddlgym is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with rddlgym. If not, see <http://www.gnu.org/licenses/>.
+
+"""Profiling of the TensorFlow ops and Python frames of env steps.
+
+`profile` writes to its logdir::
+
+    <logdir>/timeline.json   (Chrome trace, open in chrome://tracing)
+    <logdir>/profile.pstats  (cProfile stats, read with pstats or snakeviz)
+    <logdir>/ops.json        (per-op and per-fluent op times)
+"""
+
+# pylint: disable=missing-docstring,protected-access
+
+
+from collections import OrderedDict
+import cProfile
+import json
+import os
+
+import tensorflow as tf
+from tensorflow.python.client import timeline
+
+from rddlgym.policies import RandomPolicy
+
+
+TIMELINE_FILENAME = "timeline.json"
+PSTATS_FILENAME = "profile.pstats"
+OPS_FILENAME = "ops.json"
+
+_SCOPES = OrderedDict(
+    [
+        ("intermediate_cpfs", "interm"),
+        ("state_cpfs", "state"),
+        ("action_cpfs", "action"),
+        ("state_input", "input"),
+        ("action_inputs", "input"),
+    ]
+)
+
+
+def op_owner(name):
+    """Returns the CPF (e.g., "state rlevel/1" or "interm rainfall/1"),
+    "reward", "input", "policy" or "other" that the op `name` belongs to."""
+    scopes = name.split("/")
+    if scopes[0].startswith("batch_"):
+        scopes = scopes[1:]
+
+    owner = _SCOPES.get(scopes[0])
+    if owner in ("interm", "state", "action") and len(scopes) > 1:
+        fluent = scopes[1].rsplit("-", 1)
+        return "{} {}".format(owner, "/".join(fluent))
+    if owner is not None:
+        return owner
+    if scopes[0] == "reward" or scopes[0].startswith("reward_"):
+        return "reward"
+    if scopes[0].startswith("random_policy_"):
+        return "policy"
+    return "other"
+
+
+class TracingSession:
+    """TracingSession wraps a tf.Session to trace every `run` call and keep
+    the resulting tf.RunMetadata."""
+
+    def __init__(self, sess):
+        self._sess = sess
+        self.run_metadata = []
+
+    def run(self, fetches, feed_dict=None, options=None, run_metadata=None):
+        # pylint: disable=unused-argument
+        options = tf.compat.v1.RunOptions(
+            trace_level=tf.compat.v1.RunOptions.FULL_TRACE
+        )
+        metadata = tf.compat.v1.RunMetadata()
+        result = self._sess.run(
+            fetches, feed_dict=feed_dict, options=options, run_metadata=metadata
+        )
+        self.run_metadata.append(metadata)
+        return result
+
+    def __getattr__(self, name):
+        return getattr(self._sess, name)
+
+
+def chrome_trace(run_metadata):
+    """Returns the Chrome trace (as a dict) of a sequence of tf.RunMetadata."""
+    events, seen = [], set()
+    for metadata in run_metadata:
+        trace = json.loads(
+            timeline.Timeline(metadata.step_stats).generate_chrome_trace_format()
+        )
+        for event in trace["traceEvents"]:
+            if event.get("ph") == "M":
+                key = json.dumps(event, sort_keys=True)
+                if key in seen:
+                    continue
+                seen.add(key)
+            events.append(event)
+    return {"traceEvents": events}
+
+
+def op_stats(run_metadata):
+    """Returns the per-op count and total time (in microseconds) of a
+    sequence of tf.RunMetadata, sorted by decreasing total time."""
+    stats = OrderedDict()
+    for metadata in run_metadata:
+        for node in _node_stats(metadata.step_stats):
+            name, _, op = node.node_name.partition(":")
+            if name.startswith("_"):
+                continue
+            label = node.timeline_label.partition(" = ")[2]
+            record = stats.setdefault(
+                name,
+                OrderedDict(
+                    [
+                        ("op", label.split("(")[0] or op),
+                        ("owner", op_owner(name)),
+                        ("count", 0),
+                        ("total_us", 0),
+                    ]
+                ),
+            )
+            record["count"] += 1
+            record["total_us"] += node.all_end_rel_micros
+
+    return OrderedDict(
+        sorted(stats.items(), key=lambda item: item[1]["total_us"], reverse=True)
+    )
+
+
+def _node_stats(step_stats):
+    # ops may also be reported by the host tracer (on "/host:CPU"), so
+    # these are only used when there are no device stats
+    dev_stats = step_stats.dev_stats
+    devices = [dev for dev in dev_stats if not dev.device.startswith("/host:")]
+    for device in devices or dev_stats:
+        for node in device.node_stats:
+            yield node
+
+
+def owner_stats(stats):
+    """Returns the total op time (in microseconds) by CPF/fluent."""
+    totals = OrderedDict()
+    for record in stats.values():
+        totals[record["owner"]] = totals.get(record["owner"], 0) + record["total_us"]
+    return OrderedDict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+
+def profile(env, logdir, policy=None, steps=100, top_k=20):
+    """Runs `steps` env steps, tracing TF ops and profiling Python frames.
+
+    Args:
+        env (rddlgym.RDDLEnv): The RDDLEnv gym environment.
+        logdir (str): The output directory.
+        policy (Optional[Callable]): The (state, timestep) policy. Defaults
+            to `rddlgym.policies.RandomPolicy`.
+        steps (int): The number of profiled steps (the env is reset at the
+            end of each episode).
+        top_k (int): The number of most expensive ops in the report.
+
+    Returns:
+        OrderedDict: The report with the number of "steps", the "top_ops"
+        (the `top_k` most expensive ops, see `op_stats`) and the op time
+        by fluent ("owners").
+
+    Note that tracing adds overhead to every TF run call, so absolute
+    timings are higher than in untraced runs.
+    """
+    policy = policy or RandomPolicy(env)
+
+    os.makedirs(logdir, exist_ok=True)
+
+    sess = env._sess
+    tracing = TracingSession(sess)
+    profiler = cProfile.Profile()
+
+    state, timestep = env.reset()
+
+    env._sess = tracing
+    try:
+        profiler.enable()
+        for _ in range(steps):
+            action = policy(state, timestep)
+            state, _, done, _ = env.step(action)
+            timestep = env.timestep
+            if done:
+                state, timestep = env.reset()
+        profiler.disable()
+    finally:
+        env._sess = sess
+
+    profiler.dump_stats(os.path.join(logdir, PSTATS_FILENAME))
+
+    with open(os.path.join(logdir, TIMELINE_FILENAME), "w") as file:
+        json.dump(chrome_trace(tracing.run_metadata), file)
+
+    stats = op_stats(tracing.run_metadata)
+
+    report = OrderedDict()
+    report["steps"] = steps
+    report["top_ops"] = OrderedDict(list(stats.items())[:top_k])
+    report["owners"] = owner_stats(stats)
+
+    with open(os.path.join(logdir, OPS_FILENAME), "w") as file:
+        json.dump(OrderedDict([("ops", stats), ("owners", report["owners"])]), file)
+
+    return report
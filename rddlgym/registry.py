@@ -0,0 +1,255 @@
+# This file is part of rddlgym.
+
+# rddlgym is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# rddlgym is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with rddlgym. If not, see <http://www.gnu.org/licenses/>.
+
+"""Indexed registry of bundled and user-registered RDDL files."""
+
+# pylint: disable=missing-docstring
+
+
+from collections import OrderedDict, namedtuple
+import json
+import os
+import re
+import threading
+
+
+FILES_DIR = os.path.join(os.path.dirname(__file__), "files")
+DB_FILENAME = "all.json"
+PATH_ENV = "RDDLGYM_PATH"
+
+_COMMENT = re.compile(r"//[^\n]*")
+_DOMAIN = re.compile(r"\bdomain\s+([\w-]+)\s*\{")
+_INSTANCE = re.compile(r"\binstance\s+([\w-]+)\s*\{")
+_REQUIREMENTS = re.compile(r"\brequirements\s*=\s*\{([^}]*)\}")
+
+
+Entry = namedtuple("Entry", "id filepath domain instance requirements metadata")
+
+
+def scan_file(filepath, metadata=None):
+    """Returns the registry entry of the RDDL file in `filepath`.
+
+    The domain and instance names and requirements are read from the RDDL
+    text without parsing it. Requirements listed in `metadata` take
+    precedence over the ones in the file.
+    """
+    with open(filepath, "r") as file:
+        rddl = _COMMENT.sub("", file.read())
+
+    metadata = dict(metadata or {})
+
+    domain = _DOMAIN.search(rddl)
+    instance = _INSTANCE.search(rddl)
+
+    requirements = metadata.get("requirements")
+    if requirements is None:
+        match = _REQUIREMENTS.search(rddl)
+        requirements = match.group(1).split(",") if match else []
+        metadata["requirements"] = requirements = [
+            req.strip() for req in requirements if req.strip()
+        ]
+
+    return Entry(
+        id=os.path.splitext(os.path.basename(filepath))[0],
+        filepath=os.path.abspath(filepath),
+        domain=domain.group(1) if domain else None,
+        instance=instance.group(1) if instance else None,
+        requirements=frozenset(requirements),
+        metadata=metadata,
+    )
+
+
+class Registry:
+    """Registry indexes RDDL files by id, domain, instance and requirements.
+
+    The bundled files are indexed lazily on first access. User directories
+    are scanned when first needed and rescanned only if their mtime changes.
+    Entries of user directories override bundled entries with the same id,
+    and later registered directories take precedence. The merged index and
+    its domain, instance and requirement maps are cached, and only rebuilt
+    when a directory is (re)scanned.
+
+    Args:
+        dirpaths (Optional[Sequence[str]]): The user directories.
+    """
+
+    def __init__(self, dirpaths=None):
+        self._bundled = None
+        self._dirs = OrderedDict()
+        self._lock = threading.RLock()
+
+        self._index = None
+        self._positions = {}
+        self._maps = {}
+
+        for dirpath in dirpaths or []:
+            self.register(dirpath)
+
+    def register(self, dirpath):
+        """Registers the RDDL files (*.rddl) in the user directory `dirpath`."""
+        if not os.path.isdir(dirpath):
+            raise ValueError("Not a directory: {}".format(dirpath))
+
+        with self._lock:
+            self._dirs.setdefault(os.path.abspath(dirpath), (None, ()))
+
+    @property
+    def index(self):
+        """OrderedDict[str, Entry]: The entries by id."""
+        return OrderedDict(self._entries())
+
+    def bundled(self):
+        """Returns the ids of the bundled RDDL files."""
+        return [entry.id for entry in self._bundled_entries()]
+
+    def get(self, rddl):
+        """Returns the entry of the `rddl` id."""
+        entry = self._entries().get(rddl)
+        if entry is None:
+            raise ValueError("Couldn't find RDDL domain: {}".format(rddl))
+        return entry
+
+    def filepath(self, rddl):
+        """Returns the RDDL file of the `rddl` id."""
+        return self.get(rddl).filepath
+
+    def query(self, requires=(), domain=None, instance=None):
+        """Returns the entries matching all the given criteria.
+
+        Args:
+            requires (Iterable[str]): The requirements tags (e.g.,
+                "continuous", "concurrent") all entries must have.
+            domain (Optional[str]): The RDDL domain name.
+            instance (Optional[str]): The RDDL instance name.
+
+        Returns:
+            List[Entry]: The matching entries.
+        """
+        with self._lock:
+            index = self._entries()
+            criteria = [("requirements", tag) for tag in set(requires)]
+            if domain is not None:
+                criteria.append(("domain", domain))
+            if instance is not None:
+                criteria.append(("instance", instance))
+
+            if not criteria:
+                return list(index.values())
+
+            ids = set.intersection(
+                *(self._maps[key].get(value, set()) for key, value in criteria)
+            )
+            return [index[rddl] for rddl in sorted(ids, key=self._positions.get)]
+
+    def requirements(self):
+        """Returns the sorted list of requirements tags of all entries."""
+        with self._lock:
+            self._entries()
+            return sorted(self._maps["requirements"])
+
+    def _entries(self):
+        with self._lock:
+            changed = self._index is None
+            for dirpath in self._dirs:
+                changed = self._scan_dir(dirpath) or changed
+
+            if changed:
+                self._build_index()
+            return self._index
+
+    def _build_index(self):
+        index = OrderedDict((entry.id, entry) for entry in self._bundled_entries())
+        for _, entries in self._dirs.values():
+            for entry in entries:
+                index[entry.id] = entry
+
+        maps = {"domain": {}, "instance": {}, "requirements": {}}
+        for entry in index.values():
+            maps["domain"].setdefault(entry.domain, set()).add(entry.id)
+            maps["instance"].setdefault(entry.instance, set()).add(entry.id)
+            for tag in entry.requirements:
+                maps["requirements"].setdefault(tag, set()).add(entry.id)
+
+        self._index = index
+        self._positions = {rddl: position for position, rddl in enumerate(index)}
+        self._maps = maps
+
+    def _bundled_entries(self):
+        with self._lock:
+            if self._bundled is None:
+                self._bundled = self._scan_bundled()
+            return self._bundled
+
+    def _scan_bundled(self):
+        with open(os.path.join(FILES_DIR, DB_FILENAME), "r") as file:
+            db = json.loads(file.read(), object_pairs_hook=OrderedDict)
+
+        return [
+            scan_file(os.path.join(FILES_DIR, "{}.rddl".format(rddl)), metadata)
+            for rddl, metadata in db.items()
+        ]
+
+    def _scan_dir(self, dirpath):
+        """Rescans `dirpath` if its mtime changed, and returns whether it did."""
+        mtime, _ = self._dirs[dirpath]
+
+        try:
+            current = os.stat(dirpath).st_mtime_ns
+        except FileNotFoundError:
+            current = None
+
+        if current == mtime:
+            return False
+
+        entries = ()
+        if current is not None:
+            entries = tuple(
+                scan_file(os.path.join(dirpath, filename))
+                for filename in sorted(os.listdir(dirpath))
+                if filename.endswith(".rddl")
+            )
+        self._dirs[dirpath] = (current, entries)
+        return True
+
+    def __contains__(self, rddl):
+        return rddl in self._entries()
+
+    def __iter__(self):
+        return iter(list(self._entries()))
+
+    def __len__(self):
+        return len(self._entries())
+
+
+_REGISTRY = None
+_REGISTRY_LOCK = threading.Lock()
+
+
+def get_registry():
+    """Returns the process-wide registry, with the directories listed in the
+    `RDDLGYM_PATH` environment variable registered."""
+    # pylint: disable=global-statement
+    global _REGISTRY
+
+    with _REGISTRY_LOCK:
+        if _REGISTRY is None:
+            dirpaths = os.environ.get(PATH_ENV, "").split(os.pathsep)
+            _REGISTRY = Registry([path for path in dirpaths if os.path.isdir(path)])
+        return _REGISTRY
+
+
+def register(dirpath):
+    """Registers the user directory `dirpath` in the process-wide registry."""
+    get_registry().register(dirpath)
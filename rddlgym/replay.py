@@ -0,0 +1,176 @@
+# This file is part of rddlgym.
+
+# rddlgym is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# rddlgym is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with rddlgym. If not, see <http://www.gnu.org/licenses/>.
+
+"""Batched replay of saved trajectories for regression checking.
+
+Every saved step (state, action) is fed through the compiled transition
+(see `rddlgym.RDDLEnv.transition`) in large batches, and the computed
+next states, interm fluents and rewards are compared with the stored ones.
+Note that stochastic domains are expected to deviate, as the model's
+random variables are resampled.
+"""
+
+# pylint: disable=missing-docstring,too-many-locals
+
+
+from collections import OrderedDict
+import json
+import os
+
+import numpy as np
+
+from rddlgym import storage
+from rddlgym.trajectory import Trajectory
+
+
+def find_trajectories(logdir):
+    """Returns the sorted list of trajectory files (or NPY dirs) in `logdir`."""
+    filepaths = []
+    for dirpath, dirnames, filenames in os.walk(logdir):
+        if storage.SCHEMA_FILENAME in filenames:
+            filepaths.append(dirpath)
+            dirnames[:] = []
+            continue
+
+        for filename in filenames:
+            if os.path.splitext(filename)[1] in (".csv", ".npz"):
+                filepaths.append(os.path.join(dirpath, filename))
+
+    return sorted(filepaths)
+
+
+def find_instance(filepath):
+    """Returns the RDDL instance of the trajectory in `filepath`, as recorded
+    in a campaign manifest or sweep config (or None if not found)."""
+    dirpath = os.path.dirname(os.path.abspath(filepath))
+    for dirname, filename, key in [
+        (dirpath, "manifest.json", "rddl"),
+        (dirpath, "config.json", "instance"),
+        (os.path.dirname(dirpath), "config.json", "instance"),
+    ]:
+        path = os.path.join(dirname, filename)
+        if os.path.exists(path):
+            with open(path, "r") as file:
+                return json.loads(file.read()).get(key)
+    return None
+
+
+def replay(env, filepaths, batch_size=4096):
+    """Replays the trajectories saved in `filepaths` for the given `env`.
+
+    Args:
+        env (rddlgym.RDDLEnv): The RDDLEnv gym environment.
+        filepaths (Sequence[str]): The saved trajectories.
+        batch_size (int): The number of steps per batched transition.
+
+    Returns:
+        OrderedDict: The report with the number of "episodes" and "steps",
+        the maximum absolute deviation of "reward", and the per-fluent
+        maximum absolute deviations of "state" (next states) and "interm".
+    """
+    states, actions, next_states, interms = (OrderedDict() for _ in range(4))
+    rewards, has_next = [], []
+
+    for filepath in filepaths:
+        trajectory = Trajectory.load(filepath, env)
+        length = len(trajectory)
+        if length == 0:
+            continue
+
+        for name, values in trajectory.states.items():
+            values = np.asarray(values)
+            states.setdefault(name, []).append(values)
+            next_states.setdefault(name, []).append(
+                np.concatenate([values[1:], values[-1:]])
+            )
+        for name, values in trajectory.actions.items():
+            actions.setdefault(name, []).append(np.asarray(values))
+        for name, values in trajectory.infos.items():
+            interms.setdefault(name, []).append(np.asarray(values))
+
+        rewards.append(np.asarray(trajectory.rewards))
+        has_next.append(np.arange(length) < length - 1)
+
+    report = OrderedDict(
+        [
+            ("episodes", len(rewards)),
+            ("steps", int(sum(map(len, rewards)))),
+            ("reward", 0.0),
+            ("state", OrderedDict((name, 0.0) for name in states)),
+            ("interm", OrderedDict((name, 0.0) for name in interms)),
+        ]
+    )
+
+    if not rewards:
+        return report
+
+    def _concat(fluents):
+        return OrderedDict(
+            (name, np.concatenate(values)) for name, values in fluents.items()
+        )
+
+    states, actions = _concat(states), _concat(actions)
+    next_states, interms = _concat(next_states), _concat(interms)
+    rewards, has_next = np.concatenate(rewards), np.concatenate(has_next)
+
+    steps = len(rewards)
+    batch_size = min(batch_size, steps)
+
+    for start in range(0, steps, batch_size):
+        # pads the last batch to reuse the compiled batch_size ops
+        indices = np.arange(start, start + batch_size) % steps
+        valid = np.arange(start, start + batch_size) < steps
+
+        next_state_, reward_, interms_ = env.transition(
+            _take(states, indices), _take(actions, indices)
+        )
+
+        report["reward"] = max(
+            report["reward"], _deviation(reward_, rewards[indices], valid)
+        )
+        for name, values in next_state_.items():
+            report["state"][name] = max(
+                report["state"][name],
+                _deviation(
+                    values, next_states[name][indices], valid & has_next[indices]
+                ),
+            )
+        for name, values in interms_.items():
+            report["interm"][name] = max(
+                report["interm"][name],
+                _deviation(values, interms[name][indices], valid),
+            )
+
+    return report
+
+
+def max_deviation(report):
+    """Returns the maximum deviation in `report` across all fluents."""
+    return max(
+        [report["reward"], *report["state"].values(), *report["interm"].values()]
+    )
+
+
+def _take(fluents, indices):
+    return OrderedDict((name, values[indices]) for name, values in fluents.items())
+
+
+def _deviation(computed, stored, mask):
+    if not np.any(mask):
+        return 0.0
+
+    computed = np.asarray(computed, dtype=np.float64)[mask]
+    stored = np.asarray(stored, dtype=np.float64)[mask]
+    return float(np.max(np.abs(computed - stored)))
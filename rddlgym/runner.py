@@ -13,53 +13,188 @@
 # You should have received a copy of the GNU General Public License
 # along with rddlgym. If not, see <http://www.gnu.org/licenses/>.
 
-# pylint: disable=missing-docstring
+# pylint: disable=missing-docstring,protected-access
 
 
-from rddlgym import Trajectory
+from collections import OrderedDict
+from concurrent import futures
+import inspect
+import json
+import multiprocessing
+import os
+import queue
+import shutil
+import threading
+import time
+
+import numpy as np
+
+from rddlgym import storage
+from rddlgym import Trajectory, TrajectoryWriter
+from rddlgym.hooks import HookList
+from rddlgym.utils import make, Mode
+
+
+MANIFEST_FILENAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+
+_WORKER = None
+
+
+def _init_worker(
+    rddl, config, horizon, planner_factory, deadline, fallback, record_latency
+):
+    # pylint: disable=global-statement,too-many-arguments
+    global _WORKER
+
+    env = make(rddl, mode=Mode.GYM, config=config)
+    env.set_horizon(horizon)
+
+    _WORKER = Runner(
+        env,
+        planner_factory(env),
+        deadline=deadline,
+        fallback=fallback,
+        record_latency=record_latency,
+    )
+    _WORKER.build()
+
+
+def _run_episode(episode):
+    # pylint: disable=unused-argument
+    trajectory = _WORKER.run()
+    return list(trajectory), trajectory._latencies
 
 
 class Runner:
     """Runner class implements the planner-environment loop.
 
+    In `run`, steps are only timed if latencies are recorded, requested by
+    a hook or needed to enforce a deadline. If `record_latency` is True or
+    a deadline is given, the planner and env latencies of every step are
+    recorded in the trajectory (see `rddlgym.Trajectory.latency_summary`).
+
     Args:
         env (rddlgym.RDDLEnv): The RDDLEnv gym environment.
         planner (tfplan.planners.Planner): The planner.
         debug (bool): The debug flag.
+        deadline (Optional[float]): The per-step planning time budget in
+            seconds. It is passed as the `deadline` keyword argument to
+            planners accepting it.
+        fallback (Optional[Union[Callable, Dict[str, np.array]]]): The action
+            (or a `fallback(state, timestep)` callable returning the action)
+            executed instead of the planner's action when it misses the
+            deadline. If given, the deadline is enforced: the planner runs in
+            a worker thread and the fallback is executed as soon as the budget
+            is spent (a late planner call keeps running and delays the next
+            one, which then has to fit in its own step's budget). If None,
+            the planner runs in the calling thread and the late action is
+            executed.
+        hooks (Optional[Sequence[rddlgym.hooks.Hook]]): The callbacks of `run`.
+        record_latency (bool): If True, step latencies are recorded even
+            without a deadline.
     """
 
-    def __init__(self, env, planner, debug=False):
+    # pylint: disable=too-many-arguments
+
+    def __init__(
+        self,
+        env,
+        planner,
+        debug=False,
+        deadline=None,
+        fallback=None,
+        hooks=None,
+        record_latency=False,
+    ):
         self.env = env
         self.planner = planner
         self.debug = debug
+        self.deadline = deadline
+        self.fallback = fallback
+        self.hooks = HookList(hooks)
+        self.record_latency = record_latency
+
+        self._planner_kwargs = {}
+        if deadline is not None and _accepts_deadline(planner):
+            self._planner_kwargs["deadline"] = deadline
+
+        self._executor = None
 
     def build(self):
         """Builds the runner's underlying components."""
         if hasattr(self.planner, "build"):
             self.planner.build()
 
-    def run(self, mode=None):
-        """Runs the planner-environment loop until termination.
+    def run(self, mode=None, sink=None):
+        """Runs the planner-environment loop until termination
+        (or until a hook's `on_step` returns True).
 
         Args:
             mode (str): The environment render mode.
+            sink (Optional[rddlgym.TrajectoryWriter]): An object implementing
+                `add_transition` that replaces the in-memory trajectory.
 
         Returns:
-            total_reward (float): The total reward for the run.
-            trajectory (List[Transition]): The state-action-reward trajectory.
+            trajectory (rddlgym.Trajectory): The state-action-reward trajectory
+            (or `sink`, if given).
         """
         state, timestep = self.env.reset()
         done = False
 
-        trajectory = Trajectory(self.env)
+        trajectory = Trajectory(self.env) if sink is None else sink
+
+        hooks = self.hooks
+        if hooks:
+            hooks.on_episode_start(self, state, timestep)
+
+        # latencies are only measured if recorded, requested or enforced
+        recorded = (self.record_latency or self.deadline is not None) and hasattr(
+            trajectory, "add_latency"
+        )
+        timed = recorded or self.deadline is not None or "latency" in hooks.fields
+        planner_latency, env_latency = None, None
 
         while not done:
-            action = self.planner(state, timestep)
+            if timed:
+                start = time.perf_counter()
+            action = self._plan(state, timestep)
+            if timed:
+                planner_latency = time.perf_counter() - start
+
+            missed = self.deadline is not None and (
+                action is None or planner_latency > self.deadline
+            )
+            if missed and self.fallback is not None:
+                action = self.fallback
+                if callable(action):
+                    action = action(state, timestep)
+
+            if timed:
+                start = time.perf_counter()
             next_state, reward, done, info = self.env.step(action)
+            if timed:
+                env_latency = time.perf_counter() - start
+
+            # hooks stopping the episode make this its last (done) transition
+            if hooks and hooks.on_step(
+                timestep,
+                state,
+                action,
+                reward,
+                next_state,
+                info,
+                done,
+                (planner_latency, env_latency) if timed else None,
+            ):
+                done = True
 
             trajectory.add_transition(
                 timestep, state, action, reward, next_state, info, done
             )
+            if recorded:
+                trajectory.add_latency(planner_latency, env_latency, missed)
 
             if mode is not None:
                 self.env.render(mode)
@@ -67,10 +202,322 @@ class Runner:
             state = next_state
             timestep = self.env.timestep
 
+        if hooks:
+            hooks.on_episode_end(self, trajectory)
+
         return trajectory
 
+    def _plan(self, state, timestep):
+        """Returns the planner's action (or None if it missed an enforced
+        deadline)."""
+        if self.deadline is None or self.fallback is None:
+            return self.planner(state, timestep, **self._planner_kwargs)
+
+        if self._executor is None:
+            self._executor = futures.ThreadPoolExecutor(max_workers=1)
+
+        future = self._executor.submit(
+            self.planner, state, timestep, **self._planner_kwargs
+        )
+        try:
+            return future.result(timeout=self.deadline)
+        except futures.TimeoutError:
+            # drops the call if a late one still occupies the worker
+            future.cancel()
+            return None
+
+    def run_many(self, episodes, workers=None, planner_factory=None):
+        """Runs `episodes` episodes, distributed across `workers` processes.
+
+        Each worker process creates its own env from the runner's rddl id
+        and its own planner with `planner_factory(env)`. Worker processes
+        are spawned (not forked), as TensorFlow sessions are not fork-safe.
+
+        Args:
+            episodes (int): The number of episodes.
+            workers (Optional[int]): The number of worker processes. If None
+                or 1, episodes are run sequentially with the runner's planner.
+            planner_factory (Optional[Callable]): A picklable callable
+                (e.g., rddlgym.policies.RandomPolicy) returning a planner
+                for a given env.
+
+        Returns:
+            List[rddlgym.Trajectory]: The trajectories in episode order.
+        """
+        if workers is None or workers <= 1 or episodes <= 1:
+            return [self.run() for _ in range(episodes)]
+
+        if planner_factory is None:
+            raise ValueError("Parallel episodes require a picklable planner_factory.")
+
+        initargs = (
+            self.env.rddl,
+            self.env.config,
+            self.env._horizon,
+            planner_factory,
+            self.deadline,
+            self.fallback,
+            self.record_latency,
+        )
+
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(min(workers, episodes), _init_worker, initargs) as pool:
+            results = pool.map(_run_episode, range(episodes))
+
+        trajectories = []
+        for transitions, latencies in results:
+            trajectory = Trajectory(self.env)
+            for transition in transitions:
+                trajectory.add_transition(*transition)
+            for latency in latencies:
+                trajectory.add_latency(*latency)
+            trajectories.append(trajectory)
+
+        return trajectories
+
+    def run_batch(self, episodes, horizon=None):
+        """Runs `episodes` concurrent episodes with a batched planner.
+
+        At each timestep the planner is called once as
+        `planner(states, timestep)`, where `states` maps each state fluent
+        to the stacked (n_active, ...) states of the episodes still
+        running. It must return a mapping from action fluents to the
+        stacked actions of those episodes in the same order. The env
+        transitions are computed in a single batched run (see
+        `rddlgym.RDDLEnv.transition`).
+
+        Args:
+            episodes (int): The number of concurrent episodes.
+            horizon (Optional[Union[int, Sequence[int]]]): The horizon of all
+                episodes or of each episode (defaults to the env's horizon).
+
+        Returns:
+            List[rddlgym.Trajectory]: The trajectories in episode order.
+        """
+        horizons = self.env.horizon if horizon is None else horizon
+        horizons = np.broadcast_to(horizons, (episodes,))
+
+        initial_state, _ = self.env.reset()
+        state = OrderedDict(
+            (name, np.stack([value] * episodes))
+            for name, value in initial_state.items()
+        )
+
+        trajectories = [Trajectory(self.env) for _ in range(episodes)]
+
+        for timestep in range(int(np.max(horizons, initial=0))):
+            active = np.flatnonzero(horizons > timestep)
+
+            active_action = self.planner(
+                OrderedDict((name, values[active]) for name, values in state.items()),
+                timestep,
+            )
+
+            action = OrderedDict()
+            for name, values in active_action.items():
+                values = np.asarray(values)
+                action[name] = np.zeros((episodes, *values.shape[1:]), values.dtype)
+                action[name][active] = values
+
+            next_state, reward, info = self.env.transition(state, action)
+
+            for i in active:
+                trajectories[i].add_transition(
+                    timestep,
+                    _row(state, i),
+                    _row(action, i),
+                    reward[i],
+                    _row(next_state, i),
+                    _row(info, i),
+                    bool(timestep + 1 == horizons[i]),
+                )
+
+            state = next_state
+
+        return trajectories
+
+    def run_async(self, episodes, max_in_flight=2):
+        """Runs `episodes` episodes pipelining planner and env computations.
+
+        The planner runs in a background thread while the env steps in the
+        calling thread, so that the env can step one episode while the
+        planner computes the action of another. At most `max_in_flight`
+        episodes run concurrently. Env steps use the stateless
+        `rddlgym.RDDLEnv.transition`, so episodes don't share env state.
+
+        Args:
+            episodes (int): The number of episodes.
+            max_in_flight (int): The maximum number of concurrent episodes.
+
+        Returns:
+            List[rddlgym.Trajectory]: The trajectories in episode order.
+        """
+        plan_queue = queue.Queue()
+        step_queue = queue.Queue(maxsize=max_in_flight)
+
+        def _plan():
+            while True:
+                item = plan_queue.get()
+                if item is None:
+                    return
+
+                episode, state, timestep = item
+                try:
+                    action = self.planner(state, timestep)
+                except Exception as error:  # pylint: disable=broad-except
+                    step_queue.put((episode, error))
+                    return
+                step_queue.put((episode, action))
+
+        trajectories = [Trajectory(self.env) for _ in range(episodes)]
+        pending = {}
+
+        def _start(episode):
+            state, timestep = self.env.reset()
+            pending[episode] = (state, timestep)
+            plan_queue.put((episode, state, timestep))
+
+        planner_thread = threading.Thread(target=_plan, daemon=True)
+        planner_thread.start()
+
+        try:
+            started = min(max_in_flight, episodes)
+            for episode in range(started):
+                _start(episode)
+
+            finished = 0
+            while finished < episodes:
+                episode, action = step_queue.get()
+                if isinstance(action, Exception):
+                    raise action
+
+                state, timestep = pending.pop(episode)
+                next_state, reward, info = self.env.transition(
+                    _batch(state), _batch(action)
+                )
+                next_state, info = _row(next_state, 0), _row(info, 0)
+                done = timestep + 1 == self.env.horizon
+
+                trajectories[episode].add_transition(
+                    timestep, state, action, reward[0], next_state, info, done
+                )
+
+                if not done:
+                    pending[episode] = (next_state, timestep + 1)
+                    plan_queue.put((episode, next_state, timestep + 1))
+                    continue
+
+                finished += 1
+                if started < episodes:
+                    _start(started)
+                    started += 1
+        finally:
+            plan_queue.put(None)
+            planner_thread.join()
+
+        return trajectories
+
+    def run_campaign(
+        self, episodes, logdir, seed=None, fmt=storage.CSV, stream=False, resume=True
+    ):
+        """Runs a checkpointed campaign of `episodes` episodes.
+
+        Each episode is saved as `episode-{i}` (plus the format's extension)
+        in `logdir`, and recorded in the `manifest.json` campaign manifest
+        after its file is completely written. On restart with `resume`,
+        episodes already recorded in the manifest are skipped.
+
+        Episode `i` is seeded with `seed + i` via `env.seed` (which also
+        reseeds the TensorFlow ops sampling RDDL random variables) and, if
+        the planner has a `seed` method, `planner.seed`, so that resumed
+        episodes are reproducible regardless of where the campaign stopped.
+
+        Args:
+            episodes (int): The total number of episodes.
+            logdir (str): The campaign directory.
+            seed (Optional[int]): The campaign's base seed.
+            fmt (str): The storage format (see rddlgym.storage).
+            stream (bool): If True, stream transitions to disk in chunks.
+            resume (bool): If True, skip episodes completed in `logdir`.
+
+        Returns:
+            Dict[str, Any]: The campaign manifest.
+        """
+        config = OrderedDict(
+            [
+                ("version", MANIFEST_VERSION),
+                ("rddl", self.env.rddl),
+                ("episodes", episodes),
+                ("seed", seed),
+                ("format", fmt),
+            ]
+        )
+
+        filepath = os.path.join(logdir, MANIFEST_FILENAME)
+        manifest = read_manifest(logdir) if resume else None
+
+        if manifest is None:
+            manifest = OrderedDict(config, completed=OrderedDict())
+        else:
+            for key in ["rddl", "seed", "format"]:
+                if manifest[key] != config[key]:
+                    raise ValueError(
+                        "Campaign in {} has {} = {}, not {}.".format(
+                            logdir, key, manifest[key], config[key]
+                        )
+                    )
+            manifest["episodes"] = episodes
+
+        if not os.path.exists(logdir):
+            os.makedirs(logdir)
+
+        for i in range(episodes):
+            record = manifest["completed"].get(str(i))
+            if record is not None and os.path.exists(
+                os.path.join(logdir, record["file"])
+            ):
+                continue
+
+            episode_seed = None if seed is None else seed + i
+            self.env.seed(episode_seed)
+            if hasattr(self.planner, "seed"):
+                self.planner.seed(episode_seed)
+
+            filename = "episode-{}".format(i)
+            if fmt != storage.NPY:
+                filename += ".{}".format(fmt)
+            tmppath = os.path.join(logdir, ".{}.tmp".format(filename))
+
+            if stream:
+                with TrajectoryWriter(self.env, tmppath, fmt=fmt) as sink:
+                    trajectory = self.run(sink=sink)
+            else:
+                trajectory = self.run()
+                trajectory.save(tmppath, fmt)
+
+            dst = os.path.join(logdir, filename)
+            if os.path.isdir(dst):
+                shutil.rmtree(dst)
+            os.replace(tmppath, dst)
+
+            manifest["completed"][str(i)] = OrderedDict(
+                [
+                    ("file", filename),
+                    ("seed", episode_seed),
+                    ("length", len(trajectory)),
+                    ("total_reward", float(trajectory.total_reward)),
+                ]
+            )
+            _write_json(manifest, filepath)
+
+        return manifest
+
     def close(self):
         """Closes the environment."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
         if hasattr(self.planner, "close"):
             self.planner.close()
 
@@ -82,3 +529,42 @@ class Runner:
 
     def __exit__(self, exc_type, exc_value, exc_traceback):
         self.close()
+
+
+def read_manifest(logdir):
+    """Returns the campaign manifest in `logdir` (or None if there is none)."""
+    filepath = os.path.join(logdir, MANIFEST_FILENAME)
+    if not os.path.exists(filepath):
+        return None
+
+    with open(filepath, "r") as file:
+        return json.loads(file.read(), object_pairs_hook=OrderedDict)
+
+
+def _write_json(data, filepath):
+    tmppath = filepath + ".tmp"
+    with open(tmppath, "w") as file:
+        file.write(json.dumps(data, indent=2))
+    os.replace(tmppath, filepath)
+
+
+def _accepts_deadline(planner):
+    try:
+        parameters = inspect.signature(planner).parameters.values()
+    except (TypeError, ValueError):
+        return False
+
+    return any(
+        param.name == "deadline" or param.kind == param.VAR_KEYWORD
+        for param in parameters
+    )
+
+
+def _batch(fluents):
+    return OrderedDict(
+        (name, np.asarray(value)[np.newaxis, ...]) for name, value in fluents.items()
+    )
+
+
+def _row(fluents, i):
+    return OrderedDict((name, values[i]) for name, values in fluents.items())
@@ -0,0 +1,569 @@
+# This file is part of rddlgym.
+
+# rddlgym is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# rddlgym is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with rddlgym. If not, see <http://www.gnu.org/licenses/>.
+
+"""Local env server exposing RDDLEnvs over a TCP or Unix socket.
+
+The protocol is JSON lines: each request is a JSON object on its own line
+``{"id": ..., "method": ..., "params": {...}}`` and is answered, in order,
+by ``{"id": ..., "result": ...}`` or ``{"id": ..., "error": "..."}``.
+Fluents are JSON (nested) lists. The methods are:
+
+- ``envs()``: the hosted env ids.
+- ``open(env)``: opens a simulation session, returns its ``session`` id.
+- ``reset(session)``: returns the initial ``state`` and ``timestep``.
+- ``step(session, action)``: returns ``state``, ``reward``, ``done``, ``info``.
+- ``transition(env, state, action)``: a batch of (batch_size, ...) states
+  and actions, returns ``state``, ``reward`` and ``info`` batches.
+- ``snapshot(session)``: returns the session's ``state`` and ``timestep``.
+- ``restore(session, state, timestep)``: restores a snapshot.
+- ``close(session)``: closes the simulation session.
+- ``stats()``: the number of requests and session runs by env.
+
+Each hosted env has a single thread running its TF session, which
+coalesces the concurrent step and transition requests of all clients into
+batched transitions (see `rddlgym.RDDLEnv.transition`). Batches are padded
+to powers of 2 up to the server's max batch size, and larger transition
+requests are split into chunks of the max batch size, so that only a few
+batch sizes are ever compiled. The fluents of each request are checked
+against the env's state and action fluents before being batched, so that
+a bad request fails only its own client.
+"""
+
+# pylint: disable=missing-docstring,protected-access
+
+
+from collections import OrderedDict
+from concurrent.futures import Future
+import itertools
+import json
+import os
+import queue
+import socket
+import socketserver
+import threading
+import time
+
+import numpy as np
+
+
+METHODS = (
+    "envs",
+    "open",
+    "reset",
+    "step",
+    "transition",
+    "snapshot",
+    "restore",
+    "close",
+    "stats",
+)
+
+_STOP = object()
+
+
+def parse_address(address):
+    """Returns the socket family and address of "host:port" or a Unix
+    socket path."""
+    host, sep, port = address.rpartition(":")
+    if sep and port.isdigit() and os.sep not in address:
+        return socket.AF_INET, (host or "127.0.0.1", int(port))
+    return socket.AF_UNIX, address
+
+
+def encode(values):
+    """Returns the JSON-serializable form of a fluents mapping."""
+    return OrderedDict(
+        (name, np.asarray(value).tolist()) for name, value in values.items()
+    )
+
+
+def decode(values, specs, batched=False):
+    """Returns the fluents mapping of arrays with the given (dtype, shape)
+    `specs` (with a leading batch dimension if `batched`).
+
+    Raises:
+        ValueError: If the fluents or their shapes don't match `specs`.
+    """
+    if not isinstance(values, dict) or set(values) != set(specs):
+        raise ValueError(
+            "Invalid fluents: expected {}, got {}.".format(
+                sorted(specs), sorted(values) if isinstance(values, dict) else values
+            )
+        )
+
+    arrays = OrderedDict(
+        (name, np.asarray(values[name], dtype=dtype))
+        for name, (dtype, _) in specs.items()
+    )
+
+    batch_shape = ()
+    if batched:
+        batch_shape = next(iter(arrays.values())).shape[:1]
+        if not batch_shape or batch_shape[0] == 0:
+            raise ValueError("Invalid batch: expected at least one row.")
+
+    for name, (_, shape) in specs.items():
+        expected = (*batch_shape, *shape)
+        if arrays[name].shape != expected:
+            raise ValueError(
+                "Invalid shape of {}: expected {}, got {}.".format(
+                    name, expected, arrays[name].shape
+                )
+            )
+
+    return arrays
+
+
+class Batcher(threading.Thread):
+    """Batcher runs the batched transitions of an env in its own thread.
+
+    Args:
+        env (rddlgym.RDDLEnv): The RDDLEnv gym environment.
+        max_batch (int): The maximum number of coalesced transitions.
+        max_delay (float): The maximum time (in seconds) to wait for more
+            requests once the first one of a batch arrived.
+    """
+
+    def __init__(self, env, max_batch=256, max_delay=0.0):
+        super().__init__(daemon=True)
+        self.env = env
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+
+        self.requests = 0
+        self.batches = 0
+
+        self._queue = queue.Queue()
+        self._pending = None
+
+    def submit(self, state, action):
+        """Returns the Future of the (next_state, reward, interms) batch for
+        the (batch_size, ...) `state` and `action` arrays, with a batch_size
+        of at most `max_batch`."""
+        size = len(next(iter(state.values())))
+        if not 0 < size <= self.max_batch:
+            raise ValueError("Invalid batch size: {}.".format(size))
+
+        future = Future()
+        self._queue.put((state, action, size, future))
+        return future
+
+    def transition(self, state, action):
+        """Returns the (next_state, reward, interms) batch for the
+        (batch_size, ...) `state` and `action` arrays, submitted in chunks
+        of at most `max_batch` transitions."""
+        size = len(next(iter(state.values())))
+        futures = [
+            self.submit(_rows(state, window), _rows(action, window))
+            for window in (
+                slice(start, start + self.max_batch)
+                for start in range(0, size, self.max_batch)
+            )
+        ]
+        results = [future.result() for future in futures]
+        if len(results) == 1:
+            return results[0]
+
+        next_state, reward, interms = zip(*results)
+        return (
+            _concatenate(next_state),
+            np.concatenate(reward),
+            _concatenate(interms),
+        )
+
+    def stop(self):
+        self._queue.put(_STOP)
+
+    def run(self):
+        while True:
+            item = self._queue.get() if self._pending is None else self._pending
+            self._pending = None
+            if item is _STOP:
+                return
+
+            batch, size = [item], item[2]
+            deadline = time.monotonic() + self.max_delay
+            while size < self.max_batch:
+                try:
+                    timeout = deadline - time.monotonic()
+                    if timeout > 0:
+                        item = self._queue.get(timeout=timeout)
+                    else:
+                        item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+                if item is _STOP or size + item[2] > self.max_batch:
+                    self._pending = item
+                    break
+
+                batch.append(item)
+                size += item[2]
+
+            self._run(batch, size)
+
+    def _run(self, batch, size):
+        self.requests += len(batch)
+        self.batches += 1
+
+        # only power of 2 batch sizes (and max_batch) are ever compiled
+        padded = min(1 << (size - 1).bit_length(), self.max_batch)
+        indices = np.arange(padded) % size
+
+        try:
+            state = OrderedDict(
+                (name, np.concatenate([item[0][name] for item in batch])[indices])
+                for name in batch[0][0]
+            )
+            action = OrderedDict(
+                (name, np.concatenate([item[1][name] for item in batch])[indices])
+                for name in batch[0][1]
+            )
+            next_state, reward, interms = self.env.transition(state, action)
+        except Exception as error:  # pylint: disable=broad-except
+            for item in batch:
+                item[3].set_exception(error)
+            return
+
+        start = 0
+        for _, _, rows, future in batch:
+            window = slice(start, start + rows)
+            future.set_result(
+                (_rows(next_state, window), reward[window], _rows(interms, window))
+            )
+            start += rows
+
+
+def _rows(fluents, window):
+    return OrderedDict((name, value[window]) for name, value in fluents.items())
+
+
+def _concatenate(batches):
+    return OrderedDict(
+        (name, np.concatenate([batch[name] for batch in batches]))
+        for name in batches[0]
+    )
+
+
+class Session:
+    """Session is a client's simulation state (and timestep) in an env."""
+
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, env_id, state, timestep=0):
+        self.env_id = env_id
+        self.state = state
+        self.timestep = timestep
+
+
+class EnvServer:
+    """EnvServer hosts RDDLEnvs behind a JSON-lines socket protocol.
+
+    Args:
+        envs (Mapping[str, rddlgym.RDDLEnv]): The hosted envs by id.
+        address (str): The "host:port" TCP address (port 0 picks a free
+            port) or the Unix socket path.
+        max_batch (int): The maximum number of coalesced transitions.
+        max_delay (float): The maximum time (in seconds) to wait for more
+            requests to coalesce.
+    """
+
+    def __init__(self, envs, address="127.0.0.1:0", max_batch=256, max_delay=0.0):
+        self.envs = OrderedDict(envs)
+
+        self._batchers = OrderedDict(
+            (env_id, Batcher(env, max_batch, max_delay))
+            for env_id, env in self.envs.items()
+        )
+        self._initial_states = OrderedDict()
+        self._specs = OrderedDict()
+        for env_id, env in self.envs.items():
+            state, _ = env.reset()
+            self._initial_states[env_id] = state
+            self._specs[env_id] = (
+                _specs(env._state_inputs),
+                _specs(env._action_inputs),
+            )
+
+        self._sessions = {}
+        self._session_ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+        family, address = parse_address(address)
+        if family == socket.AF_UNIX and os.path.exists(address):
+            os.remove(address)
+
+        server_class = (
+            _ThreadingUnixServer if family == socket.AF_UNIX else _ThreadingTCPServer
+        )
+        self._server = server_class(address, _Handler)
+        self._server.env_server = self
+
+    @property
+    def address(self):
+        """str: The server's "host:port" or Unix socket path."""
+        address = self._server.server_address
+        if isinstance(address, tuple):
+            return "{}:{}".format(*address[:2])
+        return address
+
+    def serve_forever(self):
+        """Serves requests until `shutdown` is called."""
+        for batcher in self._batchers.values():
+            if not batcher.is_alive():
+                batcher.start()
+        self._server.serve_forever()
+
+    def shutdown(self):
+        """Stops serving and closes the socket (but not the envs)."""
+        self._server.shutdown()
+        self._server.server_close()
+        for batcher in self._batchers.values():
+            batcher.stop()
+
+        if isinstance(self._server.server_address, str):
+            if os.path.exists(self._server.server_address):
+                os.remove(self._server.server_address)
+
+    def handle(self, method, params):
+        """Returns the result of the request `method` with `params`."""
+        if method not in METHODS:
+            raise ValueError("Invalid method: {}".format(method))
+        return getattr(self, "_{}".format(method))(**params)
+
+    def _envs(self):
+        return list(self.envs)
+
+    def _open(self, env):
+        if env not in self.envs:
+            raise ValueError("Invalid env: {}".format(env))
+
+        with self._lock:
+            session_id = "s{}".format(next(self._session_ids))
+            self._sessions[session_id] = Session(env, self._initial_states[env])
+        return {"session": session_id}
+
+    def _reset(self, session):
+        sess = self._session(session)
+        sess.state, sess.timestep = self._initial_states[sess.env_id], 0
+        return {"state": encode(sess.state), "timestep": sess.timestep}
+
+    def _step(self, session, action):
+        sess = self._session(session)
+        state_specs, action_specs = self._specs[sess.env_id]
+
+        state = OrderedDict((k, v[np.newaxis]) for k, v in sess.state.items())
+        action = OrderedDict(
+            (k, v[np.newaxis]) for k, v in decode(action, action_specs).items()
+        )
+        future = self._batchers[sess.env_id].submit(state, action)
+        next_state, reward, interms = future.result()
+
+        sess.state = decode(
+            OrderedDict((k, v[0]) for k, v in next_state.items()), state_specs
+        )
+        sess.timestep += 1
+        done = sess.timestep >= self.envs[sess.env_id].horizon
+
+        return {
+            "state": encode(sess.state),
+            "reward": float(reward[0]),
+            "done": done,
+            "info": encode(OrderedDict((k, v[0]) for k, v in interms.items())),
+        }
+
+    def _transition(self, env, state, action):
+        if env not in self.envs:
+            raise ValueError("Invalid env: {}".format(env))
+
+        state_specs, action_specs = self._specs[env]
+        state = decode(state, state_specs, batched=True)
+        action = decode(action, action_specs, batched=True)
+        if len(next(iter(state.values()))) != len(next(iter(action.values()))):
+            raise ValueError("Invalid batch: states and actions differ in size.")
+
+        next_state, reward, interms = self._batchers[env].transition(state, action)
+        return {
+            "state": encode(next_state),
+            "reward": reward.tolist(),
+            "info": encode(interms),
+        }
+
+    def _snapshot(self, session):
+        sess = self._session(session)
+        return {"state": encode(sess.state), "timestep": sess.timestep}
+
+    def _restore(self, session, state, timestep):
+        sess = self._session(session)
+        sess.state = decode(state, self._specs[sess.env_id][0])
+        sess.timestep = int(timestep)
+        return {}
+
+    def _close(self, session):
+        with self._lock:
+            if self._sessions.pop(session, None) is None:
+                raise ValueError("Invalid session: {}".format(session))
+        return {}
+
+    def _stats(self):
+        return OrderedDict(
+            (
+                env_id,
+                OrderedDict(
+                    [("requests", batcher.requests), ("batches", batcher.batches)]
+                ),
+            )
+            for env_id, batcher in self._batchers.items()
+        )
+
+    def _session(self, session):
+        with self._lock:
+            sess = self._sessions.get(session)
+        if sess is None:
+            raise ValueError("Invalid session: {}".format(session))
+        return sess
+
+
+def _specs(inputs):
+    # the inputs have a leading batch dimension of size 1
+    return OrderedDict(
+        (name, (tensor.dtype.as_numpy_dtype, tuple(tensor.shape.as_list()[1:])))
+        for name, tensor in inputs.items()
+    )
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        server = self.server.env_server
+        for line in self.rfile:
+            if not line.strip():
+                continue
+
+            request = None
+            try:
+                request = json.loads(line.decode("utf-8"))
+                if not isinstance(request, dict) or "method" not in request:
+                    raise ValueError("Invalid request: {}".format(request))
+
+                params = request.get("params", {})
+                if not isinstance(params, dict):
+                    raise ValueError("Invalid params: {}".format(params))
+
+                result = server.handle(request["method"], params)
+                response = {"id": request.get("id"), "result": result}
+            except Exception as error:  # pylint: disable=broad-except
+                request_id = request.get("id") if isinstance(request, dict) else None
+                response = {"id": request_id, "error": str(error)}
+
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+class _ThreadingTCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class _ThreadingUnixServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+class EnvClient:
+    """EnvClient is a Python client of an `EnvServer`.
+
+    Fluents are sent as lists and returned as OrderedDicts of np.arrays.
+
+    Args:
+        address (str): The server's "host:port" or Unix socket path.
+    """
+
+    def __init__(self, address):
+        family, address = parse_address(address)
+        self._socket = socket.socket(family, socket.SOCK_STREAM)
+        self._socket.connect(address)
+        self._file = self._socket.makefile("rwb")
+        self._ids = itertools.count(1)
+
+    def call(self, method, **params):
+        """Sends the request `method` with `params` and returns its result.
+
+        Raises:
+            ValueError: If the server answered with an error.
+        """
+        request = {"id": next(self._ids), "method": method, "params": params}
+        self._file.write(json.dumps(request).encode("utf-8") + b"\n")
+        self._file.flush()
+
+        response = json.loads(self._file.readline().decode("utf-8"))
+        if "error" in response:
+            raise ValueError(response["error"])
+        return response["result"]
+
+    def envs(self):
+        return self.call("envs")
+
+    def open(self, env):
+        return self.call("open", env=env)["session"]
+
+    def reset(self, session):
+        result = self.call("reset", session=session)
+        return _arrays(result["state"]), result["timestep"]
+
+    def step(self, session, action):
+        result = self.call("step", session=session, action=encode(action))
+        return (
+            _arrays(result["state"]),
+            result["reward"],
+            result["done"],
+            _arrays(result["info"]),
+        )
+
+    def transition(self, env, state, action):
+        result = self.call(
+            "transition", env=env, state=encode(state), action=encode(action)
+        )
+        return (
+            _arrays(result["state"]),
+            np.asarray(result["reward"]),
+            _arrays(result["info"]),
+        )
+
+    def snapshot(self, session):
+        result = self.call("snapshot", session=session)
+        return _arrays(result["state"]), result["timestep"]
+
+    def restore(self, session, state, timestep):
+        self.call("restore", session=session, state=encode(state), timestep=timestep)
+
+    def close_session(self, session):
+        self.call("close", session=session)
+
+    def stats(self):
+        return self.call("stats")
+
+    def close(self):
+        """Closes the connection."""
+        self._file.close()
+        self._socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def _arrays(values):
+    return OrderedDict((name, np.asarray(value)) for name, value in values.items())
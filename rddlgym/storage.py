@@ -0,0 +1,482 @@
+# This file is part of rddlgym.
+
+# rddlgym is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# rddlgym is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with rddlgym. If not, see <http://www.gnu.org/licenses/>.
+
+
+"""Columnar storage of trajectory data.
+
+Trajectories are stored as a set of named 1-D columns in one of the formats:
+
+- CSV: a text file readable by pandas (``*.csv``);
+- NPZ: a single uncompressed numpy archive (``*.npz``);
+- NPY: a directory with one ``.npy`` file per column and a JSON schema,
+  which can be memory-mapped with ``np.load(mmap_mode="r")``.
+
+In binary formats boolean columns are bit-packed with ``np.packbits``
+(8 values per byte) and unpacked when read.
+"""
+
+
+from collections import OrderedDict
+import json
+import os
+import struct
+
+import numpy as np
+import pandas as pd
+
+
+CSV = "csv"
+NPZ = "npz"
+NPY = "npy"
+
+FORMATS = (CSV, NPZ, NPY)
+
+SCHEMA_FILENAME = "schema.json"
+SCHEMA_KEY = "__schema__"
+SCHEMA_VERSION = 1
+
+NPY_HEADER_SIZE = 128
+
+
+def infer_format(filepath):
+    """Returns the storage format implied by `filepath`."""
+    ext = os.path.splitext(filepath)[1].lower()
+    if ext == ".csv":
+        return CSV
+    if ext == ".npz":
+        return NPZ
+    if not ext or os.path.isdir(filepath):
+        return NPY
+    raise ValueError("Couldn't infer storage format of file: {}".format(filepath))
+
+
+def find_data_file(dirpath, basename="data"):
+    """Returns the path of the `basename` data file in `dirpath`.
+
+    Binary formats take precedence over CSV. Returns None if not found.
+    """
+    candidates = [
+        os.path.join(dirpath, basename + ".npz"),
+        os.path.join(dirpath, basename),
+        os.path.join(dirpath, basename + ".csv"),
+    ]
+    for filepath in candidates:
+        if os.path.isfile(filepath):
+            return filepath
+        if os.path.isfile(os.path.join(filepath, SCHEMA_FILENAME)):
+            return filepath
+    return None
+
+
+def pack_bits(values):
+    """Returns boolean `values` bit-packed into a flat np.uint8 array."""
+    return np.packbits(np.reshape(values, -1).astype(np.bool_))
+
+
+def unpack_bits(packed, shape):
+    """Returns the boolean array of given `shape` bit-packed in `packed`."""
+    size = int(np.prod(shape))
+    values = np.unpackbits(np.asarray(packed, dtype=np.uint8))[:size]
+    return np.reshape(values.view(np.bool_), shape)
+
+
+def save_columns(columns, filepath, fmt=None):
+    """Saves the `columns` mapping (name -> 1-D array) in `filepath`."""
+    fmt = fmt or infer_format(filepath)
+
+    dirname = os.path.dirname(filepath)
+    if dirname and not os.path.exists(dirname):
+        os.makedirs(dirname)
+
+    if fmt == CSV:
+        pd.DataFrame(columns).to_csv(filepath, index=False)
+    elif fmt == NPZ:
+        _save_npz(columns, filepath)
+    elif fmt == NPY:
+        _save_npy_dir(columns, filepath)
+    else:
+        raise ValueError("Invalid storage format: {}".format(fmt))
+
+
+def load_columns(filepath, columns=None, mmap_mode="r", fmt=None):
+    """Returns an OrderedDict mapping column names to 1-D arrays.
+
+    Args:
+        filepath (str): The data file (or directory, for the NPY format).
+        columns (Optional[List[str]]): The columns to read (defaults to all).
+        mmap_mode (Optional[str]): The memory-map mode for the NPY format.
+        fmt (Optional[str]): The storage format (inferred if not given).
+    """
+    fmt = fmt or infer_format(filepath)
+
+    if fmt == CSV:
+        df = pd.read_csv(filepath, usecols=columns)
+        names = columns if columns is not None else df.columns
+        return OrderedDict((name, df[name].to_numpy()) for name in names)
+
+    if fmt == NPZ:
+        with np.load(filepath) as data:
+            schema = _read_npz_schema(data)
+            cols = OrderedDict((col["name"], col) for col in schema["columns"])
+            names = columns if columns is not None else cols.keys()
+            return OrderedDict(
+                (name, _decode(data[name], cols[name], schema["length"]))
+                for name in names
+            )
+
+    if fmt == NPY:
+        schema = read_schema(filepath)
+        cols = OrderedDict((col["name"], col) for col in schema["columns"])
+        names = columns if columns is not None else cols.keys()
+        return OrderedDict(
+            (
+                name,
+                _decode(
+                    np.load(
+                        os.path.join(filepath, cols[name]["file"]), mmap_mode=mmap_mode
+                    ),
+                    cols[name],
+                    schema["length"],
+                ),
+            )
+            for name in names
+        )
+
+    raise ValueError("Invalid storage format: {}".format(fmt))
+
+
+def column_names(filepath, fmt=None):
+    """Returns the list of column names stored in `filepath`."""
+    fmt = fmt or infer_format(filepath)
+
+    if fmt == CSV:
+        return list(pd.read_csv(filepath, nrows=0).columns)
+
+    if fmt == NPZ:
+        with np.load(filepath) as data:
+            return [col["name"] for col in _read_npz_schema(data)["columns"]]
+
+    if fmt == NPY:
+        return [col["name"] for col in read_schema(filepath)["columns"]]
+
+    raise ValueError("Invalid storage format: {}".format(fmt))
+
+
+def read_schema(dirpath):
+    """Returns the JSON schema of the NPY directory `dirpath`."""
+    with open(os.path.join(dirpath, SCHEMA_FILENAME), "r") as file:
+        return json.loads(file.read())
+
+
+def convert(src, dst, fmt=None):
+    """Converts data file `src` into `dst` with the given format."""
+    columns = load_columns(src, mmap_mode=None)
+    save_columns(columns, dst, fmt)
+
+
+def convert_logdir(logdir, fmt=NPZ, remove=False):
+    """Converts all CSV files under `logdir` into the given binary format.
+
+    Args:
+        logdir (str): The root logging directory.
+        fmt (str): The target storage format.
+        remove (bool): If True, removes each CSV file after conversion.
+
+    Returns:
+        List[Tuple[str, str]]: The pairs of converted (source, target) paths.
+    """
+    if fmt not in (NPZ, NPY):
+        raise ValueError("Invalid binary storage format: {}".format(fmt))
+
+    converted = []
+
+    for dirpath, _, filenames in os.walk(logdir):
+        for filename in sorted(filenames):
+            basename, ext = os.path.splitext(filename)
+            if ext.lower() != ".csv":
+                continue
+
+            src = os.path.join(dirpath, filename)
+            dst = os.path.join(dirpath, basename)
+            if fmt == NPZ:
+                dst += ".npz"
+
+            convert(src, dst, fmt)
+            converted.append((src, dst))
+
+            if remove:
+                os.remove(src)
+
+    return converted
+
+
+class ColumnReader:
+    """ColumnReader lazily reads and caches the columns of a data file.
+
+    Columns are only read from disk the first time they are requested,
+    so an analysis that only needs e.g. the "reward" column never reads
+    the fluent columns.
+
+    Args:
+        filepath (str): The CSV file, NPZ archive or NPY directory.
+        fmt (Optional[str]): The storage format (inferred if not given).
+        mmap_mode (Optional[str]): The memory-map mode for NPY columns.
+    """
+
+    def __init__(self, filepath, fmt=None, mmap_mode="r"):
+        self.filepath = filepath
+        self.fmt = fmt or infer_format(filepath)
+        self.mmap_mode = mmap_mode
+
+        self._names = None
+        self._length = None
+        self._cache = OrderedDict()
+
+    @property
+    def names(self):
+        """Returns the list of column names."""
+        if self._names is None:
+            self._names = column_names(self.filepath, self.fmt)
+        return self._names
+
+    def read(self, names):
+        """Returns an OrderedDict mapping each of `names` to its column."""
+        missing = [name for name in names if name not in self._cache]
+        if missing:
+            self._cache.update(
+                load_columns(self.filepath, missing, self.mmap_mode, self.fmt)
+            )
+        return OrderedDict((name, self._cache[name]) for name in names)
+
+    def __getitem__(self, name):
+        return self.read([name])[name]
+
+    def __len__(self):
+        if self._length is None:
+            if self.fmt == NPY:
+                self._length = read_schema(self.filepath)["length"]
+            else:
+                name = next(iter(self._cache), self.names[-1])
+                self._length = len(self[name])
+        return self._length
+
+
+class ColumnWriter:
+    """ColumnWriter appends chunks of columns to a CSV file or NPY directory.
+
+    Data is readable by `load_columns` after every `flush`, so a crashed
+    run leaves all flushed chunks on disk. The NPZ format does not
+    support appending. In the NPY format boolean columns are bit-packed;
+    a trailing partial byte is rewritten as more values are appended.
+
+    Args:
+        filepath (str): The data file (or directory, for the NPY format).
+        fmt (Optional[str]): The storage format (inferred if not given).
+    """
+
+    def __init__(self, filepath, fmt=None):
+        self.filepath = filepath
+        self.fmt = fmt or infer_format(filepath)
+
+        if self.fmt not in (CSV, NPY):
+            raise ValueError("Storage format can't be appended: {}".format(self.fmt))
+
+        self.length = 0
+
+        self._file = None
+        self._files = None
+        self._schema = None
+        self._pending = None
+        self._partial = set()
+
+    def write(self, columns):
+        """Appends the `columns` chunk (name -> 1-D array) to the file."""
+        is_open = self._file is not None or self._files is not None
+        if not is_open:
+            self._open(columns)
+
+        if self.fmt == CSV:
+            pd.DataFrame(columns).to_csv(self._file, header=not is_open, index=False)
+        else:
+            for col in self._schema["columns"]:
+                values = columns[col["name"]]
+                values = np.ascontiguousarray(values, dtype=col["dtype"])
+                if col["packed"]:
+                    values = self._pack(col["name"], values)
+                self._files[col["name"]].write(values.tobytes())
+
+        self.length += len(next(iter(columns.values()), []))
+
+    def flush(self):
+        """Flushes written chunks to disk and updates file headers."""
+        if self.fmt == CSV:
+            if self._file is not None:
+                self._file.flush()
+            return
+
+        if self._files is None:
+            return
+
+        for col in self._schema["columns"]:
+            file = self._files[col["name"]]
+            if col["packed"]:
+                pending = self._pending[col["name"]]
+                if len(pending) > 0 and col["name"] not in self._partial:
+                    file.write(pack_bits(pending).tobytes())
+                    self._partial.add(col["name"])
+                size = (self.length + 7) // 8
+                _write_npy_header(file, np.dtype(np.uint8), size)
+            else:
+                _write_npy_header(file, np.dtype(col["dtype"]), self.length)
+            file.flush()
+
+        self._schema["length"] = self.length
+        with open(os.path.join(self.filepath, SCHEMA_FILENAME), "w") as file:
+            file.write(json.dumps(self._schema, indent=2))
+
+    def close(self):
+        """Flushes and closes all open files."""
+        self.flush()
+
+        if self._file is not None:
+            self._file.close()
+
+        if self._files is not None:
+            for file in self._files.values():
+                file.close()
+
+    def _open(self, columns):
+        dirname = os.path.dirname(self.filepath)
+        if dirname and not os.path.exists(dirname):
+            os.makedirs(dirname)
+
+        if self.fmt == CSV:
+            self._file = open(self.filepath, "w")
+            return
+
+        if not os.path.exists(self.filepath):
+            os.makedirs(self.filepath)
+
+        self._schema = {"version": SCHEMA_VERSION, "length": 0, "columns": []}
+        self._files = OrderedDict()
+        self._pending = OrderedDict()
+
+        for i, (name, values) in enumerate(columns.items()):
+            dtype = np.asarray(values).dtype
+            packed = dtype == np.bool_
+            filename = "col-{:04d}.npy".format(i)
+            file = open(os.path.join(self.filepath, filename), "w+b")
+            _write_npy_header(file, np.dtype(np.uint8) if packed else dtype, 0)
+            self._files[name] = file
+            self._pending[name] = np.empty((0,), dtype=np.bool_)
+            self._schema["columns"].append(
+                {"name": name, "file": filename, "dtype": dtype.str, "packed": packed}
+            )
+
+    def _pack(self, name, values):
+        """Returns the full bytes of pending and new `values`, keeping
+        the remaining bits pending (see `flush`)."""
+        file = self._files[name]
+
+        if name in self._partial:
+            # drop the partial byte written by the last flush
+            file.seek(-1, os.SEEK_END)
+            file.truncate()
+            self._partial.remove(name)
+
+        values = np.concatenate([self._pending[name], values])
+
+        size = len(values) - len(values) % 8
+        self._pending[name] = values[size:]
+        return pack_bits(values[:size])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close()
+
+
+def _write_npy_header(file, dtype, length):
+    """Writes a fixed-size NPY v1.0 header for a 1-D array with `length` items.
+
+    The header has always NPY_HEADER_SIZE bytes so that it can be
+    rewritten in place as data is appended to the file.
+    """
+    header = "{{'descr': {!r}, 'fortran_order': False, 'shape': ({},), }}".format(
+        np.lib.format.dtype_to_descr(dtype), length
+    )
+    header = header.ljust(NPY_HEADER_SIZE - 11) + "\n"
+
+    file.seek(0)
+    file.write(np.lib.format.magic(1, 0))
+    file.write(struct.pack("<H", len(header)))
+    file.write(header.encode("latin1"))
+    file.seek(0, os.SEEK_END)
+
+
+def _encode(columns):
+    """Returns the schema and the (possibly bit-packed) arrays of `columns`."""
+    schema = {"version": SCHEMA_VERSION, "length": 0, "columns": []}
+    arrays = OrderedDict()
+
+    for name, values in columns.items():
+        values = np.asarray(values)
+        packed = values.dtype == np.bool_
+
+        schema["length"] = len(values)
+        schema["columns"].append(
+            {"name": name, "dtype": values.dtype.str, "packed": packed}
+        )
+        arrays[name] = pack_bits(values) if packed else values
+
+    return schema, arrays
+
+
+def _decode(values, col, length):
+    if col.get("packed"):
+        return unpack_bits(values, (length,))
+    return values
+
+
+def _save_npz(columns, filepath):
+    schema, arrays = _encode(columns)
+    arrays[SCHEMA_KEY] = np.array(json.dumps(schema))
+    with open(filepath, "wb") as file:
+        np.savez(file, **arrays)
+
+
+def _read_npz_schema(data):
+    if SCHEMA_KEY in data.files:
+        return json.loads(str(data[SCHEMA_KEY]))
+
+    # archives without schema store plain (unpacked) columns
+    columns = [{"name": name} for name in data.files]
+    length = len(data[data.files[0]]) if data.files else 0
+    return {"version": SCHEMA_VERSION, "length": length, "columns": columns}
+
+
+def _save_npy_dir(columns, dirpath):
+    if not os.path.exists(dirpath):
+        os.makedirs(dirpath)
+
+    schema, arrays = _encode(columns)
+
+    for i, col in enumerate(schema["columns"]):
+        col["file"] = "col-{:04d}.npy".format(i)
+        np.save(os.path.join(dirpath, col["file"]), arrays[col["name"]])
+
+    with open(os.path.join(dirpath, SCHEMA_FILENAME), "w") as file:
+        file.write(json.dumps(schema, indent=2))
@@ -0,0 +1,331 @@
+# This file is part of rddlgym.
+
+# rddlgym is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# rddlgym is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with rddlgym. If not, see <http://www.gnu.org/licenses/>.
+
+"""Experiment sweeps over instances x planners x hyperparameters.
+
+Results are written in the layout read by the benchmark visualizer
+(rddlgym/viz/benchmark.py)::
+
+    <logdir>/<instance>/<planner>/<key1>=<value1>/.../config.json
+    <logdir>/<instance>/<planner>/<key1>=<value1>/.../run<N>/data.csv
+    <logdir>/index.json
+"""
+
+# pylint: disable=missing-docstring,too-many-arguments,too-many-locals
+
+
+from collections import deque, OrderedDict, namedtuple
+import heapq
+import importlib
+import itertools
+import json
+import multiprocessing
+import os
+import queue
+import time
+
+from rddlgym import storage
+from rddlgym.runner import Runner
+from rddlgym.utils import make, Mode
+
+
+INDEX_FILENAME = "index.json"
+CONFIG_FILENAME = "config.json"
+INDEX_VERSION = 1
+
+PLANNERS = {"random": "rddlgym.policies:RandomPolicy"}
+
+# config.json entries that hyperparameters can't override
+RESERVED = ("instance", "planner")
+
+
+Job = namedtuple("Job", "experiment_id instance planner factory config run seed")
+
+
+def expand_grid(grid=None):
+    """Returns the list of configs in the cartesian product of `grid`.
+
+    Args:
+        grid (Optional[Dict[str, Sequence]]): Mapping from hyperparameter
+            to the list of its values.
+
+    Returns:
+        List[OrderedDict]: The configs, with hyperparameters sorted by name.
+    """
+    grid = grid or {}
+    keys = sorted(grid)
+    return [
+        OrderedDict(zip(keys, values))
+        for values in itertools.product(*(grid[key] for key in keys))
+    ]
+
+
+def experiment_id(instance, planner, config):
+    """Returns the experiment's directory relative to the sweep's logdir."""
+    params = ["{}={}".format(key, value) for key, value in config.items()]
+    return os.path.join(instance, planner, *params)
+
+
+def load_planner(spec):
+    """Returns the planner factory given by `spec`.
+
+    Args:
+        spec (Union[str, Callable]): A name in `PLANNERS`, a "module:attr"
+            import path or a factory `factory(env, **config)` itself.
+    """
+    if callable(spec):
+        return spec
+
+    spec = PLANNERS.get(spec, spec)
+    module, _, attr = spec.partition(":")
+    if not attr:
+        raise ValueError("Invalid planner (expected module:attr): {}".format(spec))
+
+    return getattr(importlib.import_module(module), attr)
+
+
+def planner_name(spec):
+    """Returns the default name of the planner given by `spec`."""
+    if callable(spec):
+        return spec.__name__
+    return spec.rpartition(":")[2] if ":" in spec else spec
+
+
+def read_index(logdir):
+    """Returns the sweep index in `logdir` (or None if there is none)."""
+    filepath = os.path.join(logdir, INDEX_FILENAME)
+    if not os.path.exists(filepath):
+        return None
+
+    with open(filepath, "r") as file:
+        return json.loads(file.read(), object_pairs_hook=OrderedDict)
+
+
+def sweep(
+    instances,
+    planners,
+    grid=None,
+    runs=1,
+    logdir="/tmp/rddlgym/sweep",
+    workers=None,
+    fmt=storage.CSV,
+    seed=None,
+):
+    """Runs all `runs` episodes of every instance x planner x config.
+
+    Episodes are scheduled on a process pool, longest expected first.
+    The expected cost of an episode is the mean measured duration of the
+    episodes of the same experiment (instance, planner and config), either
+    from this sweep or recorded in a previous sweep's index. Unmeasured
+    experiments are scheduled first so that their cost is measured early.
+    Episodes already recorded in the index are skipped.
+
+    Args:
+        instances (Sequence[str]): The RDDL ids or filenames.
+        planners (Union[Sequence[str], Dict[str, Any]]): The planner specs
+            (see `load_planner`), or a mapping from planner name to spec.
+            Each planner is built as `factory(env, **config)`.
+        grid (Optional[Dict[str, Sequence]]): The hyperparameter grid.
+        runs (int): The number of episodes per experiment.
+        logdir (str): The sweep's directory.
+        workers (Optional[int]): The number of processes (defaults to all CPUs).
+        fmt (str): The episodes' storage format.
+        seed (Optional[int]): If given, run N is seeded with `seed + N`.
+
+    Returns:
+        Dict[str, Any]: The sweep index.
+
+    Raises:
+        ValueError: If a hyperparameter is named "instance" or "planner".
+    """
+    reserved = sorted(set(RESERVED) & set(grid or {}))
+    if reserved:
+        raise ValueError("Invalid hyperparameters (reserved): {}".format(reserved))
+
+    if not isinstance(planners, dict):
+        planners = OrderedDict((planner_name(spec), spec) for spec in planners)
+
+    index = read_index(logdir) or OrderedDict(
+        [("version", INDEX_VERSION), ("experiments", OrderedDict())]
+    )
+    experiments = index["experiments"]
+
+    pending = []
+    for instance, (planner, spec), config in itertools.product(
+        instances, planners.items(), expand_grid(grid)
+    ):
+        exp_id = experiment_id(os.path.basename(instance), planner, config)
+        experiment = experiments.setdefault(
+            exp_id,
+            OrderedDict(
+                [
+                    ("instance", instance),
+                    ("planner", planner),
+                    ("config", config),
+                    ("runs", OrderedDict()),
+                ]
+            ),
+        )
+
+        dirpath = os.path.join(logdir, exp_id)
+        if not os.path.exists(dirpath):
+            os.makedirs(dirpath)
+        _write_json(
+            OrderedDict(instance=instance, planner=planner, **config),
+            os.path.join(dirpath, CONFIG_FILENAME),
+        )
+
+        for run in range(runs):
+            record = experiment["runs"].get(str(run))
+            if record is not None and os.path.exists(
+                os.path.join(logdir, record["file"])
+            ):
+                continue
+
+            run_seed = None if seed is None else seed + run
+            pending.append(Job(exp_id, instance, planner, spec, config, run, run_seed))
+
+    scheduler = _Scheduler(pending)
+    for exp_id, experiment in experiments.items():
+        for record in experiment["runs"].values():
+            scheduler.add_cost(exp_id, record["seconds"])
+
+    if not pending:
+        return index
+
+    workers = min(workers or os.cpu_count(), len(pending))
+    results = queue.Queue()
+
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(workers) as pool:
+        in_flight = 0
+        while scheduler or in_flight:
+            while scheduler and in_flight < workers:
+                pool.apply_async(
+                    _run_job,
+                    (scheduler.pop(), logdir, fmt),
+                    callback=results.put,
+                    error_callback=results.put,
+                )
+                in_flight += 1
+
+            result = results.get()
+            in_flight -= 1
+            if isinstance(result, BaseException):
+                raise result
+
+            job, record = result
+            scheduler.add_cost(job.experiment_id, record["seconds"])
+            experiments[job.experiment_id]["runs"][str(job.run)] = record
+            _write_json(index, os.path.join(logdir, INDEX_FILENAME))
+
+    _write_json(index, os.path.join(logdir, INDEX_FILENAME))
+    return index
+
+
+class _Scheduler:
+    """Max-heap of the pending jobs' experiments by expected cost.
+
+    The mean cost of each experiment is kept as a running (sum, count), and
+    heap entries whose cost is outdated are dropped lazily when popped.
+    """
+
+    def __init__(self, jobs):
+        self._jobs = OrderedDict()
+        for job in jobs:
+            self._jobs.setdefault(job.experiment_id, deque()).append(job)
+
+        self._costs = {}
+        self._queued = {}
+        self._heap = []
+        self._order = itertools.count()
+        for exp_id in self._jobs:
+            self._push(exp_id)
+
+    def __bool__(self):
+        return bool(self._jobs)
+
+    def add_cost(self, exp_id, seconds):
+        total, count = self._costs.get(exp_id, (0.0, 0))
+        self._costs[exp_id] = (total + seconds, count + 1)
+        if exp_id in self._jobs and self._queued[exp_id] != self._cost(exp_id):
+            self._push(exp_id)
+
+    def pop(self):
+        while True:
+            cost, _, exp_id = heapq.heappop(self._heap)
+            if exp_id in self._jobs and self._queued[exp_id] == -cost:
+                break
+
+        jobs = self._jobs[exp_id]
+        job = jobs.popleft()
+        if jobs:
+            heapq.heappush(self._heap, (cost, next(self._order), exp_id))
+        else:
+            del self._jobs[exp_id]
+        return job
+
+    def _cost(self, exp_id):
+        total, count = self._costs.get(exp_id, (0.0, 0))
+        return total / count if count else float("inf")
+
+    def _push(self, exp_id):
+        self._queued[exp_id] = cost = self._cost(exp_id)
+        heapq.heappush(self._heap, (-cost, next(self._order), exp_id))
+
+
+_ENVS = {}
+
+
+def _run_job(job, logdir, fmt):
+    if job.instance not in _ENVS:
+        _ENVS[job.instance] = make(job.instance, mode=Mode.GYM)
+    env = _ENVS[job.instance]
+    env.seed(job.seed)
+
+    planner = load_planner(job.factory)(env, **job.config)
+    if hasattr(planner, "seed"):
+        planner.seed(job.seed)
+    runner = Runner(env, planner)
+    runner.build()
+
+    start = time.perf_counter()
+    trajectory = runner.run()
+    seconds = time.perf_counter() - start
+
+    if hasattr(planner, "close"):
+        planner.close()
+
+    filename = "data" if fmt == storage.NPY else "data.{}".format(fmt)
+    filepath = os.path.join(job.experiment_id, "run{}".format(job.run), filename)
+    trajectory.save(os.path.join(logdir, filepath), fmt)
+
+    record = OrderedDict(
+        [
+            ("file", filepath),
+            ("seed", job.seed),
+            ("length", len(trajectory)),
+            ("total_reward", float(trajectory.total_reward)),
+            ("seconds", seconds),
+        ]
+    )
+    return job, record
+
+
+def _write_json(data, filepath):
+    tmppath = filepath + ".tmp"
+    with open(tmppath, "w") as file:
+        file.write(json.dumps(data, indent=2))
+    os.replace(tmppath, filepath)
@@ -18,14 +18,91 @@
 
 
 from collections import OrderedDict, namedtuple
-import os
+from collections.abc import Mapping
 
 import numpy as np
 import pandas as pd
 
+from rddlgym import storage
+
 
 Transition = namedtuple("Transition", "step state action reward next_state info done")
 
+Fluent = namedtuple("Fluent", "name variables shape dtype")
+
+
+RANGE_TYPES = {"real": np.float32, "int": np.int32, "bool": np.bool_}
+
+
+def fluent_layout(rddl):
+    """Returns an OrderedDict mapping transition fields to lists of `Fluent`."""
+
+    def _fluents(variables, sizes, range_types):
+        return [
+            Fluent(name, fluent_vars, tuple(shape), RANGE_TYPES[range_type])
+            for (name, fluent_vars), shape, range_type in zip(
+                variables, sizes, range_types
+            )
+        ]
+
+    return OrderedDict(
+        [
+            (
+                "state",
+                _fluents(
+                    rddl.state_fluent_variables,
+                    rddl.state_size,
+                    rddl.state_range_type,
+                ),
+            ),
+            (
+                "action",
+                _fluents(
+                    rddl.action_fluent_variables,
+                    rddl.action_size,
+                    rddl.action_range_type,
+                ),
+            ),
+            (
+                "info",
+                _fluents(
+                    rddl.interm_fluent_variables,
+                    rddl.interm_size,
+                    rddl.interm_range_type,
+                ),
+            ),
+        ]
+    )
+
+
+class LazyFluents(Mapping):
+    """LazyFluents maps fluent names to (length, *shape) arrays whose
+    columns are only read from `reader` on first access.
+
+    Args:
+        reader (rddlgym.storage.ColumnReader): The saved trajectory columns.
+        fluents (List[Fluent]): The fluents' layout.
+    """
+
+    def __init__(self, reader, fluents):
+        self._reader = reader
+        self._fluents = OrderedDict((fluent.name, fluent) for fluent in fluents)
+        self._cache = {}
+
+    def __getitem__(self, name):
+        if name not in self._cache:
+            fluent = self._fluents[name]
+            columns = self._reader.read(fluent.variables)
+            values = np.stack(list(columns.values()), axis=1).astype(fluent.dtype)
+            self._cache[name] = np.reshape(values, (len(values), *fluent.shape))
+        return self._cache[name]
+
+    def __iter__(self):
+        return iter(self._fluents)
+
+    def __len__(self):
+        return len(self._fluents)
+
 
 class Trajectory:
     """Trajectory class handles state-action-interm-reward sequences."""
@@ -35,164 +112,415 @@ class Trajectory:
 
         self._trajectory = []
 
+        self._layout = None
+        self._reader = None
+
+        self._views = {}
+        self._total_reward = 0.0
+
+        self._latencies = []
+
     def add_transition(self, step, state, action, reward, next_state, info, done):
         """Adds transition to the trajectory."""
         # pylint: disable=too-many-arguments
         transition = Transition(step, state, action, reward, next_state, info, done)
-        self._trajectory.append(transition)
+        total_reward = self.total_reward
+        self._transitions().append(transition)
+        self._reader = None
+        self._views.clear()
+        self._total_reward = total_reward + float(reward)
+
+    def add_latency(self, planner, env, missed=False):
+        """Adds the planner and env latencies (in seconds) of a step and
+        whether the planner missed its deadline."""
+        self._latencies.append((planner, env, missed))
+        self._views.pop("latencies", None)
+
+    @property
+    def latencies(self):
+        """Returns an OrderedDict with the per-step "planner" and "env"
+        latencies and "missed" deadline flags as arrays."""
+        if "latencies" not in self._views:
+            planner, env, missed = (
+                zip(*self._latencies) if self._latencies else ((), (), ())
+            )
+            self._views["latencies"] = OrderedDict(
+                [
+                    ("planner", np.array(planner, dtype=np.float64)),
+                    ("env", np.array(env, dtype=np.float64)),
+                    ("missed", np.array(missed, dtype=np.bool_)),
+                ]
+            )
+        return self._views["latencies"]
+
+    def latency_summary(self, percentiles=(50, 90, 99)):
+        """Returns the mean, max and `percentiles` of planner and env
+        latencies, and the number and rate of deadline misses."""
+        latencies = self.latencies
+
+        summary = OrderedDict()
+        for name in ["planner", "env"]:
+            values = latencies[name]
+            stats = OrderedDict()
+            if len(values) > 0:
+                stats["mean"] = float(np.mean(values))
+                for percentile in percentiles:
+                    stats["p{}".format(percentile)] = float(
+                        np.percentile(values, percentile)
+                    )
+                stats["max"] = float(np.max(values))
+            summary[name] = stats
+
+        missed = latencies["missed"]
+        summary["misses"] = int(np.sum(missed))
+        summary["miss_rate"] = float(np.mean(missed)) if len(missed) > 0 else 0.0
+
+        return summary
+
+    @property
+    def layout(self):
+        """Returns the trajectory's fluent layout (see `fluent_layout`)."""
+        if self._layout is None:
+            self._layout = fluent_layout(self.env._compiler.rddl)
+        return self._layout
+
+    def as_columns(self):
+        """Returns an OrderedDict mapping fluent variables to 1-D arrays.
+
+        Columns keep the fluents' own dtypes (e.g., np.float32 or np.bool_).
+        """
+        layout = self.layout
+
+        columns = OrderedDict()
+
+        if self._reader is not None:
+            for field, fluents in zip(layout, (self.states, self.actions, self.infos)):
+                for fluent in layout[field]:
+                    values = np.reshape(fluents[fluent.name], (len(self), -1))
+                    for i, variable in enumerate(fluent.variables):
+                        columns[variable] = values[:, i]
+            columns["reward"] = np.array(self.rewards)
+            columns["done"] = self._reader["done"].astype(np.bool_)
+            return columns
+
+        for field, fluents in layout.items():
+            for fluent in fluents:
+                values = np.empty(
+                    shape=(len(self), len(fluent.variables)), dtype=fluent.dtype
+                )
+                for step, transition in enumerate(self._trajectory):
+                    values[step] = np.reshape(
+                        getattr(transition, field)[fluent.name], -1
+                    )
+
+                for i, variable in enumerate(fluent.variables):
+                    columns[variable] = values[:, i]
+
+        columns["reward"] = np.array(self.rewards)
+        columns["done"] = np.array(
+            [transition.done for transition in self._trajectory], dtype=np.bool_
+        )
+
+        return columns
 
     def as_dataframe(self):
         """Returns the trajectory as a dataframe with columns as fluent variables."""
-        # pylint: disable=too-many-branches
-        state_fluent_variables = self.env._compiler.rddl.state_fluent_variables
-        states_dict = OrderedDict({})
-        for _, state_vars in state_fluent_variables:
-            for name in state_vars:
-                states_dict[name] = np.empty(shape=(len(self),))
-
-        action_fluent_variables = self.env._compiler.rddl.action_fluent_variables
-        actions_dict = OrderedDict({})
-        for _, action_vars in action_fluent_variables:
-            for name in action_vars:
-                actions_dict[name] = np.empty(shape=(len(self),))
-
-        interm_fluent_variables = self.env._compiler.rddl.interm_fluent_variables
-        interms_dict = OrderedDict({})
-        for _, interm_vars in interm_fluent_variables:
-            for name in interm_vars:
-                interms_dict[name] = np.empty(shape=(len(self),))
-
-        reward_dict = {"reward": np.empty(shape=len(self))}
-
-        done_dict = {"done": np.empty(shape=len(self))}
-
-        for transition in self._trajectory:
-            step = transition.step
-
-            state = transition.state
-            for fluent_name, state_vars in state_fluent_variables:
-                for i, fluent_variable in enumerate(state_vars):
-                    fluent_value = np.reshape(state[fluent_name], -1)
-                    states_dict[fluent_variable][step] = fluent_value[i]
-
-            action = transition.action
-            for fluent_name, action_vars in action_fluent_variables:
-                for i, fluent_variable in enumerate(action_vars):
-                    fluent_value = np.reshape(action[fluent_name], -1)
-                    actions_dict[fluent_variable][step] = fluent_value[i]
-
-            interm = transition.info
-            for fluent_name, interm_vars in interm_fluent_variables:
-                for i, fluent_variable in enumerate(interm_vars):
-                    fluent_value = np.reshape(interm[fluent_name], -1)
-                    interms_dict[fluent_variable][step] = fluent_value[i]
-
-            reward = transition.reward
-            reward_dict["reward"][step] = reward
-
-            done = transition.done
-            done_dict["done"][step] = done
-
-        trajectory_dict = OrderedDict(
-            {**states_dict, **actions_dict, **interms_dict, **reward_dict, **done_dict}
+        columns = self.as_columns()
+        data = OrderedDict(
+            (name, values.astype(np.float64)) for name, values in columns.items()
         )
+        return pd.DataFrame(data=data)
 
-        return pd.DataFrame(data=trajectory_dict)
+    def save(self, filepath, fmt=None):
+        """Saves the trajectory in the filepath.
 
-    def save(self, filepath):
-        """Saves the trajectory in the filepath as a CSV file."""
+        The storage format (CSV, NPZ or NPY directory) is inferred from
+        `filepath` if `fmt` is not given (see rddlgym.storage).
+
+        Returns:
+            The saved data: a dataframe for CSV files, or
+            an OrderedDict of columns for binary formats.
+        """
         # pylint: disable=invalid-name
-        dirname = os.path.dirname(filepath)
-        if not os.path.exists(dirname):
-            os.makedirs(dirname)
+        fmt = fmt or storage.infer_format(filepath)
+
+        if fmt == storage.CSV:
+            df = self.as_dataframe()
+            storage.save_columns(df, filepath, fmt)
+            return df
+
+        columns = self.as_columns()
+        storage.save_columns(columns, filepath, fmt)
+        return columns
+
+    @classmethod
+    def load(cls, filepath, env_or_schema, fmt=None):
+        """Loads a trajectory saved in `filepath`.
+
+        Columns are read lazily: `states`, `actions`, `infos` and `rewards`
+        only read the columns of the accessed fluents, and transitions are
+        only rebuilt when iterating or indexing the trajectory. As saved
+        trajectories do not include the final next state, the last
+        transition's `next_state` is None.
+
+        Args:
+            filepath (str): The CSV file, NPZ archive or NPY directory.
+            env_or_schema: The RDDLEnv, the RDDL AST (see rddlgym.Mode.AST)
+                or the fluent layout (see `fluent_layout`) of the trajectory.
+            fmt (Optional[str]): The storage format (inferred if not given).
+
+        Returns:
+            rddlgym.Trajectory: The loaded trajectory.
+        """
+        env, layout = None, env_or_schema
+        if hasattr(env_or_schema, "_compiler"):
+            env, layout = env_or_schema, fluent_layout(env_or_schema._compiler.rddl)
+        elif not isinstance(env_or_schema, Mapping):
+            layout = fluent_layout(env_or_schema)
+
+        trajectory = cls(env)
+        trajectory._trajectory = None
+        trajectory._layout = layout
+        trajectory._reader = storage.ColumnReader(filepath, fmt)
+        trajectory._total_reward = None
+        return trajectory
+
+    def _transitions(self):
+        if self._trajectory is None:
+            self._trajectory = self._read_transitions()
+        return self._trajectory
+
+    def _read_transitions(self):
+        length = len(self)
+        states, actions, infos = self.states, self.actions, self.infos
+        rewards = self.rewards
+        dones = self._reader["done"].astype(np.bool_)
+
+        def _at(fluents, step):
+            return OrderedDict((name, values[step]) for name, values in fluents.items())
+
+        return [
+            Transition(
+                step,
+                _at(states, step),
+                _at(actions, step),
+                rewards[step],
+                _at(states, step + 1) if step + 1 < length else None,
+                _at(infos, step),
+                bool(dones[step]),
+            )
+            for step in range(length)
+        ]
+
+    def _view(self, name):
+        """Returns the cached view `name`, building it on first access."""
+        if name not in self._views:
+            if name == "rewards":
+                self._views[name] = self._stack_rewards()
+            else:
+                self._views[name] = self._stack_fluents(name)
+        return self._views[name]
+
+    def _stack_fluents(self, field):
+        if self._reader is not None:
+            return LazyFluents(self._reader, self.layout[field])
 
-        df = self.as_dataframe()
-        df.to_csv(filepath, index=False)
-        return df
+        if not self._trajectory:
+            return OrderedDict()
+
+        fluents = OrderedDict()
+        for name in getattr(self._trajectory[0], field):
+            values = np.stack(
+                [getattr(transition, field)[name] for transition in self._trajectory]
+            )
+            values.flags.writeable = False
+            fluents[name] = values
+        return fluents
+
+    def _stack_rewards(self):
+        if self._reader is not None:
+            rewards = self._reader["reward"].astype(np.float32)
+        else:
+            rewards = np.array(
+                [transition.reward for transition in self._trajectory],
+                dtype=np.float32,
+            )
+        rewards.flags.writeable = False
+        return rewards
 
     @property
     def states(self):
-        """Returns a dict mapping state fluent name to sequence of values."""
-        if not self._trajectory:
-            return {}
-
-        fluents = self._trajectory[0].state.keys()
-        states_dict = OrderedDict({name: [] for name in fluents})
-
-        for transition in self._trajectory:
-            for name, value in transition.state.items():
-                states_dict[name].append(value)
+        """Returns a dict mapping state fluent name to a (length, *shape) array.
 
-        return states_dict
+        As all views below, it is cached until the next `add_transition`.
+        """
+        return self._view("state")
 
     @property
     def actions(self):
-        """Returns a dict mapping action fluent name to sequence of values."""
-        if not self._trajectory:
-            return {}
-
-        fluents = self._trajectory[0].action.keys()
-        actions_dict = OrderedDict({name: [] for name in fluents})
-
-        for transition in self._trajectory:
-            for name, value in transition.action.items():
-                actions_dict[name].append(value)
-
-        return actions_dict
+        """Returns a dict mapping action fluent name to a (length, *shape) array."""
+        return self._view("action")
 
     @property
     def infos(self):
-        """Returns a dict mapping action fluent name to sequence of values."""
-        if not self._trajectory:
-            return {}
-
-        fluents = self._trajectory[0].info.keys()
-        actions_dict = OrderedDict({name: [] for name in fluents})
-
-        for transition in self._trajectory:
-            for name, value in transition.info.items():
-                actions_dict[name].append(value)
-
-        return actions_dict
+        """Returns a dict mapping interm fluent name to a (length, *shape) array."""
+        return self._view("info")
 
     @property
     def rewards(self):
-        """Returns list of rewards."""
-        if not self._trajectory:
-            return []
-
-        rewards_lst = []
-        for transition in self._trajectory:
-            rewards_lst.append(transition.reward)
-
-        return rewards_lst
+        """Returns the (length,) array of rewards."""
+        return self._view("rewards")
 
     @property
     def initial_state(self):
         """Returns the trajectory's initial state."""
-        if not self._trajectory:
+        if not self:
             return None
 
-        return self._trajectory[0].state
+        return self[0].state
 
     @property
     def final_state(self):
         """Returns the trajectory's final state."""
-        if not self._trajectory:
+        if not self:
             return None
 
-        return self._trajectory[-1].next_state
+        return self[-1].next_state
 
     @property
     def total_reward(self):
         """Returns the total sum of the trajectory's rewards."""
-        return sum(self.rewards)
+        if self._total_reward is None:
+            self._total_reward = float(np.sum(self.rewards, dtype=np.float64))
+        return self._total_reward
 
     def __len__(self):
+        if self._reader is not None:
+            return len(self._reader)
         return len(self._trajectory)
 
     def __iter__(self):
-        return iter(self._trajectory)
+        return iter(self._transitions())
 
     def __getitem__(self, i):
-        return self._trajectory[i]
+        return self._transitions()[i]
+
+
+class TrajectoryWriter:
+    """TrajectoryWriter streams transitions to disk in fixed-size chunks.
+
+    It implements the `add_transition` interface of Trajectory and can be
+    used as a sink in `rddlgym.Runner.run`. At most `chunk_size` transitions
+    are kept in memory, and the file written has the same columns as
+    `Trajectory.save` (see rddlgym.storage.ColumnWriter for formats).
+
+    Args:
+        env (rddlgym.RDDLEnv): The RDDLEnv gym environment.
+        filepath (str): The CSV file or NPY directory.
+        chunk_size (int): The number of buffered transitions per chunk.
+        fmt (Optional[str]): The storage format (inferred if not given).
+    """
+
+    def __init__(self, env, filepath, chunk_size=1024, fmt=None):
+        self.env = env
+        self.filepath = filepath
+        self.chunk_size = chunk_size
+
+        self._writer = storage.ColumnWriter(filepath, fmt)
+        self._dtype = np.float64 if self._writer.fmt == storage.CSV else None
+
+        self._layout = fluent_layout(env._compiler.rddl)
+        self._buffers = OrderedDict(
+            (
+                field,
+                OrderedDict(
+                    (
+                        fluent.name,
+                        np.empty((chunk_size, len(fluent.variables)), fluent.dtype),
+                    )
+                    for fluent in fluents
+                ),
+            )
+            for field, fluents in self._layout.items()
+        )
+        self._rewards = np.empty((chunk_size,), dtype=np.float32)
+        self._dones = np.empty((chunk_size,), dtype=np.bool_)
+
+        self._size = 0
+        self._length = 0
+        self._total_reward = 0.0
+
+        self.closed = False
+
+    def add_transition(self, step, state, action, reward, next_state, info, done):
+        """Buffers the transition and writes a chunk to disk when full.
+
+        Raises:
+            ValueError: If the writer is closed.
+        """
+        # pylint: disable=too-many-arguments,unused-argument
+        if self.closed:
+            raise ValueError("Cannot add transitions to a closed TrajectoryWriter.")
+
+        i = self._size
+        for field, values in (("state", state), ("action", action), ("info", info)):
+            for name, buffer in self._buffers[field].items():
+                buffer[i] = np.reshape(values[name], -1)
+        self._rewards[i] = reward
+        self._dones[i] = done
+
+        self._size += 1
+        self._length += 1
+        self._total_reward += reward
+
+        if self._size == self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """Writes buffered transitions and flushes them to disk."""
+        if self._size > 0 or self._writer.length == 0:
+            self._writer.write(self._chunk())
+            self._size = 0
+        self._writer.flush()
+
+    def close(self):
+        """Writes remaining transitions and closes the file (closing an
+        already closed writer has no effect)."""
+        if self.closed:
+            return
+        self.flush()
+        self._writer.close()
+        self.closed = True
+
+    def _chunk(self):
+        size = self._size
+        columns = OrderedDict()
+
+        for field, fluents in self._layout.items():
+            for fluent in fluents:
+                values = self._buffers[field][fluent.name][:size]
+                for i, variable in enumerate(fluent.variables):
+                    columns[variable] = values[:, i]
+
+        columns["reward"] = self._rewards[:size]
+        columns["done"] = self._dones[:size]
+
+        if self._dtype is not None:
+            for name, values in columns.items():
+                columns[name] = values.astype(self._dtype)
+
+        return columns
+
+    @property
+    def total_reward(self):
+        """Returns the total sum of the written rewards."""
+        return self._total_reward
+
+    def __len__(self):
+        return self._length
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close()
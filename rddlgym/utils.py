@@ -17,15 +17,33 @@
 """Collection of utility functions used in the rddlgym package."""
 
 
+from collections import OrderedDict
 from enum import Enum, auto
+import hashlib
 import json
 import os
+import pickle
+import tempfile
+import threading
 
+import pyrddl
 from pyrddl.parser import RDDLParser
 from rddl2tf.compilers import DefaultCompiler
 
-import rddlgym
 from rddlgym.env import RDDLEnv
+from rddlgym.registry import get_registry
+
+
+CACHE_DIR_ENV = "RDDLGYM_CACHE_DIR"
+MODEL_CACHE_SIZE = 32
+CACHE_SIZE = 8
+
+_PARSERS = {}
+_MODELS = OrderedDict()
+_LOCK = threading.Lock()
+
+_CACHE = OrderedDict()
+_CACHE_LOCK = threading.Lock()
 
 
 class Mode(Enum):
@@ -38,12 +56,10 @@ class Mode(Enum):
 
 
 def read_db():
-    """Returns list of available RDDL domains as a JSON object."""
-    dirname = os.path.join(os.path.dirname(rddlgym.__file__), "files")
-    domains = os.path.join(dirname, "all.json")
-    with open(domains, "r") as file:
-        domains = json.loads(file.read())
-        return domains
+    """Returns the metadata of the available RDDL domains by id."""
+    return OrderedDict(
+        (rddl, entry.metadata) for rddl, entry in get_registry().index.items()
+    )
 
 
 def read_model(filename):
@@ -53,16 +69,129 @@ def read_model(filename):
         return rddl
 
 
+def get_parser(verbose=False):
+    """Returns the process-wide built RDDLParser."""
+    with _LOCK:
+        parser = _PARSERS.get(verbose)
+        if parser is None:
+            parser = RDDLParser(verbose=verbose)
+            parser.build()
+            _PARSERS[verbose] = parser
+        return parser
+
+
+def cache_dir():
+    """Returns the on-disk AST cache directory (or None if disabled)."""
+    return os.environ.get(CACHE_DIR_ENV) or None
+
+
+def model_key(rddl):
+    """Returns the AST cache key of the `rddl` string."""
+    digest = hashlib.sha1(rddl.encode("utf-8")).hexdigest()
+    return "{}-pyrddl-{}".format(digest, getattr(pyrddl, "__version__", "unknown"))
+
+
+def model_path(dirpath, key):
+    """Returns the path of the pickled AST `key` in the cache `dirpath`."""
+    return os.path.join(dirpath, "{}.pkl".format(key))
+
+
+def write_atomic(filepath, data):
+    """Writes the bytes `data` to `filepath` through a temporary file, so
+    that readers never see a partially written file."""
+    dirpath = os.path.dirname(filepath) or "."
+    os.makedirs(dirpath, exist_ok=True)
+    fd, tmppath = tempfile.mkstemp(dir=dirpath, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+        os.replace(tmppath, filepath)
+    except BaseException:
+        os.remove(tmppath)
+        raise
+
+
+def write_model(dirpath, key, data):
+    """Atomically writes the pickled AST `data` to the cache `dirpath`."""
+    write_atomic(model_path(dirpath, key), data)
+
+
+def clear_model_cache():
+    """Clears the in-memory AST cache."""
+    with _LOCK:
+        _MODELS.clear()
+
+
 def parse_model(filename, verbose=False):
-    """Returns RDDL abstract syntax tree (AST)."""
+    """Returns RDDL abstract syntax tree (AST).
+
+    Parsing reuses a process-wide built parser, and ASTs are cached by the
+    hash of the file contents and the pyrddl version, both in memory (LRU)
+    and, if the `RDDLGYM_CACHE_DIR` environment variable is set, as pickle
+    files on disk. Every call returns a fresh copy of the AST. The cache is
+    bypassed in verbose mode.
+    """
     rddl = read_model(filename)
-    parser = RDDLParser(verbose=verbose)
-    parser.build()
-    model = parser.parse(rddl)
+
+    if verbose:
+        return _parse(rddl, verbose)
+
+    key = model_key(rddl)
+    data = _read_cached_model(key)
+    if data is None:
+        data = pickle.dumps(_parse(rddl), protocol=pickle.HIGHEST_PROTOCOL)
+        _write_cached_model(key, data)
+
+    return pickle.loads(data)
+
+
+def _parse(rddl, verbose=False):
+    parser = get_parser(verbose)
+    with _LOCK:
+        parser.lexer.build()  # resets the lexer state (e.g., line numbers)
+        model = parser.parse(rddl)
     model.build()
     return model
 
 
+def _read_cached_model(key):
+    with _LOCK:
+        if key in _MODELS:
+            _MODELS.move_to_end(key)
+            return _MODELS[key]
+
+    dirpath = cache_dir()
+    if dirpath is None:
+        return None
+
+    filepath = model_path(dirpath, key)
+    if not os.path.exists(filepath):
+        return None
+
+    with open(filepath, "rb") as file:
+        data = file.read()
+    _remember_model(key, data)
+    return data
+
+
+def _write_cached_model(key, data):
+    _remember_model(key, data)
+
+    dirpath = cache_dir()
+    if dirpath is None:
+        return
+
+    write_model(dirpath, key, data)
+
+
+def _remember_model(key, data):
+    with _LOCK:
+        _MODELS[key] = data
+        _MODELS.move_to_end(key)
+        while len(_MODELS) > MODEL_CACHE_SIZE:
+            _MODELS.popitem(last=False)
+
+
 def create_env(filename, config=None):
     """Returns a RDDLEnv object for the given RDDL file."""
     return RDDLEnv(filename, config)
@@ -75,8 +204,79 @@ def compile_model(filename):
     return compiler
 
 
-def load(filename, mode=Mode.AST, config=None, verbose=False):
-    """Loads `filename` with given `mode`."""
+def clear_cache():
+    """Evicts all cached environments and compilers, closing the environments
+    (including the ones still used by callers of `load` and `make`)."""
+    with _CACHE_LOCK:
+        evicted = list(_CACHE.values())
+        _CACHE.clear()
+
+    for obj in evicted:
+        _release(obj)
+
+
+def _cache_key(filename, mode, config):
+    config = json.dumps(config, sort_keys=True, default=str)
+    return (os.path.realpath(filename), mode.name, config)
+
+
+def _checkout(key):
+    with _CACHE_LOCK:
+        obj = _CACHE.get(key)
+        if obj is None:
+            return None
+
+        if getattr(obj, "closed", False):
+            del _CACHE[key]
+            return None
+
+        _CACHE.move_to_end(key)
+
+    if isinstance(obj, RDDLEnv):
+        obj.seed(None)
+        obj.set_horizon(None)
+        obj.reset()
+
+    return obj
+
+
+def _checkin(key, obj):
+    with _CACHE_LOCK:
+        if key in _CACHE:
+            return
+
+        _CACHE[key] = obj
+        # evicted envs may still be used by earlier callers: they are only
+        # dropped from the cache, and their sessions are closed once they
+        # are garbage collected
+        while len(_CACHE) > CACHE_SIZE:
+            _CACHE.popitem(last=False)
+
+
+def _release(obj):
+    if isinstance(obj, RDDLEnv):
+        obj.close()
+
+
+def load(filename, mode=Mode.AST, config=None, verbose=False, cache=False):
+    """Loads `filename` with given `mode`.
+
+    If `cache` is True, compilers (`Mode.SCG`) and environments (`Mode.GYM`)
+    are memoized in a bounded LRU cache keyed by (resolved path, mode,
+    config) and shared across calls. Cached environments are unseeded, their
+    horizon restored and reset on checkout. Evicted ones are not closed, so
+    that earlier callers can keep using them, but `clear_cache` closes all
+    cached environments.
+    """
+    # pylint: disable=too-many-arguments
+    if cache and mode in (Mode.SCG, Mode.GYM):
+        key = _cache_key(filename, mode, config)
+        obj = _checkout(key)
+        if obj is None:
+            obj = load(filename, mode, config, verbose)
+            _checkin(key, obj)
+        return obj
+
     # pylint: disable=no-else-return
     if mode == Mode.RAW:
         return read_model(filename)
@@ -90,14 +290,11 @@ def load(filename, mode=Mode.AST, config=None, verbose=False):
         raise ValueError("Invalid rddlgym mode: {}".format(mode))
 
 
-def make(rddl, mode=Mode.AST, config=None, verbose=False):
-    """Returns `rddl` object for the given `mode`."""
-    # pylint: disable=no-else-return
+def make(rddl, mode=Mode.AST, config=None, verbose=False, cache=False):
+    """Returns `rddl` object for the given `mode` (see `load` for `cache`)."""
+    # pylint: disable=no-else-return,too-many-arguments
     if os.path.isfile(rddl):
-        return load(rddl, mode, config, verbose)
+        return load(rddl, mode, config, verbose, cache)
     else:
-        dirname = os.path.join(os.path.dirname(rddlgym.__file__), "files")
-        filename = os.path.join(dirname, "{}.rddl".format(rddl))
-        if not os.path.isfile(filename):
-            raise ValueError("Couldn't find RDDL domain: {}".format(rddl))
-        return load(filename, mode, config, verbose)
+        filename = get_registry().filepath(rddl)
+        return load(filename, mode, config, verbose, cache)
@@ -28,6 +28,8 @@ import numpy as np
 import pandas as pd
 import streamlit as st
 
+from rddlgym.storage import find_data_file, load_columns
+
 
 @st.cache
 def get_experiments(logdir):
@@ -60,8 +62,8 @@ def get_experiments(logdir):
 
 
 @st.cache
-def get_csv_filenames(experiment_id):
-    csv_files = []
+def get_data_filenames(experiment_id):
+    data_files = []
 
     dirpath = os.path.join(LOGDIR, experiment_id)
 
@@ -69,17 +71,17 @@ def get_csv_filenames(experiment_id):
         if not path.startswith("run"):
             continue
 
-        filepath = os.path.join(dirpath, path, "data.csv")
-        if os.path.isfile(filepath):
-            csv_files.append(filepath)
+        filepath = find_data_file(os.path.join(dirpath, path))
+        if filepath is not None:
+            data_files.append(filepath)
 
-    return csv_files
+    return data_files
 
 
 @st.cache
 def get_reward_data(filepath):
-    df = pd.read_csv(filepath)
-    return df.pop("reward")
+    columns = load_columns(filepath, columns=["reward"])
+    return pd.Series(columns["reward"], name="reward")
 
 
 @st.cache
@@ -91,8 +93,8 @@ def get_total_rewards_data(experiments):
     }
 
     for experiment_id in experiments:
-        csv_files = get_csv_filenames(experiment_id)
-        dataframes = [get_reward_data(csv) for csv in csv_files]
+        data_files = get_data_filenames(experiment_id)
+        dataframes = [get_reward_data(filepath) for filepath in data_files]
 
         total_rewards = [df.sum() for df in dataframes]
         total_rewards_data["experiment_id"].append(experiment_id)
@@ -170,8 +172,8 @@ def get_cumulative_rewards_data(experiments):
     cumulative_rewards = {}
 
     for experiment_id in experiments:
-        csv_files = get_csv_filenames(experiment_id)
-        dataframes = [get_reward_data(csv) for csv in csv_files]
+        data_files = get_data_filenames(experiment_id)
+        dataframes = [get_reward_data(filepath) for filepath in data_files]
 
         s = pd.concat([df.cumsum() for df in dataframes])
         s = s.groupby(s.index, sort=False)
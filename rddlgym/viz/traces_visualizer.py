@@ -26,28 +26,30 @@ import numpy as np
 import pandas as pd
 import streamlit as st
 
+from rddlgym.storage import find_data_file, load_columns
+
 
 @st.cache
 def get_trace_dataframe(filepath):
-    df = pd.read_csv(filepath)
+    df = pd.DataFrame(load_columns(filepath)).astype(np.float64)
     reward = df.pop("reward")
     df.pop("done")
     return df, reward
 
 
 @st.cache
-def get_csv_filenames(dirpath):
-    csv_files = []
+def get_data_filenames(dirpath):
+    data_files = []
 
     for path in os.listdir(dirpath):
         if not path.startswith("run"):
             continue
 
-        filepath = os.path.join(dirpath, path, "data.csv")
-        if os.path.isfile(filepath):
-            csv_files.append(filepath)
+        filepath = find_data_file(os.path.join(dirpath, path))
+        if filepath is not None:
+            data_files.append(filepath)
 
-    return csv_files
+    return data_files
 
 
 @st.cache
@@ -82,7 +84,7 @@ def get_experiment_folders(logdir):
 
 
 def plot_trace_run(dirpath, run):
-    filepath = os.path.join(dirpath, run, "data.csv")
+    filepath = find_data_file(os.path.join(dirpath, run))
     df1, df2 = get_trace_dataframe(filepath)
 
     trace_by_fluents, trace_by_objects = plot_trajectory(df1)
@@ -364,7 +366,7 @@ def plot_traces(dirpath):
     dataframes = []
     rewards_dict = {}
 
-    for filepath in get_csv_filenames(dirpath):
+    for filepath in get_data_filenames(dirpath):
         df1, df2 = get_trace_dataframe(filepath)
         dataframes.append(df1)
         rewards_dict[filepath] = df2
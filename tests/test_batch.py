@@ -0,0 +1,138 @@
+# This file is part of rddlgym.
+
+# rddlgym is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# rddlgym is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with rddlgym. If not, see <http://www.gnu.org/licenses/>.
+
+# pylint: disable=missing-docstring,redefined-outer-name
+
+
+import os
+import tempfile
+
+import numpy as np
+import pytest
+
+from rddlgym import make, GYM, Runner, TrajectoryBatch
+
+EPISODES = 4
+
+
+@pytest.fixture(scope="module", params=["Navigation-v2", "Reservoir-8"])
+def trajectories(request):
+    rddl = request.param
+    env = make(rddl, mode=GYM)
+
+    def planner(state, timestep):
+        # pylint: disable=unused-argument
+        return env.action_space.sample()
+
+    runner = Runner(env, planner)
+    return [runner.run() for _ in range(EPISODES)]
+
+
+@pytest.fixture(scope="module")
+def batch(trajectories):
+    return TrajectoryBatch.from_trajectories(trajectories)
+
+
+def test_from_trajectories(trajectories, batch):
+    horizon = len(trajectories[0])
+    assert len(batch) == EPISODES
+    assert batch.horizon == horizon
+    assert batch.rewards.shape == (EPISODES, horizon)
+    assert batch.mask.all()
+
+    for i, trajectory in enumerate(trajectories):
+        for name, values in trajectory.states.items():
+            assert batch.states[name].shape[:2] == (EPISODES, horizon)
+            assert np.allclose(batch.states[name][i], np.stack(values))
+        for name, values in trajectory.actions.items():
+            assert np.allclose(batch.actions[name][i], np.stack(values))
+        for name, values in trajectory.infos.items():
+            assert np.allclose(batch.interms[name][i], np.stack(values))
+
+
+def test_returns(trajectories, batch):
+    total_rewards = [trajectory.total_reward for trajectory in trajectories]
+    assert np.allclose(batch.returns, total_rewards, rtol=1e-4)
+
+
+def test_discounted_returns(trajectories, batch):
+    discount = 0.9
+    returns = batch.discounted_returns(discount)
+    for i, trajectory in enumerate(trajectories):
+        expected = sum(discount**t * r for t, r in enumerate(trajectory.rewards))
+        assert np.isclose(returns[i], expected, rtol=1e-4)
+
+    assert batch.discount == trajectories[0].env._compiler.rddl.instance.discount
+    assert np.allclose(
+        batch.discounted_returns(), batch.discounted_returns(batch.discount)
+    )
+
+
+@pytest.mark.parametrize("discount", [1.0, 0.9])
+def test_rewards_to_go(batch, discount):
+    rewards_to_go = batch.rewards_to_go(discount)
+    assert rewards_to_go.shape == batch.rewards.shape
+    assert np.allclose(
+        rewards_to_go[:, 0], batch.discounted_returns(discount), rtol=1e-4
+    )
+    assert np.allclose(rewards_to_go[:, -1], batch.rewards[:, -1])
+
+
+def test_statistics(batch):
+    assert np.allclose(batch.mean(), np.mean(batch.rewards, axis=0))
+    assert np.allclose(batch.std(), np.std(batch.rewards, axis=0))
+
+    mean = batch.mean(batch.returns)
+    lower, upper = batch.confidence_interval(batch.returns)
+    assert lower <= mean <= upper
+
+
+def test_padded_episodes():
+    rewards = np.array([[1.0, 2.0, 3.0], [1.0, 0.0, 0.0]])
+    batch = TrajectoryBatch({}, {}, {}, rewards, lengths=[3, 1])
+    assert np.allclose(batch.returns, [6.0, 1.0])
+    assert np.allclose(batch.mean(), [1.0, 2.0, 3.0])
+    lower, upper = batch.confidence_interval()
+    assert np.isnan(lower[1]) and np.isnan(upper[1])
+
+
+def test_save_and_load(batch):
+    with tempfile.TemporaryDirectory() as dirpath:
+        filepath = os.path.join(dirpath, "batch.npz")
+        batch.save(filepath)
+        batch_ = TrajectoryBatch.load(filepath)
+
+    assert batch_.discount == batch.discount
+    assert np.array_equal(batch_.lengths, batch.lengths)
+    assert np.array_equal(batch_.rewards, batch.rewards)
+    for field in ["states", "actions", "interms"]:
+        fluents, fluents_ = getattr(batch, field), getattr(batch_, field)
+        assert list(fluents_.keys()) == list(fluents.keys())
+        for name, values in fluents.items():
+            assert np.array_equal(fluents_[name], values)
+
+
+def test_save_and_load_bool_fluents():
+    alive = np.random.uniform(size=(4, 5, 3, 3)) > 0.5
+    batch = TrajectoryBatch({"alive/2": alive}, {}, {}, np.zeros((4, 5)))
+    with tempfile.TemporaryDirectory() as dirpath:
+        filepath = os.path.join(dirpath, "batch.npz")
+        batch.save(filepath)
+        with np.load(filepath) as data:
+            assert data["states/alive/2"].shape == (23,)
+        batch_ = TrajectoryBatch.load(filepath)
+
+    assert batch_.states["alive/2"].dtype == np.bool_
+    assert np.array_equal(batch_.states["alive/2"], alive)
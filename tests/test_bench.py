@@ -0,0 +1,78 @@
+# This file is part of rddlgym.
+
+# rddlgym is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# rddlgym is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with rddlgym. If not, see <http://www.gnu.org/licenses/>.
+
+# pylint: disable=missing-docstring,redefined-outer-name
+
+
+import copy
+import json
+
+import pytest
+
+from rddlgym import bench
+
+
+@pytest.fixture(scope="module")
+def report():
+    return bench.bench(["Navigation-v1"], steps=25, batch_size=8, isolate=False)
+
+
+def test_bench(report):
+    assert report["version"] == bench.REPORT_VERSION
+    assert report["versions"]["tensorflow"]
+    assert report["config"] == {"steps": 25, "batch_size": 8}
+
+    metrics = report["instances"]["Navigation-v1"]
+    for metric in [
+        "parse_time",
+        "init_time",
+        "compile_time",
+        "env_time",
+        "session_time",
+        "reset_latency",
+        "step_latency_p50",
+        "step_latency_p99",
+        "steps_per_sec",
+        "batch_steps_per_sec",
+        "peak_rss_mb",
+    ]:
+        assert metrics[metric] > 0.0
+
+    assert metrics["step_latency_p50"] <= metrics["step_latency_p99"]
+    assert json.loads(json.dumps(report)) == report
+
+
+def test_bench_isolated():
+    report = bench.bench(["Navigation-v1"], steps=5, batch_size=0)
+    metrics = report["instances"]["Navigation-v1"]
+    assert "batch_steps_per_sec" not in metrics
+    assert metrics["steps_per_sec"] > 0.0
+
+
+def test_compare(report):
+    assert bench.compare(report, report) == []
+    assert bench.compare(report, {"instances": {}}) == []
+
+    baseline = copy.deepcopy(report)
+    metrics = baseline["instances"]["Navigation-v1"]
+    metrics["parse_time"] /= 2.0
+    metrics["steps_per_sec"] *= 2.0
+    metrics["env_time"] /= 1.1
+
+    regressions = bench.compare(report, baseline, threshold=0.2)
+    assert [(rddl, metric) for rddl, metric, _, _ in regressions] == [
+        ("Navigation-v1", "parse_time"),
+        ("Navigation-v1", "steps_per_sec"),
+    ]
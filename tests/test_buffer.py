@@ -0,0 +1,170 @@
+# This file is part of rddlgym.
+
+# rddlgym is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# rddlgym is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with rddlgym. If not, see <http://www.gnu.org/licenses/>.
+
+# pylint: disable=missing-docstring,redefined-outer-name,protected-access
+
+
+import os
+import tempfile
+
+import numpy as np
+import pytest
+
+from rddlgym import make, GYM, Runner, ReplayBuffer, Trajectory
+
+
+BATCH_SIZE = 16
+
+
+@pytest.fixture(scope="module", params=["Reservoir-8", "GameOfLife-1"])
+def runner(request):
+    rddl = request.param
+    env = make(rddl, mode=GYM)
+
+    def planner(state, timestep):
+        # pylint: disable=unused-argument
+        return env.action_space.sample()
+
+    return Runner(env, planner)
+
+
+@pytest.fixture(scope="module")
+def trajectory(runner):
+    return runner.run()
+
+
+def test_add_transition(runner, trajectory):
+    buffer = ReplayBuffer(runner.env, capacity=len(trajectory) // 2)
+    for transition in trajectory:
+        buffer.add_transition(*transition)
+
+    assert len(buffer) == buffer.capacity
+    assert buffer._next == len(trajectory) % buffer.capacity
+
+    for i, transition in enumerate(trajectory[-buffer.capacity :]):
+        idx = (len(trajectory) - buffer.capacity + i) % buffer.capacity
+        assert np.isclose(buffer._rewards[idx], transition.reward)
+        assert buffer._dones[idx] == transition.done
+        for field in ["state", "next_state"]:
+            for name, value in getattr(transition, field).items():
+                array = buffer._arrays[field][name]
+                assert np.allclose(buffer._unpack(name, array[[idx]])[0], value)
+
+
+@pytest.mark.parametrize("filename", ["data.csv", "data.npz", "data"])
+def test_extend_loaded(runner, trajectory, filename):
+    with tempfile.TemporaryDirectory() as dirpath:
+        filepath = os.path.join(dirpath, filename)
+        trajectory.save(filepath)
+        loaded = Trajectory.load(filepath, runner.env)
+
+        buffer1 = ReplayBuffer(runner.env, capacity=len(trajectory))
+        buffer2 = ReplayBuffer(runner.env, capacity=len(trajectory))
+        for transition in trajectory[:-1]:
+            buffer1.add_transition(*transition)
+        buffer2.extend(loaded)
+
+    # the final next state isn't saved, so the last transition is skipped
+    size = len(trajectory) - 1
+    assert len(buffer2) == size
+    assert buffer1._next == buffer2._next
+    assert np.allclose(buffer1._rewards[:size], buffer2._rewards[:size])
+    assert np.array_equal(buffer1._dones[:size], buffer2._dones[:size])
+    for field, arrays in buffer1._arrays.items():
+        for name, array in arrays.items():
+            assert np.allclose(buffer2._arrays[field][name][:size], array[:size])
+
+    ReplayBuffer(runner.env, capacity=4).extend(Trajectory(runner.env))
+
+
+def test_extend(runner, trajectory):
+    buffer1 = ReplayBuffer(runner.env, capacity=len(trajectory) // 2 + 1)
+    buffer2 = ReplayBuffer(runner.env, capacity=len(trajectory) // 2 + 1)
+
+    for transition in trajectory:
+        buffer1.add_transition(*transition)
+    buffer2.extend(trajectory)
+
+    assert len(buffer1) == len(buffer2)
+    assert buffer1._next == buffer2._next
+    assert np.array_equal(buffer1._rewards, buffer2._rewards)
+    assert np.array_equal(buffer1._dones, buffer2._dones)
+    for field, arrays in buffer1._arrays.items():
+        for name, array in arrays.items():
+            assert np.array_equal(buffer2._arrays[field][name], array)
+
+
+def test_bool_fluents_packed(runner, trajectory):
+    buffer = ReplayBuffer(runner.env, capacity=10)
+    space = runner.env.observation_space.spaces
+    for name, array in buffer._arrays["state"].items():
+        if trajectory[0].state[name].dtype == np.bool_:
+            size = int(np.prod(space[name].shape))
+            assert array.dtype == np.uint8
+            assert array.shape == (10, (size + 7) // 8)
+        else:
+            assert array.shape == (10, *space[name].shape)
+
+
+def test_run_with_sink(runner):
+    buffer = ReplayBuffer(runner.env, capacity=1000)
+    assert runner.run(sink=buffer) is buffer
+    assert len(buffer) == runner.env.horizon
+
+
+@pytest.mark.parametrize("prioritized", [False, True])
+def test_sample(runner, trajectory, prioritized):
+    buffer = ReplayBuffer(runner.env, capacity=1000, seed=42)
+    buffer.extend(trajectory)
+
+    batch = buffer.sample(BATCH_SIZE, prioritized=prioritized)
+    indices = batch["indices"]
+    assert indices.shape == (BATCH_SIZE,)
+    assert np.all(indices < len(trajectory))
+    assert batch["weights"].shape == (BATCH_SIZE,)
+    assert np.all(batch["weights"] <= 1.0)
+    assert np.allclose(batch["reward"], np.asarray(trajectory.rewards)[indices])
+
+    space = runner.env.observation_space.spaces
+    for name, values in batch["state"].items():
+        assert values.shape == (BATCH_SIZE, *space[name].shape)
+        assert values.dtype == trajectory[0].state[name].dtype
+        for value, idx in zip(values, indices):
+            assert np.allclose(value, trajectory[idx].state[name])
+
+
+def test_update_priorities(runner, trajectory):
+    buffer = ReplayBuffer(runner.env, capacity=1000, alpha=1.0, seed=42)
+    buffer.extend(trajectory)
+
+    priorities = np.zeros(len(trajectory))
+    priorities[3] = 1e6
+    buffer.update_priorities(np.arange(len(trajectory)), priorities)
+
+    batch = buffer.sample(BATCH_SIZE, prioritized=True)
+    assert np.all(batch["indices"] == 3)
+
+
+def test_memmap(runner, trajectory):
+    with tempfile.TemporaryDirectory() as dirpath:
+        buffer = ReplayBuffer(runner.env, capacity=1000, dirpath=dirpath, seed=42)
+        buffer.extend(trajectory)
+        buffer.flush()
+
+        assert isinstance(buffer._rewards, np.memmap)
+        assert np.allclose(buffer._rewards[: len(trajectory)], trajectory.rewards)
+
+        batch = buffer.sample(BATCH_SIZE)
+        assert not isinstance(batch["reward"], np.memmap)
@@ -0,0 +1,100 @@
+# This file is part of rddlgym.
+
+# rddlgym is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# rddlgym is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with rddlgym. If not, see <http://www.gnu.org/licenses/>.
+
+# pylint: disable=missing-docstring,redefined-outer-name,protected-access
+
+
+import pytest
+import tensorflow as tf
+
+from rddlgym import make, AST, GYM
+from rddlgym import cost
+
+
+@pytest.fixture(scope="module")
+def env():
+    return make("Reservoir-8", mode=GYM)
+
+
+def test_dependency_depths():
+    depths = cost.dependency_depths(make("Reservoir-8", mode=AST).domain)
+    assert depths == {
+        "evaporated/1": 1,
+        "overflow/1": 1,
+        "rainfall/1": 1,
+        "inflow/1": 2,
+        "rlevel'/1": 3,
+        "reward": 4,
+    }
+
+
+def test_op_flops():
+    graph = tf.Graph()
+    with graph.as_default():
+        x = tf.compat.v1.placeholder(tf.float32, shape=(4, 3))
+        y = tf.constant(1.0, shape=(3, 5))
+        add = x + 1.0
+        total = tf.reduce_sum(x)
+        matmul = tf.matmul(x, y)
+
+    assert cost.op_flops(x.op) == 0
+    assert cost.op_flops(y.op) == 0
+    assert cost.op_flops(add.op) == 12
+    assert cost.op_flops(total.op) == 12
+    assert cost.op_flops(matmul.op) == 2 * 4 * 5 * 3
+    assert cost.op_bytes(add.op) == 12 * 4
+
+
+def test_model_ops():
+    graph = tf.Graph()
+    with graph.as_default():
+        x = tf.compat.v1.placeholder(tf.float32, shape=(4,))
+        y = tf.exp(x) + x
+        _ = tf.sin(x)
+
+    ops = cost.model_ops([y])
+    assert len(ops) == 3
+    assert [op.type for op in ops[:2]] == ["Placeholder", "Exp"]
+    assert ops[-1] is y.op
+
+
+def test_cost_report(env):
+    num_ops = len(env._graph.get_operations())
+    report = cost.cost_report(env)
+    assert len(env._graph.get_operations()) == num_ops
+
+    assert list(report) == [
+        "interm evaporated/1",
+        "interm overflow/1",
+        "interm rainfall/1",
+        "interm inflow/1",
+        "state rlevel/1",
+        "reward",
+        "other",
+    ]
+
+    inflow = report["interm inflow/1"]
+    assert inflow["size"] == 8
+    assert inflow["depth"] == 2
+    assert inflow["deps"] == ["overflow/1"]
+    assert inflow["ops"] > 0 and inflow["flops"] > 0 and inflow["bytes"] > 0
+
+    assert report["reward"]["size"] == 1
+    assert report["reward"]["deps"] == ["rlevel'/1"]
+    assert report["other"]["flops"] == 0
+
+    totals = cost.totals(report)
+    assert totals["ops"] == sum(record["ops"] for record in report.values())
+    assert totals["ops"] <= num_ops
@@ -132,6 +132,32 @@ def test_step(env):
     assert len(info) == len(env._compiler.rddl.domain.intermediate_cpfs)
 
 
+def test_transition(env):
+    state, timestep = env.reset()
+    action_lst = [env.action_space.sample() for _ in range(4)]
+
+    states = {name: np.stack([value] * 4) for name, value in state.items()}
+    actions = {
+        name: np.stack([action[name] for action in action_lst])
+        for name in action_lst[0]
+    }
+
+    next_state, reward, info = env.transition(states, actions)
+    assert env._state is state
+    assert env._timestep == timestep
+    assert reward.shape == (4,)
+    assert len(info) == len(env._compiler.rddl.domain.intermediate_cpfs)
+    for name, values in next_state.items():
+        assert values.shape == (4, *state[name].shape)
+    assert 4 in env._batch_ops
+
+    if "cpf-deterministic" in env._compiler.rddl.domain.requirements:
+        next_state_, reward_, _, _ = env.step(action_lst[0])
+        assert np.isclose(reward[0], reward_)
+        for name, value in next_state_.items():
+            assert np.allclose(next_state[name][0], value)
+
+
 def test_trajectory(env):
     _ = env.reset()
     done = False
@@ -155,3 +181,28 @@ def _check_tensors(tensors, fluents):
         assert isinstance(tensor, tf.Tensor)
         assert tensor.dtype == fluents[name].dtype
         assert list(tensor.shape[1:]) == list(fluents[name].shape.fluent_shape)
+
+
+def test_seed():
+    env = rddlgym.make("Reservoir-8", mode=rddlgym.GYM)
+    action = {"outflow/1": np.zeros((8,), dtype=np.float32)}
+
+    def _episode(seed):
+        env.seed(seed)
+        env.reset()
+        rewards = [env.step(action)[1] for _ in range(5)]
+        batch = {name: np.stack([value] * 4) for name, value in env._state.items()}
+        actions = {"outflow/1": np.zeros((4, 8), dtype=np.float32)}
+        return rewards, env.transition(batch, actions)[1]
+
+    rewards1, batch_rewards1 = _episode(42)
+    rewards2, _ = _episode(43)
+    rewards3, batch_rewards3 = _episode(42)
+
+    assert rewards1 == rewards3
+    assert np.array_equal(batch_rewards1, batch_rewards3)
+    assert rewards1 != rewards2
+
+    env.seed(None)
+    assert env._seed is None
+    env.close()
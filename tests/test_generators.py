@@ -0,0 +1,77 @@
+# This file is part of rddlgym.
+
+# rddlgym is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# rddlgym is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with rddlgym. If not, see <http://www.gnu.org/licenses/>.
+
+# pylint: disable=missing-docstring
+
+
+import os
+import tempfile
+
+import pytest
+
+import rddlgym
+from rddlgym import generators
+from rddlgym.registry import Registry
+
+
+@pytest.mark.parametrize(
+    "name,size,fluent,shape",
+    [
+        ("Reservoir", 12, "rlevel/1", (12,)),
+        ("Navigation", 5, "location/1", (2,)),
+        ("Sysadmin", 15, "running/1", (15,)),
+    ],
+)
+def test_generate(name, size, fluent, shape):
+    with tempfile.TemporaryDirectory() as dirpath:
+        filepath = generators.generate(name, size, dirpath, seed=42, horizon=7)
+        assert os.path.basename(filepath) == "{}-g{}-s42.rddl".format(name, size)
+
+        env = rddlgym.make(filepath, mode=rddlgym.GYM)
+        assert env.horizon == 7
+
+        state, _ = env.reset()
+        assert state[fluent].shape == shape
+
+        next_state, reward, _, _ = env.step(env.action_space.sample())
+        assert next_state[fluent].shape == shape
+        assert reward.shape == ()
+        env.close()
+
+        entry = Registry([dirpath]).get(generators.instance_id(name, size, 42))
+        assert entry.filepath == filepath
+
+
+def test_navigation_zones():
+    model = rddlgym.make("Navigation-v2", mode=rddlgym.AST)
+    with tempfile.TemporaryDirectory() as dirpath:
+        filepath = generators.generate("Navigation", 9, dirpath)
+        generated = rddlgym.make(filepath, mode=rddlgym.AST)
+
+    assert generated.domain.name == model.domain.name
+    assert generated.object_table["zone"]["size"] == 9
+
+
+def test_seed():
+    assert generators.reservoir(10, seed=0) == generators.reservoir(10, seed=0)
+    assert generators.reservoir(10, seed=0) != generators.reservoir(10, seed=1)
+
+
+def test_invalid():
+    with pytest.raises(ValueError):
+        generators.sysadmin(1)
+
+    with pytest.raises(ValueError):
+        generators.generate("Unknown", 10, "/tmp")
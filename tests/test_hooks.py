@@ -0,0 +1,126 @@
+# This file is part of rddlgym.
+
+# rddlgym is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# rddlgym is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with rddlgym. If not, see <http://www.gnu.org/licenses/>.
+
+# pylint: disable=missing-docstring,redefined-outer-name
+
+
+import numpy as np
+import pytest
+
+from rddlgym import make, GYM, Runner
+from rddlgym.hooks import Hook, HookList
+from rddlgym.policies import RandomPolicy
+
+
+class RewardHook(Hook):
+
+    fields = ("reward", "done")
+    flush_every = 3
+
+    def __init__(self):
+        self.events = []
+        self.buffer = []
+        self.batches = []
+
+    def on_episode_start(self, runner, state, timestep):
+        self.events.append("start")
+
+    def on_step(self, step):
+        assert step.action is None and step.latency is None
+        self.buffer.append(step.reward)
+
+    def on_flush(self):
+        self.batches.append(self.buffer)
+        self.buffer = []
+
+    def on_episode_end(self, runner, trajectory):
+        self.events.append("end")
+
+
+class StopHook(Hook):
+
+    fields = ("state",)
+
+    def __init__(self, steps):
+        self.steps = steps
+
+    def on_step(self, step):
+        assert isinstance(step.state, dict)
+        return step.timestep + 1 == self.steps
+
+
+@pytest.fixture(scope="module")
+def env():
+    return make("Navigation-v1", mode=GYM)
+
+
+def test_hooks(env):
+    hook = RewardHook()
+    trajectory = Runner(env, RandomPolicy(env), hooks=[hook]).run()
+
+    assert hook.events == ["start", "end"]
+    assert [len(batch) for batch in hook.batches[:-1]] == [3] * (len(hook.batches) - 1)
+    rewards = [reward for batch in hook.batches for reward in batch]
+    assert np.allclose(rewards, trajectory.rewards)
+
+
+def test_early_stop(env):
+    reward_hook = RewardHook()
+    hooks = [StopHook(5), reward_hook]
+    trajectory = Runner(env, RandomPolicy(env), hooks=hooks).run()
+    assert len(trajectory) == 5
+    assert [len(batch) for batch in reward_hook.batches] == [3, 2]
+    assert trajectory[-1].done
+    assert not any(transition.done for transition in trajectory[:-1])
+
+
+class Sink:
+    def __init__(self):
+        self.transitions = []
+
+    def add_transition(self, *transition):
+        self.transitions.append(transition)
+
+
+def test_untimed_steps(env, monkeypatch):
+    calls = []
+
+    def perf_counter():
+        calls.append(None)
+        return 0.0
+
+    monkeypatch.setattr("rddlgym.runner.time.perf_counter", perf_counter)
+
+    sink = Runner(env, RandomPolicy(env), hooks=[RewardHook()]).run(sink=Sink())
+    assert len(sink.transitions) == env.horizon
+    assert not calls
+
+    class LatencyHook(Hook):
+        fields = ("latency",)
+
+        def on_step(self, step):
+            assert step.latency == (0.0, 0.0)
+
+    Runner(env, RandomPolicy(env), hooks=[LatencyHook()]).run(sink=Sink())
+    assert len(calls) == 4 * env.horizon
+
+
+def test_invalid_fields():
+    class InvalidHook(Hook):
+        fields = ("observation",)
+
+    with pytest.raises(ValueError):
+        HookList([InvalidHook()])
+    assert not HookList()
@@ -0,0 +1,127 @@
+# This file is part of rddlgym.
+
+# rddlgym is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# rddlgym is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with rddlgym. If not, see <http://www.gnu.org/licenses/>.
+
+# pylint: disable=missing-docstring
+
+
+from collections import OrderedDict
+
+import numpy as np
+import pytest
+
+from rddlgym import make, GYM
+from rddlgym import policies
+
+
+BATCH_SIZE = 500
+
+
+def _batch(state, batch_size=BATCH_SIZE):
+    return OrderedDict(
+        (name, np.repeat(value[np.newaxis], batch_size, axis=0))
+        for name, value in state.items()
+    )
+
+
+def test_bounded_actions():
+    env = make("Navigation-v1", mode=GYM)
+    state, _ = env.reset()
+
+    policy = policies.RandomPolicy(env, seed=0)
+    assert not policies.build_sampler(env, 1).stateful
+
+    actions = policy.sample(_batch(state))
+    move = actions["move/1"]
+    assert move.shape == (BATCH_SIZE, 2)
+    assert move.dtype == np.float32
+    assert np.all(move >= -1.0) and np.all(move <= 1.0)
+    assert np.std(move) > 0.1
+
+    # actions of a whole horizon are sampled at once
+    horizon = [policy(state, t)["move/1"] for t in range(env.horizon + 1)]
+    assert all(action.shape == (2,) for action in horizon)
+    assert len({tuple(action) for action in horizon}) == env.horizon + 1
+
+    # samplers don't build batch copies of the model ops
+    assert list(env._batch_ops) == [1]
+
+
+def test_state_dependent_bounds():
+    env = make("Reservoir-8", mode=GYM)
+    state, _ = env.reset()
+
+    policy = policies.RandomPolicy(env)
+    assert policies.build_sampler(env, 1).stateful
+
+    states = _batch(state)
+    states["rlevel/1"] = states["rlevel/1"] * np.linspace(0, 1, BATCH_SIZE)[:, None]
+    outflow = policy.sample(states)["outflow/1"]
+    assert np.all(outflow >= 0.0)
+    assert np.all(outflow <= states["rlevel/1"] + 1e-4)
+
+    action = policy(state, 0)
+    assert action["outflow/1"].shape == (8,)
+    assert np.all(action["outflow/1"] <= state["rlevel/1"] + 1e-4)
+
+
+@pytest.mark.parametrize("rddl", ["Sysadmin-1", "CrossingTraffic-1"])
+def test_bool_actions(rddl):
+    env = make(rddl, mode=GYM)
+    state, _ = env.reset()
+
+    max_nondef = policies.max_nondef_actions(env)
+    actions = policies.RandomPolicy(env).sample(_batch(state))
+
+    assert all(value.dtype == np.bool_ for value in actions.values())
+    num_true = sum(
+        value.reshape(BATCH_SIZE, -1).sum(axis=1) for value in actions.values()
+    )
+    assert np.all(num_true <= max_nondef)
+    assert np.any(num_true > 0)
+
+
+def test_seed():
+    env = make("Navigation-v1", mode=GYM)
+    state, _ = env.reset()
+
+    policy = policies.RandomPolicy(env, seed=42)
+    first = [policy(state, t)["move/1"] for t in range(3)]
+    policy.seed(42)
+    second = [policy(state, t)["move/1"] for t in range(3)]
+    np.testing.assert_array_equal(first, second)
+
+    policy.seed(43)
+    assert not np.array_equal(first[0], policy(state, 0)["move/1"])
+
+
+def test_episodes():
+    env = make("Navigation-v1", mode=GYM)
+    state, _ = env.reset()
+
+    policy = policies.RandomPolicy(env, seed=0)
+    first = [policy(state, t)["move/1"] for t in range(3)]
+    # episodes ending early don't shift the actions of the next ones
+    second = [policy(state, t)["move/1"] for t in range(env.horizon)]
+    assert not np.array_equal(first[0], second[0])
+
+    policy.seed(0)
+    np.testing.assert_array_equal(first, [policy(state, t)["move/1"] for t in range(3)])
+
+    # the horizon is extended in the middle of an episode
+    horizon = env.horizon
+    actions = [policy(state, t)["move/1"] for t in range(horizon)]
+    env.set_horizon(horizon + 5)
+    actions += [policy(state, t)["move/1"] for t in range(horizon, horizon + 5)]
+    assert len({tuple(action) for action in actions}) == horizon + 5
@@ -0,0 +1,112 @@
+# This file is part of rddlgym.
+
+# rddlgym is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# rddlgym is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with rddlgym. If not, see <http://www.gnu.org/licenses/>.
+
+# pylint: disable=missing-docstring,protected-access
+
+
+import os
+import shutil
+import tempfile
+
+import pytest
+
+from rddlgym import precompile, utils
+from rddlgym.registry import get_registry
+
+
+def test_resolve():
+    assert list(precompile.resolve()) == get_registry().bundled()
+    assert list(precompile.resolve(["Reservoir-*", "Sysadmin-1"])) == [
+        "Reservoir-8",
+        "Reservoir-10",
+        "Reservoir-20",
+        "Reservoir-30",
+        "Sysadmin-1",
+    ]
+
+    filepath = get_registry().filepath("Navigation-v1")
+    pattern = os.path.join(os.path.dirname(filepath), "Navigation-v[12].rddl")
+    assert list(precompile.resolve([pattern])) == ["Navigation-v1", "Navigation-v2"]
+
+    with pytest.raises(ValueError):
+        precompile.resolve(["Unknown-*"])
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_precompile(workers, monkeypatch):
+    with tempfile.TemporaryDirectory() as dirpath:
+        report = precompile.precompile(["Navigation-v*"], dirpath, workers)
+        assert len(report) == 4
+        assert all(record["status"] == "compiled" for record in report.values())
+
+        index = precompile.read_index(dirpath)
+        assert list(index) == list(report)
+        for rddl, record in index.items():
+            assert record["rddl"] == rddl and "filepath" not in record
+            assert os.path.isfile(utils.model_path(dirpath, record["key"]))
+        assert not [name for name in os.listdir(dirpath) if name.endswith(".tmp")]
+
+        report = precompile.precompile(["Navigation-v1"], dirpath, workers)
+        assert report["Navigation-v1"]["status"] == "cached"
+        assert len(precompile.read_index(dirpath)) == 4
+
+        monkeypatch.setenv(utils.CACHE_DIR_ENV, dirpath)
+        utils.clear_model_cache()
+        monkeypatch.setattr(utils, "_parse", None)
+        model = utils.parse_model(get_registry().filepath("Navigation-v2"))
+        assert model.domain.name == "Navigation"
+
+
+def test_verify():
+    with tempfile.TemporaryDirectory() as dirpath:
+        srcdir = os.path.join(dirpath, "src")
+        cachedir = os.path.join(dirpath, "cache")
+        os.makedirs(srcdir)
+
+        for rddl in ["Navigation-v1", "Navigation-v2", "Reservoir-8", "Sysadmin-1"]:
+            shutil.copy(get_registry().filepath(rddl), srcdir)
+
+        report = precompile.precompile([os.path.join(srcdir, "*.rddl")], cachedir, 1)
+        assert set(precompile.verify(cachedir).values()) == {"ok"}
+
+        # the index is relocatable along with its sources
+        records = precompile.read_index(cachedir).values()
+        assert all(not os.path.isabs(record["filepath"]) for record in records)
+        moved = os.path.join(dirpath, "moved")
+        shutil.move(srcdir, os.path.join(moved, "src"))
+        shutil.move(cachedir, os.path.join(moved, "cache"))
+        srcdir, cachedir = os.path.join(moved, "src"), os.path.join(moved, "cache")
+        assert set(precompile.verify(cachedir).values()) == {"ok"}
+
+        with open(os.path.join(srcdir, "Navigation-v1.rddl"), "a") as file:
+            file.write("\n// changed\n")
+        os.remove(os.path.join(srcdir, "Navigation-v2.rddl"))
+        os.remove(utils.model_path(cachedir, report["Reservoir-8"]["key"]))
+        corrupt = utils.model_path(cachedir, report["Sysadmin-1"]["key"])
+        with open(corrupt, "wb") as file:
+            file.write(b"corrupt")
+
+        assert precompile.verify(cachedir) == {
+            "Navigation-v1": "stale",
+            "Navigation-v2": "no-source",
+            "Reservoir-8": "missing",
+            "Sysadmin-1": "corrupt",
+        }
+
+
+def test_no_cache_dir(monkeypatch):
+    monkeypatch.delenv(utils.CACHE_DIR_ENV, raising=False)
+    with pytest.raises(ValueError):
+        precompile.verify()
@@ -0,0 +1,79 @@
+# This file is part of rddlgym.
+
+# rddlgym is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# rddlgym is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with rddlgym. If not, see <http://www.gnu.org/licenses/>.
+
+# pylint: disable=missing-docstring,protected-access
+
+
+import json
+import os
+import pstats
+import tempfile
+
+import pytest
+
+from rddlgym import make, GYM
+from rddlgym import profiling
+
+
+@pytest.mark.parametrize(
+    "name,owner",
+    [
+        ("intermediate_cpfs/rainfall-1/Gamma/sample/RandomGamma", "interm rainfall/1"),
+        ("state_cpfs/rlevel-1/Add", "state rlevel/1"),
+        ("batch_16/state_cpfs/rlevel-1/Add", "state rlevel/1"),
+        ("reward/Sum", "reward"),
+        ("reward_1/ExpandDims", "reward"),
+        ("state_input/rlevel-1", "input"),
+        ("random_policy_1/outflow-1", "policy"),
+        ("MAX_RES_CAP-1", "other"),
+    ],
+)
+def test_op_owner(name, owner):
+    assert profiling.op_owner(name) == owner
+
+
+def test_profile():
+    env = make("Reservoir-8", mode=GYM)
+    sess = env._sess
+
+    with tempfile.TemporaryDirectory() as logdir:
+        report = profiling.profile(env, logdir, steps=45, top_k=5)
+
+        with open(os.path.join(logdir, profiling.TIMELINE_FILENAME), "r") as file:
+            trace = json.load(file)
+        assert any(event.get("ph") == "X" for event in trace["traceEvents"])
+
+        stats = pstats.Stats(os.path.join(logdir, profiling.PSTATS_FILENAME))
+        assert any(func[2] == "step" for func in stats.stats)
+
+        with open(os.path.join(logdir, profiling.OPS_FILENAME), "r") as file:
+            ops = json.load(file)
+        assert set(ops) == {"ops", "owners"}
+
+    assert env._sess is sess
+    assert report["steps"] == 45
+    assert len(report["top_ops"]) == 5
+
+    totals = [record["total_us"] for record in report["top_ops"].values()]
+    assert totals == sorted(totals, reverse=True)
+
+    assert "state rlevel/1" in report["owners"]
+    assert "interm rainfall/1" in report["owners"]
+
+    # the traced resets (horizon = 40) don't run the CPFs
+    assert ops["ops"]["state_cpfs/rlevel-1/Add"]["count"] == 45
+    assert ops["ops"]["state_cpfs/rlevel-1/Add"]["owner"] == "state rlevel/1"
+
+    env.close()
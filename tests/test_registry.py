@@ -0,0 +1,100 @@
+# This file is part of rddlgym.
+
+# rddlgym is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# rddlgym is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with rddlgym. If not, see <http://www.gnu.org/licenses/>.
+
+# pylint: disable=missing-docstring,protected-access
+
+
+import os
+import shutil
+import tempfile
+
+import pytest
+
+import rddlgym
+from rddlgym import registry
+from rddlgym.utils import read_db
+
+
+def test_bundled():
+    reg = registry.Registry()
+    assert reg._bundled is None
+
+    assert list(reg) == list(read_db())
+    assert len(reg) == 19
+
+    entry = reg.get("Sysadmin-1")
+    assert entry.domain == "sysadmin_mdp"
+    assert entry.instance == "sysadmin_inst_mdp__1"
+    assert "cpf-deterministic" not in entry.requirements
+    assert os.path.isfile(entry.filepath)
+
+    with pytest.raises(ValueError):
+        reg.get("Unknown-1")
+
+
+def test_query():
+    reg = registry.Registry()
+
+    ids = [entry.id for entry in reg.query(["continuous", "concurrent"])]
+    assert "Reservoir-8" in ids and "HVAC-3" in ids
+    assert "Sysadmin-1" not in ids and "GameOfLife-1" not in ids
+
+    ids = [entry.id for entry in reg.query(domain="reservoir")]
+    assert ids == ["Reservoir-8", "Reservoir-10", "Reservoir-20", "Reservoir-30"]
+
+    assert reg.query(["unknown-requirement"]) == []
+    assert "continuous" in reg.requirements()
+
+
+def test_user_dirs():
+    with tempfile.TemporaryDirectory() as dirpath:
+        reg = registry.Registry([dirpath])
+        assert len(reg) == 19
+
+        src = reg.filepath("Reservoir-8")
+        shutil.copy(src, os.path.join(dirpath, "MyReservoir.rddl"))
+        os.utime(dirpath, ns=(0, 0))
+
+        entry = reg.get("MyReservoir")
+        assert entry.domain == "reservoir"
+        assert entry.requirements == {
+            "concurrent",
+            "reward-deterministic",
+            "intermediate-nodes",
+            "constrained-state",
+        }
+        assert entry.metadata["requirements"]
+
+        mtime, entries = reg._dirs[dirpath]
+        index = reg._entries()
+        assert reg.index and reg._dirs[dirpath] == (mtime, entries)
+        assert reg._entries() is index
+        ids = [entry.id for entry in reg.query(domain="reservoir")]
+        assert ids[-1] == "MyReservoir"
+
+        os.remove(os.path.join(dirpath, "MyReservoir.rddl"))
+        assert "MyReservoir" not in reg
+
+
+def test_make_user_registered():
+    with tempfile.TemporaryDirectory() as dirpath:
+        src = registry.get_registry().filepath("Navigation-v1")
+        shutil.copy(src, os.path.join(dirpath, "MyNavigation.rddl"))
+
+        registry.register(dirpath)
+        model = rddlgym.make("MyNavigation", mode=rddlgym.AST)
+        assert model.domain.name == "Navigation"
+
+    assert "MyNavigation" not in registry.get_registry()
@@ -0,0 +1,79 @@
+# This file is part of rddlgym.
+
+# rddlgym is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# rddlgym is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with rddlgym. If not, see <http://www.gnu.org/licenses/>.
+
+# pylint: disable=missing-docstring,redefined-outer-name
+
+
+import os
+import tempfile
+
+import pandas as pd
+import pytest
+
+from rddlgym import make, GYM, Runner
+from rddlgym import replay
+from rddlgym.policies import RandomPolicy
+
+
+@pytest.fixture(scope="module")
+def runner():
+    env = make("Navigation-v1", mode=GYM)
+    return Runner(env, RandomPolicy(env))
+
+
+@pytest.fixture(scope="module")
+def logdir(runner):
+    with tempfile.TemporaryDirectory() as dirpath:
+        runner.run_campaign(3, dirpath, fmt="csv")
+        runner.run().save(os.path.join(dirpath, "extra", "data"))
+        yield dirpath
+
+
+def test_find_trajectories(logdir):
+    filepaths = replay.find_trajectories(logdir)
+    assert filepaths == [
+        os.path.join(logdir, "episode-0.csv"),
+        os.path.join(logdir, "episode-1.csv"),
+        os.path.join(logdir, "episode-2.csv"),
+        os.path.join(logdir, "extra", "data"),
+    ]
+    assert replay.find_instance(filepaths[0]).endswith("Navigation-v1.rddl")
+    assert replay.find_instance(filepaths[-1]) is None
+
+
+@pytest.mark.parametrize("batch_size", [7, 4096])
+def test_replay(runner, logdir, batch_size):
+    filepaths = replay.find_trajectories(logdir)
+    report = replay.replay(runner.env, filepaths, batch_size=batch_size)
+
+    assert report["episodes"] == 4
+    assert report["steps"] == 4 * runner.env.horizon
+    assert list(report["state"].keys()) == ["location/1"]
+    assert replay.max_deviation(report) < 1e-4
+
+
+def test_replay_deviation(runner, logdir):
+    filepath = os.path.join(logdir, "episode-0.csv")
+    df = pd.read_csv(filepath)
+    df.loc[3, "location(x)"] += 1.0
+    df.loc[5, "reward"] += 2.0
+
+    with tempfile.TemporaryDirectory() as dirpath:
+        tampered = os.path.join(dirpath, "episode-0.csv")
+        df.to_csv(tampered, index=False)
+        report = replay.replay(runner.env, [tampered])
+
+    assert abs(report["reward"] - 2.0) < 1e-3
+    assert report["state"]["location/1"] >= 1.0 - 1e-3
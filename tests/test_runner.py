@@ -17,11 +17,20 @@
 
 
 from collections import OrderedDict
+import json
+import os
+import tempfile
+import time
+
 import numpy as np
+import pandas as pd
 import pytest
 
 from rddlgym import make, GYM
-from rddlgym import Runner
+from rddlgym import Runner, Trajectory, TrajectoryWriter
+from rddlgym import storage
+from rddlgym.runner import read_manifest
+from rddlgym.policies import RandomPolicy
 
 
 HORIZON = 20
@@ -60,3 +69,197 @@ def test_run(runner):
         trajectory.total_reward,
         sum(map(lambda transition: transition.reward, trajectory)),
     )
+
+
+def test_run_with_sink(runner):
+    with tempfile.TemporaryDirectory() as dirpath:
+        filepath = os.path.join(dirpath, "data.csv")
+        with TrajectoryWriter(runner.env, filepath) as sink:
+            trajectory = runner.run(sink=sink)
+            assert trajectory is sink
+            assert len(sink) == runner.env.horizon
+
+        df = pd.read_csv(filepath)
+        assert len(df) == runner.env.horizon
+        assert np.isclose(df["reward"].sum(), sink.total_reward)
+
+
+def test_run_many(runner):
+    runner = Runner(runner.env, runner.planner, record_latency=True)
+    trajectories = runner.run_many(3, workers=2, planner_factory=RandomPolicy)
+    assert len(trajectories) == 3
+    for trajectory in trajectories:
+        assert trajectory.env is runner.env
+        assert len(trajectory) == runner.env.horizon
+        assert len(trajectory.latencies["planner"]) == len(trajectory)
+        assert [transition.step for transition in trajectory] == list(
+            range(len(trajectory))
+        )
+        assert trajectory[-1].done
+
+
+def test_run_many_sequential(runner):
+    trajectories = runner.run_many(2)
+    assert len(trajectories) == 2
+
+    with pytest.raises(ValueError):
+        runner.run_many(2, workers=2)
+
+
+def test_run_batch():
+    env = make("Navigation-v2", mode=GYM)
+
+    def planner(states, timestep):
+        # pylint: disable=unused-argument
+        batch_size = len(states["location/1"])
+        return OrderedDict([("move/1", np.random.uniform(-1, 1, (batch_size, 2)))])
+
+    horizons = [3, 5, 4]
+    trajectories = Runner(env, planner).run_batch(3, horizon=horizons)
+
+    for trajectory, horizon in zip(trajectories, horizons):
+        assert len(trajectory) == horizon
+        assert [transition.done for transition in trajectory] == [False] * (
+            horizon - 1
+        ) + [True]
+
+        state = trajectory.initial_state
+        for transition in trajectory:
+            assert transition.action["move/1"].shape == (2,)
+            assert np.allclose(transition.state["location/1"], state["location/1"])
+            state = transition.next_state
+
+
+def test_run_async(runner):
+    trajectories = runner.run_async(3, max_in_flight=2)
+    assert len(trajectories) == 3
+    for trajectory in trajectories:
+        assert len(trajectory) == runner.env.horizon
+        assert [transition.step for transition in trajectory] == list(
+            range(len(trajectory))
+        )
+        assert trajectory[-1].done
+        state = trajectory.initial_state
+        for transition in trajectory:
+            for name, value in transition.state.items():
+                assert value.shape == state[name].shape
+                assert np.allclose(value, state[name])
+            state = transition.next_state
+
+
+def test_run_async_planner_error(runner):
+    def planner(state, timestep):
+        raise RuntimeError("planner failed at {}".format(timestep))
+
+    with pytest.raises(RuntimeError):
+        Runner(runner.env, planner).run_async(2)
+
+
+def test_run_latencies(runner):
+    trajectory = Runner(runner.env, runner.planner, record_latency=True).run()
+    latencies = trajectory.latencies
+    assert latencies["planner"].shape == (len(trajectory),)
+    assert latencies["env"].shape == (len(trajectory),)
+    assert not np.any(latencies["missed"])
+
+    summary = trajectory.latency_summary()
+    assert list(summary["planner"].keys()) == ["mean", "p50", "p90", "p99", "max"]
+    assert summary["env"]["p50"] <= summary["env"]["max"]
+    assert summary["misses"] == 0
+
+
+def test_run_untimed(runner, monkeypatch):
+    calls = []
+
+    def perf_counter():
+        calls.append(None)
+        return 0.0
+
+    monkeypatch.setattr("rddlgym.runner.time.perf_counter", perf_counter)
+
+    trajectory = runner.run()
+    assert len(trajectory) == runner.env.horizon
+    assert len(trajectory.latencies["planner"]) == 0
+    assert not calls
+
+
+def test_run_deadline(runner):
+    env = runner.env
+    calls = []
+
+    def planner(state, timestep, deadline):
+        # pylint: disable=unused-argument
+        calls.append(deadline)
+        if timestep % 4 == 0:
+            time.sleep(1.5 * deadline)
+        return OrderedDict([("move/1", np.ones((2,), dtype=np.float32))])
+
+    fallback = OrderedDict([("move/1", np.zeros((2,), dtype=np.float32))])
+    trajectory = Runner(env, planner, deadline=0.1, fallback=fallback).run()
+
+    assert calls == [0.1] * len(trajectory)
+    summary = trajectory.latency_summary()
+    assert summary["misses"] == (len(trajectory) + 3) // 4
+    # the budget is enforced: late planner calls are not waited for
+    assert summary["planner"]["max"] < 0.14
+    for transition, missed in zip(trajectory, trajectory.latencies["missed"]):
+        assert missed == (transition.step % 4 == 0)
+        expected = fallback["move/1"] if missed else np.ones((2,))
+        assert np.allclose(transition.action["move/1"], expected)
+
+
+@pytest.mark.parametrize("fmt", ["csv", "npy"])
+def test_run_campaign(runner, fmt):
+    with tempfile.TemporaryDirectory() as logdir:
+        manifest = runner.run_campaign(3, logdir, seed=42, fmt=fmt)
+        assert sorted(manifest["completed"].keys()) == ["0", "1", "2"]
+        assert [record["seed"] for record in manifest["completed"].values()] == [
+            42,
+            43,
+            44,
+        ]
+        assert read_manifest(logdir) == manifest
+
+        mtimes = {
+            name: os.path.getmtime(os.path.join(logdir, record["file"]))
+            for name, record in manifest["completed"].items()
+        }
+
+        # simulates a campaign interrupted before recording episode 2
+        del manifest["completed"]["2"]
+        with open(os.path.join(logdir, "manifest.json"), "w") as file:
+            json.dump(manifest, file)
+
+        manifest = runner.run_campaign(4, logdir, seed=42, fmt=fmt)
+        assert sorted(manifest["completed"].keys()) == ["0", "1", "2", "3"]
+        for name in ["0", "1"]:
+            filepath = os.path.join(logdir, manifest["completed"][name]["file"])
+            assert os.path.getmtime(filepath) == mtimes[name]
+
+        for record in manifest["completed"].values():
+            filepath = os.path.join(logdir, record["file"])
+            basename = record["file"].split(".")[0]
+            assert storage.find_data_file(logdir, basename) == filepath
+            trajectory = Trajectory.load(filepath, runner.env)
+            assert len(trajectory) == record["length"]
+
+        with pytest.raises(ValueError):
+            runner.run_campaign(4, logdir, seed=0, fmt=fmt)
+
+
+def test_run_campaign_stochastic():
+    env = make("Reservoir-8", mode=GYM)
+    with Runner(env, RandomPolicy(env)) as runner:
+        with tempfile.TemporaryDirectory() as logdir:
+            manifest = runner.run_campaign(3, logdir, seed=7)
+            total_rewards = [r["total_reward"] for r in manifest["completed"].values()]
+
+            # reruns episodes 1 and 2 as a resumed campaign would
+            del manifest["completed"]["1"], manifest["completed"]["2"]
+            with open(os.path.join(logdir, "manifest.json"), "w") as file:
+                json.dump(manifest, file)
+            manifest = runner.run_campaign(3, logdir, seed=7)
+
+    resumed = [r["total_reward"] for r in manifest["completed"].values()]
+    assert resumed == total_rewards
+    assert len(set(total_rewards)) == 3
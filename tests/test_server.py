@@ -0,0 +1,281 @@
+# This file is part of rddlgym.
+
+# rddlgym is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# rddlgym is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with rddlgym. If not, see <http://www.gnu.org/licenses/>.
+
+# pylint: disable=missing-docstring,redefined-outer-name
+
+
+from collections import OrderedDict
+import json
+import os
+import socket
+import tempfile
+import threading
+
+import numpy as np
+import pytest
+
+from rddlgym import make, GYM
+from rddlgym.policies import RandomPolicy
+from rddlgym.server import EnvClient, EnvServer, parse_address
+
+
+RDDL = "Navigation-v1"
+
+
+@pytest.fixture(scope="module")
+def env():
+    env = make(RDDL, mode=GYM)
+    yield env
+    env.close()
+
+
+def _start(server):
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+@pytest.fixture(scope="module")
+def server():
+    hosted = make(RDDL, mode=GYM)
+    server = _start(EnvServer({RDDL: hosted}, max_batch=8, max_delay=0.05))
+    yield server
+    server.shutdown()
+    hosted.close()
+
+
+@pytest.fixture
+def client(server):
+    with EnvClient(server.address) as client:
+        yield client
+
+
+def test_parse_address():
+    assert parse_address("localhost:5555") == (socket.AF_INET, ("localhost", 5555))
+    assert parse_address(":0") == (socket.AF_INET, ("127.0.0.1", 0))
+    assert parse_address("/tmp/rddlgym.sock") == (socket.AF_UNIX, "/tmp/rddlgym.sock")
+
+
+def test_step(env, client):
+    assert client.envs() == [RDDL]
+
+    session = client.open(RDDL)
+    state, timestep = client.reset(session)
+    expected_state, _ = env.reset()
+    assert timestep == 0
+    _assert_allclose(state, expected_state)
+
+    policy = RandomPolicy(env)
+    for t in range(env.horizon):
+        action = policy(state, t)
+        state, reward, done, info = client.step(session, action)
+        expected_state, expected_reward, expected_done, expected_info = env.step(
+            action
+        )
+        _assert_allclose(state, expected_state)
+        _assert_allclose(info, expected_info)
+        assert reward == pytest.approx(expected_reward, abs=1e-5)
+        assert done == expected_done
+
+    assert done
+    client.close_session(session)
+    with pytest.raises(ValueError):
+        client.reset(session)
+
+
+def test_transition(env, client):
+    batch_size = 5
+    state, _ = env.reset()
+    policy = RandomPolicy(env)
+
+    states = OrderedDict(
+        (name, np.stack([value] * batch_size)) for name, value in state.items()
+    )
+    actions = [policy(state, 0) for _ in range(batch_size)]
+    actions = OrderedDict(
+        (name, np.stack([action[name] for action in actions])) for name in actions[0]
+    )
+
+    next_state, reward, info = client.transition(RDDL, states, actions)
+    expected_state, expected_reward, expected_info = env.transition(states, actions)
+
+    assert reward.shape == (batch_size,)
+    np.testing.assert_allclose(reward, expected_reward, atol=1e-5)
+    _assert_allclose(next_state, expected_state)
+    _assert_allclose(info, expected_info)
+
+
+def test_transition_chunks(env, server, client):
+    batch_size = 20
+    state, _ = env.reset()
+    policy = RandomPolicy(env, seed=0)
+
+    states = OrderedDict(
+        (name, np.stack([value] * batch_size)) for name, value in state.items()
+    )
+    actions = policy.sample(states)
+
+    next_state, reward, info = client.transition(RDDL, states, actions)
+    expected_state, expected_reward, expected_info = env.transition(states, actions)
+
+    assert reward.shape == (batch_size,)
+    np.testing.assert_allclose(reward, expected_reward, atol=1e-5)
+    _assert_allclose(next_state, expected_state)
+    _assert_allclose(info, expected_info)
+
+    # only power of 2 batch sizes up to max_batch are compiled
+    hosted = server.envs[RDDL]
+    assert set(hosted._batch_ops) <= {1, 2, 4, 8}
+
+
+def test_invalid_fluents(env, server):
+    state, _ = env.reset()
+    action = RandomPolicy(env, seed=0)(state, 0)
+    name = next(iter(action))
+    invalid = [
+        OrderedDict((k, v) for k, v in action.items() if k != name),
+        OrderedDict(action, **{name: np.zeros(3)}),
+        OrderedDict(action, **{"x/0": 0.0}),
+    ]
+    errors, results = [], []
+
+    def _run(action):
+        with EnvClient(server.address) as client:
+            session = client.open(RDDL)
+            client.reset(session)
+            try:
+                results.append(client.step(session, action))
+            except ValueError as error:
+                errors.append(error)
+
+    threads = [threading.Thread(target=_run, args=(a,)) for a in invalid + [action]]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(errors) == len(invalid)
+    assert len(results) == 1
+
+    with EnvClient(server.address) as client:
+        states = OrderedDict((k, np.stack([v] * 2)) for k, v in state.items())
+        actions = OrderedDict((k, np.stack([v] * 3)) for k, v in action.items())
+        with pytest.raises(ValueError):
+            client.transition(RDDL, states, actions)
+        with pytest.raises(ValueError):
+            client.transition(RDDL, state, action)
+
+
+def test_snapshot_restore(env, client):
+    session = client.open(RDDL)
+    state, _ = client.reset(session)
+    action = RandomPolicy(env)(state, 0)
+
+    snapshot = client.snapshot(session)
+    first = client.step(session, action)
+    client.step(session, action)
+
+    client.restore(session, *snapshot)
+    assert client.snapshot(session)[1] == 0
+    second = client.step(session, action)
+
+    _assert_allclose(first[0], second[0])
+    assert first[1] == second[1]
+
+
+def test_coalescing(env, server):
+    steps, num_clients = 10, 6
+    with EnvClient(server.address) as client:
+        stats = client.stats()[RDDL]
+    errors = []
+
+    def _run():
+        try:
+            with EnvClient(server.address) as client:
+                session = client.open(RDDL)
+                state, _ = client.reset(session)
+                policy = RandomPolicy(env)
+                for t in range(steps):
+                    state, _, _, _ = client.step(session, policy(state, t))
+        except Exception as error:  # pylint: disable=broad-except
+            errors.append(error)
+
+    threads = [threading.Thread(target=_run) for _ in range(num_clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    with EnvClient(server.address) as client:
+        new_stats = client.stats()[RDDL]
+    requests = new_stats["requests"] - stats["requests"]
+    batches = new_stats["batches"] - stats["batches"]
+    assert requests == steps * num_clients
+    assert batches < requests
+
+
+def test_errors(client):
+    with pytest.raises(ValueError):
+        client.call("shutdown")
+    with pytest.raises(ValueError):
+        client.call("_envs")
+    with pytest.raises(ValueError):
+        client.open("Reservoir-8")
+    with pytest.raises(ValueError):
+        client.step("s0", {})
+
+    assert client.envs() == [RDDL]
+
+
+def test_invalid_requests(server, client):
+    requests = [
+        (b"[]", None),
+        (b"3", None),
+        (b'{"id": 1}', 1),
+        (b'{"id": 2, "method": "envs", "params": []}', 2),
+    ]
+    with socket.create_connection(server._server.server_address) as sock:
+        lines = sock.makefile("rwb")
+        for line, request_id in requests + [(b'{"id": 3, "method": "envs"}', 3)]:
+            lines.write(line + b"\n")
+            lines.flush()
+            response = json.loads(lines.readline().decode("utf-8"))
+            assert response["id"] == request_id
+            assert ("error" in response) == (request_id != 3)
+
+    assert client.envs() == [RDDL]
+
+
+def test_unix_socket(env):
+    with tempfile.TemporaryDirectory() as dirpath:
+        address = os.path.join(dirpath, "rddlgym.sock")
+        server = _start(EnvServer({RDDL: env}, address=address))
+        try:
+            assert server.address == address
+            with EnvClient(address) as client:
+                session = client.open(RDDL)
+                state, _ = client.reset(session)
+                _, _, done, _ = client.step(session, RandomPolicy(env)(state, 0))
+                assert not done
+        finally:
+            server.shutdown()
+        assert not os.path.exists(address)
+
+
+def _assert_allclose(values, expected):
+    assert list(values) == list(expected)
+    for name, value in values.items():
+        np.testing.assert_allclose(value, expected[name], atol=1e-5)
@@ -0,0 +1,157 @@
+# This file is part of rddlgym.
+
+# rddlgym is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# rddlgym is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with rddlgym. If not, see <http://www.gnu.org/licenses/>.
+
+# pylint: disable=missing-docstring,redefined-outer-name
+
+
+from collections import OrderedDict
+import os
+import tempfile
+
+import numpy as np
+import pytest
+
+from rddlgym import storage
+
+
+@pytest.fixture(scope="module")
+def columns():
+    return OrderedDict(
+        [
+            ("rlevel(t1)", np.random.uniform(size=10).astype(np.float32)),
+            ("rlevel(t2)", np.random.uniform(size=10).astype(np.float32)),
+            ("reward", np.random.normal(size=10).astype(np.float32)),
+            ("done", np.arange(10) == 9),
+        ]
+    )
+
+
+def test_infer_format():
+    assert storage.infer_format("/tmp/data.csv") == storage.CSV
+    assert storage.infer_format("/tmp/data.npz") == storage.NPZ
+    assert storage.infer_format("/tmp/data") == storage.NPY
+    with pytest.raises(ValueError):
+        storage.infer_format("/tmp/data.json")
+
+
+@pytest.mark.parametrize("filename", ["data.csv", "data.npz", "data"])
+def test_save_and_load_columns(columns, filename):
+    with tempfile.TemporaryDirectory() as dirpath:
+        filepath = os.path.join(dirpath, filename)
+        storage.save_columns(columns, filepath)
+
+        assert storage.find_data_file(dirpath) == filepath
+        assert storage.column_names(filepath) == list(columns.keys())
+
+        columns_ = storage.load_columns(filepath)
+        assert list(columns_.keys()) == list(columns.keys())
+        for name, values in columns.items():
+            assert np.allclose(columns_[name], values)
+
+        columns_ = storage.load_columns(filepath, columns=["reward"])
+        assert list(columns_.keys()) == ["reward"]
+
+
+def test_load_columns_mmap(columns):
+    with tempfile.TemporaryDirectory() as dirpath:
+        filepath = os.path.join(dirpath, "data")
+        storage.save_columns(columns, filepath)
+        columns_ = storage.load_columns(filepath, mmap_mode="r")
+        for name, values in columns.items():
+            if values.dtype != np.bool_:
+                assert isinstance(columns_[name], np.memmap)
+            assert columns_[name].dtype == values.dtype
+            assert np.array_equal(columns_[name], values)
+
+
+def test_pack_bits():
+    values = np.random.uniform(size=(13, 3)) > 0.5
+    packed = storage.pack_bits(values)
+    assert packed.dtype == np.uint8
+    assert packed.shape == (5,)
+    assert np.array_equal(storage.unpack_bits(packed, values.shape), values)
+
+
+@pytest.mark.parametrize("filename", ["data.npz", "data"])
+def test_bool_columns_packed(filename):
+    columns = OrderedDict(
+        [("alive(x1)", np.random.uniform(size=100) > 0.5), ("reward", np.ones(100))]
+    )
+    with tempfile.TemporaryDirectory() as dirpath:
+        filepath = os.path.join(dirpath, filename)
+        storage.save_columns(columns, filepath)
+
+        if filename == "data":
+            packed = np.load(os.path.join(filepath, "col-0000.npy"))
+        else:
+            with np.load(filepath) as data:
+                packed = data["alive(x1)"]
+        assert packed.dtype == np.uint8
+        assert packed.shape == (13,)
+
+        assert storage.column_names(filepath) == list(columns.keys())
+        columns_ = storage.load_columns(filepath, columns=["alive(x1)"])
+        assert columns_["alive(x1)"].dtype == np.bool_
+        assert np.array_equal(columns_["alive(x1)"], columns["alive(x1)"])
+
+
+def test_column_writer_bool_partial_bytes():
+    values = np.random.uniform(size=30) > 0.5
+    with tempfile.TemporaryDirectory() as dirpath:
+        filepath = os.path.join(dirpath, "data")
+        with storage.ColumnWriter(filepath) as writer:
+            for start, stop in [(0, 3), (3, 11), (11, 11), (11, 30)]:
+                writer.write({"alive(x1)": values[start:stop]})
+                writer.flush()
+                writer.flush()
+                columns_ = storage.load_columns(filepath)
+                assert np.array_equal(columns_["alive(x1)"], values[:stop])
+
+        packed = np.load(os.path.join(filepath, "col-0000.npy"))
+        assert packed.shape == (4,)
+
+
+@pytest.mark.parametrize("fmt", [storage.NPZ, storage.NPY])
+def test_convert_logdir(columns, fmt):
+    with tempfile.TemporaryDirectory() as logdir:
+        for run in range(3):
+            filepath = os.path.join(logdir, f"run{run}", "data.csv")
+            storage.save_columns(columns, filepath)
+
+        converted = storage.convert_logdir(logdir, fmt, remove=True)
+        assert len(converted) == 3
+
+        for src, dst in converted:
+            assert not os.path.exists(src)
+            assert storage.infer_format(dst) == fmt
+            assert storage.find_data_file(os.path.dirname(dst)) == dst
+            columns_ = storage.load_columns(dst)
+            for name, values in columns.items():
+                assert np.allclose(columns_[name], values)
+
+
+@pytest.mark.parametrize("filename", ["data.csv", "data.npz", "data"])
+def test_column_reader(columns, filename):
+    with tempfile.TemporaryDirectory() as dirpath:
+        filepath = os.path.join(dirpath, filename)
+        storage.save_columns(columns, filepath)
+
+        reader = storage.ColumnReader(filepath)
+        assert reader.names == list(columns.keys())
+
+        assert np.allclose(reader["reward"], columns["reward"])
+        assert len(reader) == 10
+        assert list(reader._cache.keys()) == ["reward"]
+        assert reader.read(["reward"])["reward"] is reader["reward"]
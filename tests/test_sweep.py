@@ -0,0 +1,135 @@
+# This file is part of rddlgym.
+
+# rddlgym is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# rddlgym is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with rddlgym. If not, see <http://www.gnu.org/licenses/>.
+
+# pylint: disable=missing-docstring
+
+
+from collections import OrderedDict
+import json
+import os
+import tempfile
+
+import numpy as np
+import pytest
+
+from rddlgym import storage
+from rddlgym import sweep
+from rddlgym.policies import RandomPolicy
+
+
+class ConstantPolicy:
+    def __init__(self, env, value):
+        self.env = env
+        self.value = value
+
+    def __call__(self, state, timestep):
+        return OrderedDict(
+            (name, np.full(space.shape, self.value, dtype=space.dtype))
+            for name, space in self.env.action_space.spaces.items()
+        )
+
+
+def test_expand_grid():
+    configs = sweep.expand_grid({"b": [1, 2], "a": ["x"]})
+    assert configs == [
+        OrderedDict([("a", "x"), ("b", 1)]),
+        OrderedDict([("a", "x"), ("b", 2)]),
+    ]
+    assert sweep.expand_grid() == [OrderedDict()]
+    assert sweep.experiment_id("HVAC-3", "random", configs[0]) == os.path.join(
+        "HVAC-3", "random", "a=x", "b=1"
+    )
+
+
+def test_load_planner():
+    assert sweep.load_planner("random") is RandomPolicy
+    assert sweep.load_planner("tests.test_sweep:ConstantPolicy") is ConstantPolicy
+    with pytest.raises(ValueError):
+        sweep.load_planner("ConstantPolicy")
+
+
+def test_scheduler():
+    jobs = [
+        sweep.Job(exp_id, "HVAC-3", "random", "random", {}, run, None)
+        for exp_id in ["a", "b", "c"]
+        for run in range(2)
+    ]
+    scheduler = sweep._Scheduler(jobs)
+    scheduler.add_cost("a", 1.0)
+    scheduler.add_cost("b", 2.0)
+    scheduler.add_cost("b", 4.0)
+
+    # unmeasured experiments first, then longest expected first
+    order = [scheduler.pop().experiment_id]
+    scheduler.add_cost("c", 2.0)
+    order.append(scheduler.pop().experiment_id)
+    scheduler.add_cost("a", 9.0)
+    while scheduler:
+        order.append(scheduler.pop().experiment_id)
+    assert order == ["c", "b", "a", "a", "b", "c"]
+
+
+def test_reserved_hyperparameters():
+    with tempfile.TemporaryDirectory() as logdir:
+        with pytest.raises(ValueError):
+            sweep.sweep(["Navigation-v1"], ["random"], {"planner": [1]}, logdir=logdir)
+
+
+def test_sweep():
+    with tempfile.TemporaryDirectory() as logdir:
+        planners = {"constant": "tests.test_sweep:ConstantPolicy"}
+        grid = {"value": [0.0, 1.0]}
+        index = sweep.sweep(
+            ["Navigation-v1"], planners, grid, runs=2, logdir=logdir, workers=2
+        )
+
+        assert sweep.read_index(logdir) == index
+        experiments = index["experiments"]
+        assert list(experiments.keys()) == [
+            os.path.join("Navigation-v1", "constant", "value=0.0"),
+            os.path.join("Navigation-v1", "constant", "value=1.0"),
+        ]
+
+        for exp_id, experiment in experiments.items():
+            with open(os.path.join(logdir, exp_id, "config.json")) as file:
+                config = json.load(file)
+            assert config["planner"] == "constant"
+            assert config["value"] == experiment["config"]["value"]
+
+            assert sorted(experiment["runs"].keys()) == ["0", "1"]
+            for run, record in experiment["runs"].items():
+                dirpath = os.path.join(logdir, exp_id, "run{}".format(run))
+                filepath = storage.find_data_file(dirpath)
+                assert filepath == os.path.join(logdir, record["file"])
+                rewards = storage.load_columns(filepath, ["reward"])["reward"]
+                assert np.isclose(np.sum(rewards), record["total_reward"])
+                assert record["seconds"] > 0
+
+        mtimes = [
+            os.path.getmtime(os.path.join(logdir, record["file"]))
+            for experiment in experiments.values()
+            for record in experiment["runs"].values()
+        ]
+        index = sweep.sweep(
+            ["Navigation-v1"], planners, grid, runs=3, logdir=logdir, workers=2
+        )
+        for experiment in index["experiments"].values():
+            assert sorted(experiment["runs"].keys()) == ["0", "1", "2"]
+        assert mtimes == [
+            os.path.getmtime(os.path.join(logdir, record["file"]))
+            for experiment in index["experiments"].values()
+            for run, record in experiment["runs"].items()
+            if run != "2"
+        ]
@@ -16,13 +16,15 @@
 # pylint: disable=missing-docstring,redefined-outer-name,invalid-name,protected-access
 
 
+import os
 import tempfile
 
 import numpy as np
 import pandas as pd
 import pytest
 
-from rddlgym import make, GYM, Runner
+from rddlgym import make, GYM, Runner, Trajectory, TrajectoryWriter
+from rddlgym import storage
 
 
 @pytest.fixture(scope="module", params=["Navigation-v2", "Reservoir-8"])
@@ -75,6 +77,25 @@ def test_total_reward(trajectory):
     assert np.allclose(total_reward, sum(trajectory.rewards))
 
 
+def test_cached_views(trajectory):
+    trajectory_ = Trajectory(trajectory.env)
+    for transition in trajectory[:-1]:
+        trajectory_.add_transition(*transition)
+
+    states, rewards = trajectory_.states, trajectory_.rewards
+    assert trajectory_.states is states
+    assert trajectory_.rewards is rewards
+    for values in states.values():
+        assert isinstance(values, np.ndarray)
+        assert values.shape[0] == len(trajectory) - 1
+        assert not values.flags.writeable
+
+    trajectory_.add_transition(*trajectory[-1])
+    assert trajectory_.states is not states
+    assert len(trajectory_.rewards) == len(trajectory)
+    assert np.isclose(trajectory_.total_reward, np.sum(trajectory.rewards))
+
+
 def test_as_dataframe(trajectory):
     rddl = trajectory.env._compiler.rddl
     state_vars = rddl.state_fluent_variables
@@ -97,3 +118,109 @@ def test_save(trajectory):
         trajectory.save(filepath)
         df_ = pd.read_csv(filepath)
         assert np.allclose(df_.to_numpy(), df.to_numpy())
+
+
+def test_as_columns(trajectory):
+    columns = trajectory.as_columns()
+    df = trajectory.as_dataframe()
+    assert list(columns.keys()) == list(df.columns)
+    assert all(len(values) == len(trajectory) for values in columns.values())
+    assert columns["reward"].dtype == np.float32
+    assert columns["done"].dtype == np.bool_
+
+
+@pytest.mark.parametrize("filename", ["data.npz", "data"])
+def test_save_binary(trajectory, filename):
+    columns = trajectory.as_columns()
+    with tempfile.TemporaryDirectory() as dirpath:
+        filepath = os.path.join(dirpath, filename)
+        trajectory.save(filepath)
+        columns_ = storage.load_columns(filepath)
+        assert list(columns_.keys()) == list(columns.keys())
+        for name, values in columns.items():
+            assert columns_[name].dtype == values.dtype
+            assert np.array_equal(columns_[name], values)
+
+
+@pytest.mark.parametrize("filename", ["data.csv", "data.npz", "data"])
+def test_load(trajectory, filename):
+    with tempfile.TemporaryDirectory() as dirpath:
+        filepath = os.path.join(dirpath, filename)
+        trajectory.save(filepath)
+        trajectory_ = Trajectory.load(filepath, trajectory.env)
+
+        assert len(trajectory_) == len(trajectory)
+        assert np.allclose(trajectory_.total_reward, trajectory.total_reward)
+        for transition, transition_ in zip(trajectory, trajectory_):
+            assert transition_.step == transition.step
+            assert transition_.done == transition.done
+            for name, value in transition.state.items():
+                assert transition_.state[name].shape == value.shape
+                assert np.allclose(transition_.state[name], value)
+        assert trajectory_.final_state is None
+
+        columns = trajectory.as_columns()
+        for name, values in trajectory_.as_columns().items():
+            assert values.dtype == columns[name].dtype
+            assert np.allclose(values, columns[name])
+
+
+@pytest.mark.parametrize("filename", ["data.csv", "data.npz", "data"])
+def test_load_lazy(trajectory, filename):
+    with tempfile.TemporaryDirectory() as dirpath:
+        filepath = os.path.join(dirpath, filename)
+        trajectory.save(filepath)
+
+        trajectory_ = Trajectory.load(filepath, trajectory.env._compiler.rddl)
+        assert trajectory_.env is None
+
+        assert np.allclose(trajectory_.rewards, trajectory.rewards)
+        assert list(trajectory_._reader._cache.keys()) == ["reward"]
+
+        name, values = next(iter(trajectory.states.items()))
+        values_ = trajectory_.states[name]
+        assert values_.shape == (len(trajectory), *values[0].shape)
+        assert np.allclose(values_, values)
+
+        layout = trajectory_.layout
+        variables = [var for fluent in layout["state"][:1] for var in fluent.variables]
+        assert list(trajectory_._reader._cache.keys()) == ["reward", *variables]
+
+
+@pytest.mark.parametrize("filename", ["data.csv", "data"])
+def test_trajectory_writer(trajectory, filename):
+    columns = trajectory.as_columns()
+    with tempfile.TemporaryDirectory() as dirpath:
+        filepath = os.path.join(dirpath, filename)
+
+        with TrajectoryWriter(trajectory.env, filepath, chunk_size=8) as writer:
+            for transition in trajectory:
+                writer.add_transition(*transition)
+                assert writer._size < writer.chunk_size
+            assert len(writer) == len(trajectory)
+            assert np.isclose(writer.total_reward, trajectory.total_reward)
+            writer.close()
+
+        assert writer.closed
+        with pytest.raises(ValueError):
+            writer.add_transition(*trajectory[0])
+
+        columns_ = storage.load_columns(filepath)
+        assert list(columns_.keys()) == list(columns.keys())
+        for name, values in columns.items():
+            assert len(columns_[name]) == len(trajectory)
+            assert np.allclose(columns_[name], values)
+
+
+def test_trajectory_writer_flush(trajectory):
+    with tempfile.TemporaryDirectory() as dirpath:
+        filepath = os.path.join(dirpath, "data")
+        writer = TrajectoryWriter(trajectory.env, filepath, chunk_size=1024)
+        for transition in trajectory[:5]:
+            writer.add_transition(*transition)
+        writer.flush()
+
+        columns_ = storage.load_columns(filepath, mmap_mode="r")
+        assert all(len(values) == 5 for values in columns_.values())
+
+        writer.close()
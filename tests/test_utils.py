@@ -0,0 +1,123 @@
+# This file is part of rddlgym.
+
+# rddlgym is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# rddlgym is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with rddlgym. If not, see <http://www.gnu.org/licenses/>.
+
+# pylint: disable=missing-docstring,protected-access
+
+
+import os
+import tempfile
+
+import pytest
+
+import rddlgym
+from rddlgym import utils
+
+
+@pytest.fixture
+def filename():
+    dirname = os.path.join(os.path.dirname(rddlgym.__file__), "files")
+    return os.path.join(dirname, "Reservoir-8.rddl")
+
+
+def test_get_parser():
+    assert utils.get_parser() is utils.get_parser()
+
+
+def test_parse_model_cache(filename):
+    utils.clear_model_cache()
+    model1 = utils.parse_model(filename)
+    assert len(utils._MODELS) == 1
+
+    model2 = utils.parse_model(filename)
+    assert model1 is not model2
+    assert model1.domain.name == model2.domain.name
+    assert model1.instance.horizon == model2.instance.horizon
+    assert model1.domain.state_fluent_ordering == model2.domain.state_fluent_ordering
+
+
+def test_parse_model_disk_cache(filename, monkeypatch):
+    with tempfile.TemporaryDirectory() as dirpath:
+        monkeypatch.setenv(utils.CACHE_DIR_ENV, dirpath)
+        utils.clear_model_cache()
+        model1 = utils.parse_model(filename)
+
+        key = utils.model_key(utils.read_model(filename))
+        assert os.listdir(dirpath) == ["{}.pkl".format(key)]
+
+        utils.clear_model_cache()
+        model2 = utils.parse_model(filename)
+        assert key in utils._MODELS
+        assert model1.domain.name == model2.domain.name
+
+
+def test_model_cache_size(monkeypatch):
+    monkeypatch.setattr(utils, "MODEL_CACHE_SIZE", 2)
+    utils.clear_model_cache()
+    for rddl in ["Navigation-v1", "Navigation-v2", "Reservoir-8"]:
+        rddlgym.make(rddl, mode=rddlgym.AST)
+    assert len(utils._MODELS) == 2
+
+
+def test_make_scg_from_cache():
+    utils.clear_model_cache()
+    compiler1 = rddlgym.make("Reservoir-8", mode=rddlgym.SCG)
+    compiler2 = rddlgym.make("Reservoir-8", mode=rddlgym.SCG)
+    assert compiler1.rddl is not compiler2.rddl
+    assert compiler2.rddl.domain.name == "reservoir"
+
+
+def test_make_cache():
+    utils.clear_cache()
+    env1 = rddlgym.make("Navigation-v1", mode=rddlgym.GYM, cache=True)
+    env1.set_horizon(5)
+    env1.reset()
+    env1.step(env1.action_space.sample())
+    assert env1.timestep == 1
+
+    env1.seed(42)
+
+    env2 = rddlgym.make("Navigation-v1", mode=rddlgym.GYM, cache=True)
+    assert env2 is env1
+    assert env2.timestep == 0
+    assert env2.horizon == env2._compiler.rddl.instance.horizon
+    assert env2._seed is None
+
+    env3 = rddlgym.make("Navigation-v1", mode=rddlgym.GYM, config={"a": 1}, cache=True)
+    assert env3 is not env1
+
+    assert rddlgym.make("Navigation-v1", mode=rddlgym.GYM) is not env1
+    assert rddlgym.make("Navigation-v1", mode=rddlgym.SCG, cache=True) is not env1
+
+    utils.clear_cache()
+    assert env1.closed and env3.closed
+
+
+def test_make_cache_eviction(monkeypatch):
+    monkeypatch.setattr(utils, "CACHE_SIZE", 1)
+    utils.clear_cache()
+    env1 = rddlgym.make("Navigation-v1", mode=rddlgym.GYM, cache=True)
+    env2 = rddlgym.make("Navigation-v2", mode=rddlgym.GYM, cache=True)
+    assert not env1.closed and not env2.closed
+
+    # evicted envs are still usable by their callers, but no longer shared
+    env1.reset()
+    env1.step(env1.action_space.sample())
+    assert rddlgym.make("Navigation-v1", mode=rddlgym.GYM, cache=True) is not env1
+    env1.close()
+
+    env2.close()
+    env3 = rddlgym.make("Navigation-v2", mode=rddlgym.GYM, cache=True)
+    assert env3 is not env2 and not env3.closed
+    utils.clear_cache()